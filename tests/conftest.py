@@ -0,0 +1,36 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# the pipeline modules live in unallocated_files/ (`deps`, `extractors`, …)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "unallocated_files"))
+
+# never touch the shared resources/llm_cache.sqlite from tests
+os.environ.setdefault("HYDRA_LLM_CACHE", "off")
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    """benchmarks.stub_llm server with both DeepInfra clients pointed at it."""
+    pytest.importorskip("openai")
+    from benchmarks.stub_llm import StubLLM
+    from deps import deepinfra_client as dc
+
+    with StubLLM() as stub:
+        monkeypatch.setattr(dc.client, "base_url", stub.base_url)
+        monkeypatch.setattr(dc, "DEEPINFRA_BASE_URL", stub.base_url)
+        yield stub
+
+
+@pytest.fixture
+def dict_a(tmp_path, monkeypatch):
+    """edge_type_service with an empty, private Dict-A and no additions."""
+    from deps import edge_type_service as ets
+    from deps.journal import JournalDict
+
+    d = JournalDict(tmp_path / "edge_types.json")
+    monkeypatch.setattr(ets, "_EDGE_DICT", d)
+    monkeypatch.setattr(ets, "ADDITIONS", [])
+    return d
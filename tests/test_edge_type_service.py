@@ -0,0 +1,67 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from deps import edge_type_service as ets
+
+
+class _LockedCache:
+    """LLM cache whose SQLite file is held by another process."""
+    def get(self, key):
+        raise RuntimeError("database is locked")
+
+    def put(self, key, value):
+        raise RuntimeError("database is locked")
+
+
+def test_cache_failure_keeps_llm_answer(stub_llm, dict_a, monkeypatch):
+    stub_llm.responses = [{"match": 'Predicate: "bought"', "content": "acquired_by"}]
+    monkeypatch.setattr(ets, "CACHE", _LockedCache())
+    with pytest.warns(UserWarning, match="cache"):
+        abstract, created, source = ets.resolve_predicate("bought", ["acquired_by"])
+    assert (abstract, created, source) == ("acquired_by", False, "B")
+    assert dict_a["bought"] == "acquired_by"
+    assert stub_llm.requests == 1
+
+
+@pytest.fixture
+def no_index(monkeypatch):
+    """No MiniLM shortlist / auto-accept: every Dict-A miss goes to the LLM."""
+    monkeypatch.setattr(ets, "SHORTLIST_K", 0)
+    monkeypatch.setattr(ets, "AUTO_ACCEPT", 2.0)
+
+
+def test_concurrent_misses_share_one_call(stub_llm, dict_a, no_index):
+    stub_llm.latency_ms = 200
+    n = 8
+    barrier = threading.Barrier(n)
+
+    def resolve(_):
+        barrier.wait()
+        return ets.resolve_predicate("bought", [])[0]
+
+    with ThreadPoolExecutor(n) as pool:
+        assert set(pool.map(resolve, range(n))) == {"bought"}
+    assert stub_llm.requests == 1
+
+
+def test_batch_of_unknown_predicates_is_one_call(stub_llm, dict_a, no_index):
+    preds = ["bought", "sold", "leased", "rented", "Merged With"]
+    out = ets.resolve_predicates(preds, [])
+    assert stub_llm.requests == 1
+    assert {p: r[0] for p, r in out.items()} == {p.lower(): p.replace(" ", "_")
+                                                for p in preds}
+    assert all(r[1:] == (True, "B") for r in out.values())
+
+
+def test_edge_stage_resolves_a_batch_in_one_call(stub_llm, dict_a, no_index):
+    from extractors import edge_extractor as ee
+    from extractors.triple_extractor import Triple
+
+    triples = [Triple(subject="A", predicate=p, object="B")
+               for p in ("bought", "sold", "bought", "leased")]
+    resolved = ee.resolve_batch(triples)
+    assert [ee._abstract_of(t, [], resolved) for t in triples] == \
+        ["bought", "sold", "bought", "leased"]
+    assert stub_llm.requests == 1
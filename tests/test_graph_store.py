@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from deps.graph_store import GraphStore
+
+rng = np.random.default_rng(0)
+
+
+def _edge(etype, fine_pred, subj="A", obj="B"):
+    hv = lambda: rng.choice(np.array([-1, 1], np.int8), 4096)
+    return {"edge_type": etype, "surface": hv(), "semantic": hv(),
+            "meta": {"fine_pred": fine_pred, "subject": subj, "object": obj}}
+
+
+def _shard():
+    g = GraphStore()
+    g.add_edges("d1", 0, "s0", [_edge("x_type", "bought"), _edge("owns", "owns"),
+                                _edge("located_in", "located_in")])
+    g.add_edges("d1", 1, "s1", [_edge("founded_by", "founded")])
+    return g
+
+
+@pytest.mark.parametrize("overlap", [False, True], ids=["fast", "slow"])
+def test_extend_relabels_and_keeps(overlap):
+    g = GraphStore()
+    if overlap:                                       # shared doc_id → per-sentence path
+        g.add_edges("d1", 9, "other", [_edge("located_in", "located_in")])
+    g.extend(_shard(), relabel={"bought": "acquired_by"},
+             keep=["acquired_by", "located_in"])
+
+    s0 = [(e["edge_type"], e["meta"]["fine_pred"]) for e in g.get_sentence_graph("d1", 0)]
+    assert s0 == [("acquired_by", "bought"), ("located_in", "located_in")]
+    assert len(g.get_sentence_graph("d1", 1)) == 0
+    assert g.count(edge_type="owns") == g.count(edge_type="founded_by") == 0
+
+
+@pytest.mark.parametrize("overlap", [False, True], ids=["fast", "slow"])
+def test_extend_skips_dead_rows(overlap):
+    shard = _shard()
+    shard.add_edges("d1", 0, "s0 again", [_edge("located_in", "located_in")])
+    g = GraphStore()
+    if overlap:
+        g.add_edges("d1", 9, "other", [])
+    g.extend(shard)
+    assert len(g) == 2
+    assert g.get_sentence_text("d1", 0) == "s0 again"
+    assert [e["edge_type"] for e in g.get_sentence_graph("d1", 0)] == ["located_in"]
+
+
+def test_save_open_roundtrip(tmp_path):
+    g = _shard()
+    g.edge_types.id("unused")
+    g.add_edges("d2", 0, "s", [dict(_edge("owns", "owns", "Ä", "B"),
+                                    meta={"fine_pred": "owns", "subject": "Ä",
+                                          "object": "B", "note": "x"})])
+    g.save(tmp_path / "g")
+    h = GraphStore.open(tmp_path / "g")
+    assert h.edge_types.items == g.edge_types.items
+    assert [h.edge(r)["meta"] for r in range(h.E.n)] == [g.edge(r)["meta"] for r in range(g.E.n)]
+    assert h.k_hop("Ä", 1) == {"Ä": 0, "B": 1}
+    h.add_edges("d3", 0, "t", [_edge("new_type", "p")])
+    assert h.count(edge_type="new_type") == 1
+
+
+def test_open_recovers_interrupted_swap(tmp_path):
+    p = tmp_path / "g"
+    _shard().save(p)
+    p.rename(tmp_path / "g.old")                      # crash between the two renames
+    h = GraphStore.open(p)
+    assert len(h) == 4
+    h.save(p)
+    assert sorted(x.name for x in tmp_path.iterdir()) == ["g"]
+
+
+def test_unknown_doc_graph_is_empty():
+    g = _shard()
+    assert len(g.get_doc_graph("missing")) == 0
+    assert list(g.get_doc_graph("missing")) == []
+    assert len(g.get_doc_graph("d1")) == 4
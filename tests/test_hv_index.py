@@ -0,0 +1,28 @@
+import tracemalloc
+
+import numpy as np
+
+from deps import hd_packed, hv_index
+
+rng = np.random.default_rng(0)
+M = rng.choice(np.array([-1, 1], np.int8), (3000, 4096))
+
+
+def test_dense_matches_float_reference_and_packed():
+    q = M[42]
+    ref = M.astype(np.float32) @ q.astype(np.float32)
+    rows, scores = hv_index.topk(M, q, 5, chunk=1024)
+    assert rows[0] == 42 and scores[0] == 4096
+    np.testing.assert_array_equal(scores, ref[rows])
+    prow, pscores = hv_index.topk(hd_packed.pack(M), q, 5, chunk=1024)
+    np.testing.assert_array_equal(prow, rows)
+    np.testing.assert_array_equal(pscores, scores)
+
+
+def test_dense_scoring_does_not_copy_the_chunk():
+    chunk = M[:1024]
+    tracemalloc.start()
+    hv_index._score_chunk(chunk, M[0])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < chunk.nbytes                    # a float32 copy would be 4x
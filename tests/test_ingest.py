@@ -0,0 +1,42 @@
+import json
+
+import numpy as np
+
+from ingest import PartWriter, load_parts
+
+rng = np.random.default_rng(0)
+
+
+def _edge(fine_pred):
+    hv = lambda: rng.choice(np.array([-1, 1], np.int8), 4096)
+    return {"edge_type": "acquired_by", "surface": hv(), "semantic": hv(),
+            "meta": {"fine_pred": fine_pred, "subject": "A", "object": "B"}}
+
+
+def _write(out, doc_id, sent_ids):
+    w = PartWriter(out, every=100)
+    for s in sent_ids:
+        w.write(doc_id, s, f"sentence {s}", [_edge(f"p{s}")])
+    w.flush()
+    return w
+
+
+def test_resume_after_torn_checkpoint(tmp_path):
+    _write(tmp_path, "d1", [0, 1])
+    ckpt = tmp_path / "checkpoint.jsonl"
+    with open(ckpt, "a", encoding="utf8") as fh:      # crash mid-commit of part 1
+        fh.write('{"part": 1, "done": [["d1", 2')
+    (tmp_path / "part-00001.jsonl").write_text("orphan\n")
+
+    w = PartWriter(tmp_path, every=100)
+    assert w.done == {("d1", 0), ("d1", 1)} and w.part == 1
+    assert not (tmp_path / "part-00001.jsonl").exists()
+    w.write("d1", 2, "sentence 2", [_edge("p2")])
+    w.flush()
+
+    lines = ckpt.read_text(encoding="utf8").splitlines()
+    assert [json.loads(ln)["part"] for ln in lines] == [0, 1]
+    w = PartWriter(tmp_path, every=100)               # the resumed part survives
+    assert w.done == {("d1", 0), ("d1", 1), ("d1", 2)} and w.part == 2
+    assert (tmp_path / "part-00001.npz").exists()
+    assert load_parts(tmp_path).count(edge_type="acquired_by") == 3
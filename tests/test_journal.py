@@ -0,0 +1,20 @@
+from deps.journal import JournalDict
+
+
+def test_torn_tail_is_cut_before_next_append(tmp_path):
+    snap = tmp_path / "edge_types.json"
+    d = JournalDict(snap)
+    d["a"] = "x"
+    d.flush()
+    with open(d.journal, "ab") as fh:                 # crashed writer
+        fh.write(b'{"k": "b", "v')
+
+    d = JournalDict(snap)
+    assert dict(d) == {"a": "x"}
+    d["c"] = "y"
+    d.flush()
+
+    assert JournalDict(snap) == {"a": "x", "c": "y"}
+    assert d.journal.read_bytes().endswith(b'{"k": "c", "v": "y"}\n')
+    d["e"] = "z"                                      # offset still matches the file
+    assert JournalDict(snap) == {"a": "x", "c": "y", "e": "z"}
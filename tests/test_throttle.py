@@ -0,0 +1,26 @@
+import asyncio
+
+import pytest
+
+from deps.throttle import is_retryable
+
+
+class _HTTPError(Exception):
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+@pytest.mark.parametrize("status, expected", [(429, True), (500, True), (503, True),
+                                              (400, False), (401, False), (404, False)])
+def test_status_codes(status, expected):
+    assert is_retryable(_HTTPError(status)) is expected
+
+
+@pytest.mark.parametrize("exc", [ConnectionResetError(), TimeoutError(), asyncio.TimeoutError()])
+def test_transport_errors_retry(exc):
+    assert is_retryable(exc)
+
+
+@pytest.mark.parametrize("exc", [ValueError("bad json"), KeyError("choices"), TypeError()])
+def test_programming_errors_do_not_retry(exc):
+    assert not is_retryable(exc)
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("pydantic")
+from deps import deepinfra_client as dc
+from deps.throttle import TokenBucket
+from extractors import triple_extractor as te
+
+SENTENCES = [f"Company{i} acquired Startup{i}." for i in range(12)]
+
+
+def test_many_keeps_input_order_through_429s(stub_llm):
+    stub_llm.error_rate = 0.3
+    out = te.extract_triples_many(SENTENCES, concurrency=4, max_tries=20)
+    assert [(t.subject, t.object) for ts in out for t in ts] == \
+        [(f"Company{i}", f"Startup{i}") for i in range(12)]
+    assert stub_llm.requests > len(SENTENCES)          # some calls were retried
+
+
+@pytest.mark.parametrize("fn", [te.extract_triples_many, te.extract_triples_packed])
+def test_blocking_wrappers_close_their_client(stub_llm, fn):
+    assert len(fn(SENTENCES[:3])) == 3
+    assert len(dc._ACLIENTS) == 0
+
+
+class _Bucket(TokenBucket):
+    """Records whether the concurrency slot was held when each token was taken."""
+    def __init__(self, sem):
+        super().__init__(1000.0)
+        self.sem, self.held = sem, []
+
+    async def acquire(self, n: float = 1.0):
+        self.held.append(self.sem.locked())
+        await super().acquire(n)
+
+
+def test_rate_token_taken_inside_semaphore(stub_llm):
+    async def run():
+        sem = asyncio.Semaphore(1)
+        bucket = _Bucket(sem)
+        await asyncio.gather(*(te.aextract_triples(s, limiter=bucket, sem=sem)
+                               for s in SENTENCES[:4]))
+        return bucket.held
+
+    assert asyncio.run(run()) == [True] * 4
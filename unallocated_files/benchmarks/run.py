@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+benchmarks/run.py
+─────────────────
+Offline performance suite.  Every LLM call goes to a local stub server
+(benchmarks.stub_llm), so numbers measure our code plus a *fixed*,
+configurable model latency — never DeepInfra.
+
+  alias    AliasResolver.resolve_many (T0 exact; T1/T2 when MiniLM/KB present)
+  hv       token → HV encode (cold / warm cache), surface+semantic, packed ops
+  edges    edges_from_triples (Dict-A/Dict-B via the stub)
+  spacy    the three rule-based extractors: per-text vs nlp.pipe corpus mode;
+           the rule_extractor fast path and its confident fraction
+  graph    GraphStore insert, HV search, filtered lookups, k-hop, doc search
+  llm      aextract_triples_many / aextract_triples_packed throughput
+           against the stub
+  e2e      extract_sentence_graph and the ingest stages (plain / merged /
+           cascade), sentences/sec
+
+Suites whose dependencies (spaCy model, MiniLM, openai…) are missing are
+reported as skipped, not failed.  The LLM cache is off and Dict-B is not
+persisted, so runs are repeatable and leave resources/ untouched.
+
+Output is JSON ({"meta": …, "results": [{"name", "n", "seconds",
+"ops_per_s", "p50_ms", "p95_ms", …}]}).  `--compare base.json` exits 1 when
+any ops_per_s drops by more than `--tolerance`.
+
+Usage:
+    python -m benchmarks.run --out bench.json
+    python -m benchmarks.run --suites graph hv --compare bench.json --tolerance 0.15
+"""
+from __future__ import annotations
+import argparse, json, os, platform, random, subprocess, sys, tempfile, time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from benchmarks.stub_llm import StubLLM
+
+SUITES: Dict[str, Callable[[argparse.Namespace], List[dict]]] = {}
+
+class Skip(Exception):
+    """Raised by a suite whose optional dependency is unavailable."""
+
+def suite(name: str):
+    def deco(fn):
+        SUITES[name] = fn
+        return fn
+    return deco
+
+# ───────────────────────────────────────────────────────────────
+# measurement helpers
+# ───────────────────────────────────────────────────────────────
+def measure(name: str, fn: Callable[[], object], *, n: int = 1, repeat: int = 5,
+            warmup: int = 1, **extra) -> dict:
+    """Time `fn` (which performs `n` operations) `repeat` times."""
+    for _ in range(warmup):
+        fn()
+    laps = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        laps.append(time.perf_counter() - t0)
+    laps.sort()
+    total = sum(laps)
+    return {"name": name, "n": n * repeat, "seconds": total,
+            "ops_per_s": n * repeat / total if total else float("inf"),
+            "p50_ms": 1e3 * laps[len(laps) // 2] / n,
+            "p95_ms": 1e3 * laps[min(len(laps) - 1, int(0.95 * len(laps)))] / n,
+            **extra}
+
+_ORGS   = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Tyrell",
+           "Cyberdyne", "Soylent", "Aperture", "Wonka", "Gringotts", "Pied Piper"]
+_PEOPLE = ["Alice Smith", "Bob Jones", "Carol White", "Dan Brown", "Eve Black", "Frank Green"]
+_CITIES = ["Paris", "Berlin", "Tokyo", "Boston", "Lagos", "Lima", "Oslo", "Seoul"]
+_TYPES  = ["acquired_by", "founded_by", "located_in"]
+_TMPL   = ["{o} acquired {o2}.", "{o} was founded by {p}.", "{o} is located in {c}.",
+           "{p} joined {o} in {y}.", "{o2} was acquired by {o}.", "{o} opened an office in {c}."]
+
+def corpus(n: int, seed: int = 0) -> List[str]:
+    """Deterministic synthetic sentences (n unique-ish, template-shaped)."""
+    rng = random.Random(seed)
+    return [rng.choice(_TMPL).format(o=rng.choice(_ORGS), o2=rng.choice(_ORGS),
+                                     p=rng.choice(_PEOPLE), c=rng.choice(_CITIES),
+                                     y=rng.randint(1950, 2024)) + f" ({i})"
+            for i in range(n)]
+
+def _need_minilm():
+    from deps import models
+    if models.minilm() is None:
+        raise Skip("sentence-transformers not installed")
+
+def _import(mod: str):
+    try:
+        return __import__(mod, fromlist=["_"])
+    except ImportError as e:
+        raise Skip(f"{mod}: {e}")
+
+# ───────────────────────────────────────────────────────────────
+# suites
+# ───────────────────────────────────────────────────────────────
+@suite("alias")
+def bench_alias(args) -> List[dict]:
+    import re, collections
+    alias = _import("deps.alias_service")
+    toks  = [t for s in corpus(args.n) for t in re.findall(r"\w+|\W+", s)]
+    tiers = collections.Counter()
+    def run():
+        r = alias.AliasResolver()                    # fresh memo: measure resolution
+        for _, _, tier in r.resolve_many(toks):
+            tiers[tier] += 1
+    out = [measure("alias.resolve_many", run, n=len(toks), repeat=args.repeat,
+                   tiers_active=["T0"] + (["T1", "T2"] if alias._minilm() is not None else []))]
+    out[0]["tier_counts"] = {str(k): v for k, v in tiers.items()}
+    words = sorted({t for t in toks if t.strip()})
+    out.append(measure("alias.t0_exact", lambda: [alias._exact_lookup(w) for w in words],
+                       n=len(words), repeat=args.repeat))
+    return out
+
+@suite("hv")
+def bench_hv(args) -> List[dict]:
+    import numpy as np
+    from deps import hd_packed
+    rng  = np.random.default_rng(0)
+    V    = rng.choice(np.array([-1, 1], np.int8), (args.n, hd_packed.D))
+    P    = hd_packed.pack(V)
+    out  = [measure("hv.pack", lambda: hd_packed.pack(V), n=args.n, repeat=args.repeat),
+            measure("hv.packed_dot", lambda: hd_packed.dot(P[0], P), n=args.n, repeat=args.repeat),
+            measure("hv.dense_dot", lambda: V.astype(np.float32) @ V[0].astype(np.float32),
+                    n=args.n, repeat=args.repeat)]
+    try:
+        ee = _import("extractors.edge_extractor")
+        _need_minilm()
+    except Skip as e:                                 # packed ops above still count
+        return out + [{"name": "hv.encode", "skipped": str(e)}]
+    words = sorted({w for s in corpus(args.n) for w in s.split()})
+    def cold():
+        ee._HV_CACHE.clear()
+        ee._emb_many(words)
+    out.append(measure("hv.encode_cold", cold, n=len(words), repeat=args.repeat))
+    out.append(measure("hv.encode_warm", lambda: ee._emb_many(words), n=len(words),
+                       repeat=args.repeat))
+    trip = [(w, "acquired", words[-i - 1]) for i, w in enumerate(words)]
+    out.append(measure("hv.surface_semantic",
+                       lambda: [(ee._surface(*t), ee._semantic(*t)) for t in trip],
+                       n=len(trip), repeat=args.repeat))
+    return out
+
+@suite("edges")
+def bench_edges(args) -> List[dict]:
+    ee = _import("extractors.edge_extractor")
+    te = _import("extractors.triple_extractor")
+    _need_minilm()
+    sents = corpus(args.n)
+    from benchmarks.stub_llm import _triples
+    triples = [[te.Triple(**t) for t in _triples(s)] for s in sents]
+    ee.warm_hv_cache(t for ts in triples for t in ts)
+    run = lambda: [ee.edges_from_triples(s, ts, "bench", i, {"eid": None, "alias_tier": -1}, [])
+                   for i, (s, ts) in enumerate(zip(sents, triples))]
+    return [measure("edges.from_triples", run, n=len(sents), repeat=args.repeat)]
+
+@suite("spacy")
+def bench_spacy(args) -> List[dict]:
+    _import("spacy")
+    from deps import models
+    try:
+        models.spacy_nlp("en_core_web_sm")
+    except OSError as e:
+        raise Skip(f"en_core_web_sm: {e}")
+    texts = [" ".join(corpus(4, seed=i)) for i in range(args.n // 4 or 1)]
+    out = []
+    for mod, fn in (("enhanced_event_extractor", "extract_events"),
+                    ("event_tuple_extractor", "extract_events"),
+                    ("fine_nested_event_extractor", "extract_nested_tuples")):
+        m = _import(mod)
+        per_text = getattr(m, fn)
+        out.append(measure(f"spacy.{mod}.per_text",
+                           lambda: [per_text(m.resolve_pronouns(t)) for t in texts],
+                           n=len(texts), repeat=args.repeat))
+        out.append(measure(f"spacy.{mod}.pipe", lambda: list(m.process_corpus(texts)),
+                           n=len(texts), repeat=args.repeat))
+    rx = _import("extractors.rule_extractor")
+    sents = corpus(args.n, seed=3)
+    res = rx.rule_triples_many(sents)
+    out.append(measure("spacy.rule_triples.pipe", lambda: rx.rule_triples_many(sents),
+                       n=len(sents), repeat=args.repeat,
+                       confident=sum(why is None for _, why in res) / len(sents)))
+    return out
+
+@suite("graph")
+def bench_graph(args) -> List[dict]:
+    import numpy as np
+    from deps import hd_packed
+    from deps.graph_store import GraphStore
+    rng = np.random.default_rng(0)
+    n_docs, per_doc = max(args.n // 4, 1), 4
+    out = []
+    for packed in (False, True):
+        tag = "packed" if packed else "dense"
+        hv  = rng.choice(np.array([-1, 1], np.int8), (256, hd_packed.D))
+        hv  = hd_packed.pack(hv) if packed else hv
+        def edge(i):
+            return {"edge_type": _TYPES[i % 3], "surface": hv[i % 256],
+                    "semantic": hv[(i * 7) % 256],
+                    "meta": {"fine_pred": f"p{i % 17}", "eid": f"Q{i % 101}",
+                             "subject": _ORGS[i % len(_ORGS)],
+                             "object": _CITIES[i % len(_CITIES)] if i % 2 else _ORGS[(i + 3) % len(_ORGS)]}}
+        def build():
+            g = GraphStore()
+            for d in range(n_docs):
+                for s in range(per_doc):
+                    g.add_edges(f"d{d}", s, "text", [edge(d * 13 + s * 3 + k) for k in range(3)])
+            return g
+        out.append(measure(f"graph.insert.{tag}", build, n=n_docs * per_doc,
+                           repeat=max(args.repeat // 2, 1)))
+        g = build()
+        out.append(measure(f"graph.search.{tag}", lambda: g.search(hv[3], 10),
+                           repeat=args.repeat * 4, edges=g.E.n))
+        out.append(measure(f"graph.search_docs.{tag}", lambda: g.search_docs(hv[3], 10),
+                           repeat=args.repeat * 4, docs=n_docs))
+        out.append(measure(f"graph.find.{tag}", lambda: g.find(edge_type=_TYPES[1], eid="Q7"),
+                           repeat=args.repeat * 4))
+        out.append(measure(f"graph.k_hop.{tag}", lambda: g.k_hop(_ORGS[0], 3, direction="both"),
+                           repeat=args.repeat * 4))
+        with tempfile.TemporaryDirectory() as tmp:
+            out.append(measure(f"graph.save.{tag}", lambda: g.save(Path(tmp) / "g"),
+                               repeat=args.repeat))
+            out.append(measure(f"graph.open_mmap.{tag}", lambda: GraphStore.open(Path(tmp) / "g"),
+                               repeat=args.repeat))
+    return out
+
+@suite("llm")
+def bench_llm(args) -> List[dict]:
+    te = _import("extractors.triple_extractor")
+    sents = corpus(args.n, seed=1)
+    out = []
+    for c in args.concurrency:
+        out.append(measure(f"llm.extract_many.c{c}",
+                           lambda: te.extract_triples_many(sents, concurrency=c),
+                           n=len(sents), repeat=args.repeat, warmup=0,
+                           stub_latency_ms=args.latency_ms))
+    c = max(args.concurrency)
+    for budget in (512, te.PACK_BUDGET):
+        windows = len(te._windows(sents, budget))
+        out.append(measure(f"llm.extract_packed.b{budget}",
+                           lambda: te.extract_triples_packed(sents, budget=budget, concurrency=c),
+                           n=len(sents), repeat=args.repeat, warmup=0,
+                           stub_latency_ms=args.latency_ms, requests=windows))
+    return out
+
+@suite("e2e")
+def bench_e2e(args) -> List[dict]:
+    ee = _import("extractors.edge_extractor")
+    te = _import("extractors.triple_extractor")
+    _need_minilm()
+    import ingest
+    sents = corpus(args.n, seed=2)
+    seq = sents[:max(args.n // 8, 1)]                 # the sync path is latency-bound
+    out = [measure("e2e.extract_sentence_graph",
+                   lambda: [ee.extract_sentence_graph(s, f"d{i}", 0) for i, s in enumerate(seq)],
+                   n=len(seq), repeat=1, warmup=0, stub_latency_ms=args.latency_ms)]
+    variants = [("", {}), (".merged", {"inventory": ee.inventory})]
+    try:
+        _import("spacy")
+        from deps import models
+        models.spacy_nlp("en_core_web_sm")
+        variants.append((".cascade", {"rules": ee.rule_pass}))
+    except (Skip, OSError) as e:
+        out.append({"name": "e2e.ingest_stages.cascade", "skipped": str(e)})
+    for tag, kw in variants:
+        def stream():
+            items = ((f"d{i // 4}", i % 4, s) for i, s in enumerate(sents))
+            items = ingest.normalise(items, ee)
+            items = ingest.extract(items, te, batch=64, concurrency=max(args.concurrency),
+                                   rate=None, **kw)
+            return sum(1 for _ in ingest.encode(items, ee))
+        out.append(measure("e2e.ingest_stages" + tag, stream,
+                           n=len(sents), repeat=1, warmup=0, stub_latency_ms=args.latency_ms))
+    return out
+
+# ───────────────────────────────────────────────────────────────
+# runner
+# ───────────────────────────────────────────────────────────────
+def _meta(args) -> dict:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, cwd=Path(__file__).parent).stdout.strip()
+    except OSError:
+        rev = ""
+    import numpy as np
+    return {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "git": rev,
+            "python": platform.python_version(), "numpy": np.__version__,
+            "machine": platform.machine(), "cpus": os.cpu_count(),
+            "n": args.n, "repeat": args.repeat,
+            "stub": {"latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms}}
+
+def compare(results: List[dict], base_path: Path, tolerance: float) -> List[str]:
+    base = {r["name"]: r for r in json.loads(base_path.read_text())["results"]
+            if "ops_per_s" in r}
+    worse = []
+    for r in results:
+        b = base.get(r["name"])
+        if b and "ops_per_s" in r and r["ops_per_s"] < b["ops_per_s"] * (1 - tolerance):
+            worse.append(f"{r['name']}: {r['ops_per_s']:.1f}/s vs {b['ops_per_s']:.1f}/s "
+                         f"({r['ops_per_s'] / b['ops_per_s'] - 1:+.0%})")
+    return worse
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="HydraLink offline benchmark suite.")
+    ap.add_argument("--suites", nargs="*", default=list(SUITES), choices=list(SUITES))
+    ap.add_argument("--n", type=int, default=512, help="sentences / items per suite")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--latency-ms", type=float, default=50.0, help="stub LLM latency")
+    ap.add_argument("--jitter-ms", type=float, default=10.0)
+    ap.add_argument("--concurrency", type=int, nargs="*", default=[1, 16, 64])
+    ap.add_argument("--out", type=Path, help="write JSON here (default: stdout)")
+    ap.add_argument("--compare", type=Path, help="baseline JSON from an earlier run")
+    ap.add_argument("--tolerance", type=float, default=0.10,
+                    help="allowed fractional ops_per_s drop before failing")
+    ap.add_argument("--metrics", action="store_true",
+                    help="enable deps.metrics and embed its per-stage breakdown in the output")
+    args = ap.parse_args(argv)
+
+    from deps import metrics
+    metrics.enable(args.metrics)
+
+    with StubLLM(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms) as stub:
+        # must be set before anything imports deps.deepinfra_client / deps.llm_cache
+        os.environ["DEEPINFRA_BASE_URL"] = stub.base_url
+        os.environ.setdefault("DEEPINFRA_TOKEN", "stub")
+        os.environ["HYDRA_LLM_CACHE"] = "off"
+        try:
+            import deps.edge_type_service as ets
+            ets.PERSIST = False                       # keep resources/edge_types.* clean
+        except ImportError:
+            pass
+
+        results: List[dict] = []
+        for name in args.suites:
+            t0 = time.perf_counter()
+            try:
+                rows = SUITES[name](args)
+            except Skip as e:
+                rows = [{"name": name, "skipped": str(e)}]
+            print(f"[bench] {name}: {len(rows)} result(s) in {time.perf_counter() - t0:.1f}s",
+                  file=sys.stderr)
+            results.extend(rows)
+        meta = {**_meta(args), "stub_requests": stub.requests}
+        if args.metrics:
+            meta["metrics"] = metrics.to_json()
+
+    doc = json.dumps({"meta": meta, "results": results}, indent=2)
+    if args.out:
+        args.out.write_text(doc)
+    else:
+        print(doc)
+    if args.compare:
+        worse = compare(results, args.compare, args.tolerance)
+        for w in worse:
+            print(f"[bench] REGRESSION {w}", file=sys.stderr)
+        return 1 if worse else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+benchmarks/stub_llm.py
+──────────────────────
+Local OpenAI-compatible stand-in for DeepInfra (POST …/chat/completions).
+
+  • configurable latency (+ uniform jitter) per request, threaded server
+  • optional injected 429s (with Retry-After) to exercise backoff
+  • canned replies: first rule whose `match` is a substring of the prompt
+    wins; otherwise a built-in responder answers our three prompt shapes
+      triple extraction   → one {"subject","predicate","object"} per sentence
+                            (+ "abstract": "NEW: <predicate>" for the merged prompt,
+                             + "i": <n> per numbered sentence for the packed prompt)
+      Dict-B single       → "NEW: <predicate>"
+      Dict-B batch        → {"<predicate>": "NEW: <predicate>", …}
+
+Point the pipeline at it with DEEPINFRA_BASE_URL=<stub.base_url> *before*
+importing deps.deepinfra_client.
+
+CLI:
+    python -m benchmarks.stub_llm --port 8765 --latency-ms 200 --jitter-ms 50
+    python -m benchmarks.stub_llm --responses canned.json   # [{"match": …, "content": …}]
+"""
+from __future__ import annotations
+import argparse, json, random, re, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+_PASSIVE = re.compile(r"^(?P<obj>.+?)\s+was\s+(?P<verb>\w+)\s+by\s+(?P<subj>.+)$", re.I)
+
+# ───────────────────────────────────────────────────────────────
+# built-in responder
+# ───────────────────────────────────────────────────────────────
+def _triples(sentence: str) -> List[Dict[str, str]]:
+    out = []
+    for s in re.split(r"(?<=[.!?])\s+", sentence.strip()):
+        s = s.strip().rstrip(".!?")
+        if m := _PASSIVE.match(s):
+            out.append({"subject": m["subj"], "predicate": f"{m['verb']}_by", "object": m["obj"]})
+            continue
+        w = s.split()
+        if len(w) >= 3:
+            out.append({"subject": w[0], "predicate": w[1], "object": " ".join(w[2:])})
+    return out
+
+_NUMBERED = re.compile(r"^\[(\d+)\]\s+(.*)$", re.M)
+
+def default_reply(prompt: str) -> str:
+    if "(subject, predicate, object)" in prompt:
+        body = prompt.rsplit("\n\n", 1)[-1]
+        if "EACH numbered sentence" in prompt:             # packed prompt
+            triples = [{"i": int(k), **t} for k, s in _NUMBERED.findall(body)
+                       for t in _triples(s)]
+        else:
+            triples = _triples(body)
+        if '"abstract"' in prompt:                     # merged typed prompt
+            for t in triples:
+                t["abstract"] = "NEW: " + t["predicate"].replace(" ", "_")
+        return json.dumps(triples)
+    if "Predicates:\n" in prompt:
+        block = prompt.split("Predicates:\n", 1)[1].split("\n\n", 1)[0]
+        preds = [ln[2:].strip() for ln in block.splitlines() if ln.startswith("- ")]
+        return json.dumps({p: f"NEW: {p.replace(' ', '_')}" for p in preds})
+    if m := re.search(r'Predicate: "(.+?)"', prompt):
+        return "NEW: " + m[1].replace(" ", "_")
+    return "[]"
+
+# ───────────────────────────────────────────────────────────────
+# server
+# ───────────────────────────────────────────────────────────────
+class StubLLM:
+    """`with StubLLM(latency_ms=100) as stub: os.environ[…] = stub.base_url`"""
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, *,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, responses: Optional[List[dict]] = None,
+                 seed: int = 0):
+        self.latency_ms, self.jitter_ms, self.error_rate = latency_ms, jitter_ms, error_rate
+        self.responses = responses or []
+        self.requests  = 0
+        self._rng  = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def reply(self, prompt: str) -> str:
+        for rule in self.responses:
+            if rule["match"] in prompt:
+                return rule["content"]
+        return default_reply(prompt)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"                 # keep-alive for pooled clients
+
+            def log_message(self, *a):                    # quiet
+                pass
+
+            def _send(self, code: int, body: dict, headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                req = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    return self._send(404, {"error": {"message": f"no route {self.path}"}})
+                with stub._lock:
+                    stub.requests += 1
+                    delay = stub.latency_ms + stub._rng.uniform(0, stub.jitter_ms)
+                    fail  = stub._rng.random() < stub.error_rate
+                time.sleep(delay / 1000)
+                if fail:
+                    return self._send(429, {"error": {"message": "rate limited (stub)"}},
+                                      {"Retry-After": "0.05"})
+                prompt  = "\n".join(str(m.get("content", "")) for m in req.get("messages", []))
+                content = stub.reply(prompt)
+                self._send(200, {
+                    "id": f"stub-{stub.requests}", "object": "chat.completion",
+                    "created": int(time.time()), "model": req.get("model", "stub"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": len(prompt) // 4,
+                              "completion_tokens": len(content) // 4,
+                              "total_tokens": (len(prompt) + len(content)) // 4},
+                })
+
+        return Handler
+
+    def start(self) -> "StubLLM":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "StubLLM":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="OpenAI-compatible stub LLM server.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of 429 replies")
+    ap.add_argument("--responses", type=Path, help='JSON list of {"match", "content"} rules')
+    args = ap.parse_args(argv)
+    rules = json.loads(args.responses.read_text()) if args.responses else None
+    stub = StubLLM(args.host, args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                   error_rate=args.error_rate, responses=rules)
+    print(f"stub LLM on {stub.base_url}  (DEEPINFRA_BASE_URL={stub.base_url})")
+    try:
+        stub._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+deps/alias_index.py
+───────────────────
+Compiled Tier-0 alias dictionary: one sorted, memory-mapped string table.
+
+File layout (native byte order, little-endian on every supported host):
+
+  b"HLALIAS1"                     magic
+  uint64  n                       number of keys
+  uint64  key_off[n+1]            byte offsets into the key blob
+  uint64  val_off[n+1]            byte offsets into the value blob
+  bytes   keys                    lower-cased UTF-8 keys, sorted bytewise
+  bytes   vals                    UTF-8 canonical values
+
+Opening costs one mmap (no parsing); lookups are a binary search over the
+offset arrays, and every process maps the same pages from the page cache.
+
+Build:
+    python -m deps.alias_index build            # resources/aliases/*.tsv → resources/aliases.idx
+    python -m deps.alias_index lookup "Zest Air"
+"""
+from __future__ import annotations
+import argparse, mmap, struct, sys
+from array import array
+from pathlib import Path
+from typing import Dict, Optional
+
+HERE  = Path(__file__).resolve().parent
+RES   = HERE.parent.parent / "resources"
+MAGIC = b"HLALIAS1"
+_HDR  = 16                                           # magic + n
+
+# ───────────────────────────────────────────────────────────────
+# reader
+# ───────────────────────────────────────────────────────────────
+class AliasIndex:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:8] != MAGIC:
+            raise ValueError(f"{path}: not an alias index")
+        (self.n,) = struct.unpack_from("<Q", self._mm, 8)
+        offs = memoryview(self._mm)[_HDR:_HDR + 16 * (self.n + 1)].cast("Q")
+        self._koff = offs[:self.n + 1]
+        self._voff = offs[self.n + 1:]
+        self._kbase = _HDR + 16 * (self.n + 1)
+        self._vbase = self._kbase + self._koff[self.n]
+
+    @classmethod
+    def open_if_exists(cls, path: Path) -> Optional["AliasIndex"]:
+        return cls(path) if Path(path).exists() else None
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _key(self, i: int) -> bytes:
+        return self._mm[self._kbase + self._koff[i]: self._kbase + self._koff[i + 1]]
+
+    def get(self, key: str) -> Optional[str]:
+        """Exact lookup of an (already lower-cased) key."""
+        k, lo, hi = key.encode("utf8"), 0, self.n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < k:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n and self._key(lo) == k:
+            return self._mm[self._vbase + self._voff[lo]:
+                            self._vbase + self._voff[lo + 1]].decode("utf8")
+        return None
+
+# ───────────────────────────────────────────────────────────────
+# builder
+# ───────────────────────────────────────────────────────────────
+def build(src: Path, out: Path) -> int:
+    """Compile every `src/*.tsv` shard (alias<TAB>canonical) into `out`."""
+    table: Dict[bytes, bytes] = {}
+    for shard in sorted(Path(src).glob("*.tsv")):
+        for ln in shard.read_text(encoding="utf8").splitlines():
+            k, sep, v = ln.partition("\t")
+            if sep:
+                table[k.lower().encode("utf8")] = v.encode("utf8")   # last wins, as dict() did
+    keys = sorted(table)
+    koff, voff, pos = [0], [0], 0
+    for k in keys:
+        pos += len(k); koff.append(pos)
+    pos = 0
+    for k in keys:
+        pos += len(table[k]); voff.append(pos)
+
+    tmp = Path(out).with_suffix(".tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(MAGIC + struct.pack("<Q", len(keys)))
+        fh.write(array("Q", koff).tobytes())           # native order == reader's cast("Q")
+        fh.write(array("Q", voff).tobytes())
+        for k in keys:
+            fh.write(k)
+        for k in keys:
+            fh.write(table[k])
+    tmp.replace(out)
+    return len(keys)
+
+def main(argv=None):
+    ap  = argparse.ArgumentParser(description="Compile / query the Tier-0 alias index.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build")
+    b.add_argument("--src", type=Path, default=RES / "aliases")
+    b.add_argument("--out", type=Path, default=RES / "aliases.idx")
+    q = sub.add_parser("lookup")
+    q.add_argument("token")
+    q.add_argument("--index", type=Path, default=RES / "aliases.idx")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "build":
+        n = build(args.src, args.out)
+        print(f"{n} aliases → {args.out}")
+    else:
+        print(AliasIndex(args.index).get(args.token.lower()))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,7 +15,7 @@ from __future__ import annotations
 import re, hashlib, warnings
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 # ───────────────────────────────────────────────────────────────
 # Optional heavy deps
@@ -24,18 +24,23 @@ try:
     import faiss
 except ImportError:
     faiss = None                                      # Tier-2 disabled
-try:
-    from sentence_transformers import SentenceTransformer
-except ImportError:
-    SentenceTransformer = None                        # Tier-1 disabled
+# MiniLM comes from the shared lazy registry (None → Tier-1/2 disabled)
+from deps.models import minilm as _minilm
+
+from deps.alias_index import AliasIndex
+from deps import metrics
 
 HERE = Path(__file__).resolve().parent
 RES  = HERE.parent.parent / "resources"
 RES.mkdir(exist_ok=True)
 
 # ───────────────────────────────────────────────────────────────
-# Tier-0  ▸  exact dictionary  (256 shards)
+# Tier-0  ▸  exact dictionary
+#   compiled mmap index (python -m deps.alias_index build) if present,
+#   else the 256 TSV shards
 # ───────────────────────────────────────────────────────────────
+_ALIAS_IDX = AliasIndex.open_if_exists(RES / "aliases.idx")
+
 @lru_cache(maxsize=256)
 def _load_shard(prefix: str) -> Dict[str, str]:
     shard = RES / "aliases" / f"{prefix}.tsv"
@@ -45,25 +50,36 @@ def _load_shard(prefix: str) -> Dict[str, str]:
             (ln.split("\t", 1) for ln in shard.read_text(encoding="utf8").splitlines())}
 
 def _exact_lookup(token: str) -> Optional[str]:
+    if _ALIAS_IDX is not None:
+        return _ALIAS_IDX.get(token.lower())
     prefix = hashlib.sha1(token.encode()).hexdigest()[:2]
     return _load_shard(prefix).get(token.lower())
 
 # ───────────────────────────────────────────────────────────────
 # Tier-1  ▸  in-document fuzzy  (MiniLM cosine)
 # ───────────────────────────────────────────────────────────────
-_MINILM = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2") if SentenceTransformer else None
+_WORD   = re.compile(r"\w")
 _FUZZY_THRESH = 0.85
 
 def _fuzzy_lookup(token: str, doc) -> Optional[str]:
-    if not (_MINILM and doc and doc.vecs.size):
+    if not (_minilm() and doc and doc.vecs.size):
         return None
-    q = _MINILM.encode(token, normalize_embeddings=True)
+    q = _minilm().encode(token, normalize_embeddings=True)
     sims = doc.vecs @ q
     idx  = sims.argmax()
     if sims[idx] > _FUZZY_THRESH:
         return doc.spans[idx]
     return None
 
+def _fuzzy_lookup_many(Q, doc) -> List[Optional[str]]:
+    """Batched T1: `Q` is (m, 384) normalised token embeddings."""
+    if not (doc and doc.vecs.size and len(Q)):
+        return [None] * len(Q)
+    sims = Q @ doc.vecs.T                                  # (m, spans)
+    idx  = sims.argmax(axis=1)
+    best = sims[range(len(Q)), idx]
+    return [doc.spans[i] if s > _FUZZY_THRESH else None for i, s in zip(idx, best)]
+
 class _DocIndex:
     """Tiny per-document in-memory HNSW surrogate."""
     def __init__(self, text: str):
@@ -71,35 +87,46 @@ class _DocIndex:
         spans = re.findall(r"\b([A-Z][\w\-]{2,}(?:\s+[A-Z][\w\-]{2,}){0,4})", text)
         spans = list(dict.fromkeys(spans))
         self.spans = spans
-        self.vecs  = _MINILM.encode(spans, normalize_embeddings=True) if spans else np.empty((0, 384))
+        self.vecs  = _minilm().encode(spans, normalize_embeddings=True) if spans else np.empty((0, 384))
 
 # ───────────────────────────────────────────────────────────────
 # Tier-2  ▸  global KB entity linker  (optional)
 # ───────────────────────────────────────────────────────────────
-_KB = _KB_EMB = _KB_IDS = None
+_KB = _KB_IDS = None
 def _lazy_load_kb():
-    global _KB, _KB_EMB, _KB_IDS
+    """Prebuilt ANN index (python -m deps.kb_index build) else exact flat."""
+    global _KB, _KB_IDS
     if _KB or not faiss:
         return
     try:
         import numpy as np
-        _KB_EMB = np.load(RES / "kb_emb.npy")          # (N, 384)
+        from deps import kb_index
         _KB_IDS = (RES / "kb_ids.txt").read_text().splitlines()
-        _KB = faiss.IndexFlatIP(_KB_EMB.shape[1])
-        _KB.add(_KB_EMB)
+        _KB = kb_index.load()
+        if _KB is None:                                # small KB: build in-process
+            _KB = kb_index.build(np.load(RES / "kb_emb.npy"), "flat")   # (N, 384)
     except Exception as e:
         warnings.warn(f"[alias_service] KB load failed: {e}; Tier-2 disabled")
 
 def _link_global(token: str) -> Tuple[Optional[str], Optional[str]]:
     _lazy_load_kb()
-    if not (_KB and _MINILM):
+    if not (_KB and _minilm()):
         return None, None
-    q = _MINILM.encode(token, normalize_embeddings=True).reshape(1, -1)
+    q = _minilm().encode(token, normalize_embeddings=True).reshape(1, -1)
     sim, idx = _KB.search(q, 1)
     if sim[0, 0] < 0.6:
         return None, None
     return _KB_IDS[idx[0, 0]], token
 
+def _link_global_many(tokens: List[str], Q) -> List[Tuple[Optional[str], Optional[str]]]:
+    """Batched T2: one FAISS search for all `tokens` (embeddings `Q`)."""
+    _lazy_load_kb()
+    if not (_KB and _minilm() and tokens):
+        return [(None, None)] * len(tokens)
+    sim, idx = _KB.search(Q, 1)
+    return [(_KB_IDS[i], t) if s >= 0.6 else (None, None)
+            for t, s, i in zip(tokens, sim[:, 0], idx[:, 0])]
+
 # ───────────────────────────────────────────────────────────────
 # Public resolver
 # ───────────────────────────────────────────────────────────────
@@ -109,9 +136,50 @@ class AliasResolver:
     Methods
     -------
     resolve(token:str) -> (canonical:str, eid:str|None, tier:int)
+    resolve_many(tokens)  -> list of the above, batched + memoised
     """
     def __init__(self, doc_text: str | None = None):
-        self.doc = _DocIndex(doc_text) if (doc_text and _MINILM) else None
+        self.doc = _DocIndex(doc_text) if (doc_text and _minilm()) else None
+        self._memo: Dict[str, Tuple[str, Optional[str], int]] = {}
+
+    def clear_memo(self):
+        """Drop memoised results (call at document/batch boundaries)."""
+        self._memo.clear()
+
+    # ------------------------------------------------------------------
+    def resolve_many(self, tokens: Iterable[str]) -> List[Tuple[str, Optional[str], int]]:
+        """
+        Batched `resolve`: non-word fragments pass through untouched, unique
+        T0 misses share ONE MiniLM encode, T1 is one matrix product and T2
+        one FAISS search.  Results are memoised on this resolver.
+        """
+        tokens = list(tokens)
+        todo = [t for t in dict.fromkeys(tokens)
+                if t not in self._memo and _WORD.search(t)]
+        miss = []
+        with metrics.timer("stage_seconds", stage="alias_t0"):
+            for t in todo:                                   # T0 exact
+                hit = _exact_lookup(t)
+                if hit:
+                    self._memo[t] = (hit, None, 0)
+                else:
+                    miss.append(t)
+        if miss and _minilm():
+            with metrics.timer("stage_seconds", stage="alias_t1"):
+                Q = _minilm().encode(miss, normalize_embeddings=True)
+                fuzzy = _fuzzy_lookup_many(Q, self.doc)      # T1
+            for t, hit in zip(miss, fuzzy):
+                if hit:
+                    self._memo[t] = (hit, None, 1)
+            rest = [i for i, h in enumerate(fuzzy) if not h]
+            with metrics.timer("stage_seconds", stage="alias_t2"):
+                linked = _link_global_many([miss[i] for i in rest], Q[rest])   # T2
+            for i, (eid, canon) in zip(rest, linked):
+                self._memo[miss[i]] = (canon, eid, 2) if eid else (miss[i], None, -1)
+        else:
+            for t in miss:
+                self._memo[t] = (t, None, -1)
+        return [self._memo.get(t) or (t, None, -1) for t in tokens]
 
     # ------------------------------------------------------------------
     def resolve(self, token: str) -> Tuple[str, Optional[str], int]:
@@ -1,15 +1,56 @@
 # deps/deepinfra_client.py
 from typing import Final
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 
 # put your real token in an env-var; fall back to the old hard-code
-import os
+import os, asyncio, weakref
+import httpx
 DEEPINFRA_API_TOKEN: Final[str] = os.getenv(
     "DEEPINFRA_TOKEN",
     "7zQEIIApTNJ37jYJHI8Yl8fWyOPe9Drn"  # fallback
 )
+# point at a local OpenAI-compatible stand-in for offline runs/tests
+DEEPINFRA_BASE_URL: Final[str] = os.getenv(
+    "DEEPINFRA_BASE_URL",
+    "https://api.deepinfra.com/v1/openai"
+)
+MAX_CONNECTIONS = int(os.getenv("DEEPINFRA_MAX_CONNECTIONS", "64"))
 
 client = OpenAI(
     api_key = DEEPINFRA_API_TOKEN,
-    base_url="https://api.deepinfra.com/v1/openai",
+    base_url=DEEPINFRA_BASE_URL,
 )
+
+# async client: one shared connection pool per event loop
+# (httpx pools cannot outlive the loop they were created on)
+_ACLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = \
+    weakref.WeakKeyDictionary()
+
+def get_aclient() -> AsyncOpenAI:
+    loop = asyncio.get_running_loop()
+    ac = _ACLIENTS.get(loop)
+    if ac is None:
+        ac = _ACLIENTS[loop] = AsyncOpenAI(
+            api_key = DEEPINFRA_API_TOKEN,
+            base_url=DEEPINFRA_BASE_URL,
+            max_retries=0,                     # backoff handled by callers
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS,
+                                    max_keepalive_connections=MAX_CONNECTIONS),
+                timeout=httpx.Timeout(60.0, connect=10.0),
+            ),
+        )
+    return ac
+
+async def aclose_aclient() -> None:
+    """Close the running loop's client (its sockets die with the loop anyway)."""
+    ac = _ACLIENTS.pop(asyncio.get_running_loop(), None)
+    if ac is not None:
+        await ac.close()
+
+async def run_closing(coro):
+    """Await `coro`, then close this loop's client: for `asyncio.run(...)` wrappers."""
+    try:
+        return await coro
+    finally:
+        await aclose_aclient()
@@ -4,25 +4,37 @@ deps/edge_type_service.py
 ─────────────────────────
 Two-pass resolver  (Dict-A ➜ Dict-B/LLM)  **with logging**.
 
+On a Dict-A miss the predicate is ranked against known fine predicates and
+type names (deps.predicate_index, MiniLM).  A top-1 similarity of at least
+AUTO_ACCEPT is taken without the LLM; otherwise only the SHORTLIST_K best
+candidate types go into the Dict-B prompt.  `shortlist_stats()` reports
+hit / threshold statistics for tuning.  Without MiniLM the whole pool is
+sent, as before.
+
 Returns
 -------
 abstract  : str    # chosen abstract edge type
 created   : bool   # True if a NEW mapping was added
-source    : str    # 'A' (seed/persistent)  or  'B' (LLM decision)
+source    : str    # 'A' (seed/persistent), 'E' (embedding auto-accept)
+                   # or 'B' (LLM decision)
 
 If you pass a `trace: list[str]`, short log lines are appended.
 """
 from __future__ import annotations
-import json, threading
+import json, threading, warnings
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Tuple
 
 from deps.deepinfra_client import client
+from deps.llm_cache import CACHE, make_key
+from deps.journal   import JournalDict
+from deps.predicate_index import PredicateIndex
+from deps import metrics
 
 HERE = Path(__file__).resolve().parent
 RES  = HERE.parent.parent / "resources";  RES.mkdir(exist_ok=True)
 DICT_PATH = RES / "edge_types.json"
-_LOCK = threading.Lock()
 
 # ---------- 0) static seed rules -------------------------------------------
 _SEED_MAP = {
@@ -34,14 +46,12 @@ _SEED_MAP = {
     "acquired_by":  "acquired_by",
 }
 
-# ---------- helpers ---------------------------------------------------------
-def _load_dict() -> Dict[str, str]:
-    return json.loads(DICT_PATH.read_text()) if DICT_PATH.exists() else {}
-
-def _save_dict(d: Dict[str, str]):
-    DICT_PATH.write_text(json.dumps(d, indent=2, ensure_ascii=False))
+# ---------- persistent Dict-A  (snapshot + append-only journal) -------------
+# edge_types.json is the snapshot; each new mapping is one line appended to
+# edge_types.journal and folded back in by periodic compaction.
+_EDGE_DICT: Dict[str, str] = JournalDict(DICT_PATH)
 
-_EDGE_DICT: Dict[str, str] = _load_dict()
+_MODEL = "mistralai/Mixtral-8x7B-Instruct-v0.1"
 
 _PROMPT = (
     "Abstract edge types so far:\n{types}\n\n"
@@ -50,40 +60,89 @@ _PROMPT = (
     "NEW: <short_name> if a new abstract type is needed."
 )
 
-# ---------- public ----------------------------------------------------------
-def resolve_predicate(pred: str,
-                      abstract_pool: List[str],
-                      trace: List[str] | None = None
-                      ) -> Tuple[str, bool, str]:
-    """
-    Two-pass: Dict-A (seed+persist) else Dict-B (LLM).
-    """
-    p = pred.lower()
-    if trace is not None: trace.append(f"▶ resolving '{pred}'")
+_BATCH_PROMPT = (
+    "Abstract edge types so far:\n{types}\n\n"
+    "Predicates:\n{preds}\n\n"
+    "For EACH predicate choose an existing type *verbatim*, or\n"
+    "\"NEW: <short_name>\" if a new abstract type is needed.\n"
+    "Reply with a JSON object mapping every predicate to its answer — no commentary."
+)
 
-    # A-1 seed
-    if p in _SEED_MAP:
-        if trace is not None: trace.append(f"Dict-A hit (seed) → {_SEED_MAP[p]}")
-        return _SEED_MAP[p], False, "A"
+# ---------- Dict-B bookkeeping ----------------------------------------------
+# PERSIST=False keeps new mappings in this process only (parallel build
+# workers); ADDITIONS records every Dict-B decision in order either way.
+PERSIST = True
+ADDITIONS: List[Tuple[str, str]] = []
+_BASELINE: Dict[str, str] | None = None      # Dict-A as first seen by reset_local()
 
-    # A-2 persistent
-    if p in _EDGE_DICT:
-        if trace is not None: trace.append(f"Dict-A hit (persist) → {_EDGE_DICT[p]}")
-        return _EDGE_DICT[p], False, "A"
+# ---------- embedding shortlist / auto-accept -------------------------------
+AUTO_ACCEPT = 0.85        # top-1 cosine at or above → mapped without the LLM (>1 disables)
+SHORTLIST_K = 8           # candidate types per Dict-B prompt (0 → whole pool)
+_INDEX = PredicateIndex()
+
+# ---------- single-flight registry -----------------------------------------
+# normalised predicate → Future[(abstract, created)] of the call in flight
+_INFLIGHT: Dict[str, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
 
-    # B) ask LLM
+def _claim(preds: Iterable[str]) -> Tuple[List[str], Dict[str, Future]]:
+    """Split `preds` into ones we now lead and futures led by others."""
+    mine, theirs = [], {}
+    with _INFLIGHT_LOCK:
+        for p in preds:
+            fut = _INFLIGHT.get(p)
+            if fut is None:
+                _INFLIGHT[p] = Future()
+                mine.append(p)
+            else:
+                theirs[p] = fut
+    return mine, theirs
+
+def _settle(p: str, result: Tuple[str, bool] | None = None,
+            exc: BaseException | None = None):
+    with _INFLIGHT_LOCK:
+        fut = _INFLIGHT.pop(p)
+    if exc is not None:
+        fut.set_exception(exc)
+    else:
+        fut.set_result(result)
+
+# ---------- helpers ---------------------------------------------------------
+def _ask(msg: str, max_tokens: int, fallback: str | None,
+         trace: List[str] | None) -> str | None:
+    """Cached temperature-0 LLM call; `fallback` when offline (not cached)."""
+    req = dict(
+        model=_MODEL,
+        messages=[{"role": "user", "content": msg}],
+        temperature=0.0,
+        max_tokens=max_tokens,
+    )
+    key = make_key(req)
     try:
-        msg = _PROMPT.format(types="\n".join(abstract_pool) or "(none yet)", pred=pred)
-        resp = client.chat.completions.create(
-            model="mistralai/Mixtral-8x7B-Instruct-v0.1",
-            messages=[{"role": "user", "content": msg}],
-            temperature=0.0,
-            max_tokens=16,
-        )
+        ans = CACHE.get(key)
+    except Exception as e:               # locked / unreadable cache → just ask
+        warnings.warn(f"LLM cache read failed: {e}")
+        ans = None
+    if ans is not None:
+        if trace is not None: trace.append("Dict-B cache hit")
+        return ans
+    try:
+        with metrics.timer("stage_seconds", stage="predicate_llm"):
+            resp = client.chat.completions.create(**req)
+        metrics.record_llm("edge_type", resp)
         ans = resp.choices[0].message.content.strip()
     except Exception:
-        ans = "NEW: " + pred        # offline fallback
+        metrics.record_llm("edge_type", ok=False)
+        return fallback
+    try:                                 # a failed write must not discard the answer
+        CACHE.put(key, ans)
+    except Exception as e:
+        warnings.warn(f"LLM cache write failed: {e}")
+    return ans
 
+def _decide(p: str, ans: str, trace: List[str] | None) -> Tuple[str, bool]:
+    """Parse an answer, persist it in Dict-A, return (abstract, created)."""
+    ans = str(ans).strip()
     if ans.lower().startswith("new:"):
         abstract = ans[4:].strip()
         created  = True
@@ -93,9 +152,256 @@ def resolve_predicate(pred: str,
         created  = False
         if trace is not None: trace.append(f"Dict-B mapped → {abstract}")
 
-    # persist
-    with _LOCK:
+    # persist  (one journal line; JournalDict handles thread/process locking)
+    with _INFLIGHT_LOCK:
+        ADDITIONS.append((p, abstract))
+    if PERSIST:
         _EDGE_DICT[p] = abstract
-        _save_dict(_EDGE_DICT)
+    else:
+        dict.__setitem__(_EDGE_DICT, p, abstract)     # process-local only
+    return abstract, created
+
+def drain_additions() -> List[Tuple[str, str]]:
+    """Return and clear the Dict-B decisions made since the last drain."""
+    with _INFLIGHT_LOCK:
+        out = ADDITIONS[:]
+        ADDITIONS.clear()
+    return out
+
+def reset_local():
+    """
+    PERSIST=False workers: drop every process-local Dict-B decision (back to
+    Dict-A as it was at the first call) and the shortlist index built on
+    them, so each task decides independently of tasks this process ran
+    before.  The first call only records the baseline.
+    """
+    global _BASELINE
+    with _INFLIGHT_LOCK:
+        if _BASELINE is None:
+            _EDGE_DICT.refresh()
+            _BASELINE = dict(_EDGE_DICT)
+        else:
+            dict.clear(_EDGE_DICT)
+            dict.update(_EDGE_DICT, _BASELINE)
+        ADDITIONS.clear()
+    _INDEX.clear_entries()
+
+def persist_mappings(pairs: Iterable[Tuple[str, str]]):
+    """Write reconciled mappings (e.g. merged from parallel workers) to Dict-A."""
+    for p, abstract in pairs:
+        if _EDGE_DICT.get(p) != abstract:
+            _EDGE_DICT[p] = abstract
+
+def _dict_a(p: str, trace: List[str] | None) -> str | None:
+    # A-1 seed
+    if p in _SEED_MAP:
+        if trace is not None: trace.append(f"Dict-A hit (seed) → {_SEED_MAP[p]}")
+        metrics.inc("dict_a_total", source="seed")
+        return _SEED_MAP[p]
 
+    # A-2 persistent  (re-check other processes' journal lines on a miss)
+    if p not in _EDGE_DICT:
+        _EDGE_DICT.refresh()
+    if p in _EDGE_DICT:
+        if trace is not None: trace.append(f"Dict-A hit (persist) → {_EDGE_DICT[p]}")
+        metrics.inc("dict_a_total", source="persist")
+        return _EDGE_DICT[p]
+    metrics.inc("dict_a_total", source="miss")
+    return None
+
+def _rank(p: str, abstract_pool: List[str]) -> List[Tuple[str, float]] | None:
+    """
+    Candidate types for `p`, best first: within `abstract_pool` when one is
+    given, else among every type Dict-A knows.  None → no index (MiniLM
+    missing or shortlisting disabled).
+    """
+    if SHORTLIST_K <= 0 and AUTO_ACCEPT > 1:
+        return None
+    _INDEX.sync(len(_EDGE_DICT), lambda: [*_SEED_MAP.items(), *_EDGE_DICT.items()])
+    return _INDEX.rank(p, abstract_pool or None, max(SHORTLIST_K, 1))
+
+def _auto(p: str, ranked: List[Tuple[str, float]] | None,
+          trace: List[str] | None) -> Tuple[str, bool] | None:
+    """Accept the top-1 candidate if it clears AUTO_ACCEPT (persisted like Dict-B)."""
+    if not ranked or ranked[0][1] < AUTO_ACCEPT:
+        return None
+    abstract, score = ranked[0]
+    if trace is not None: trace.append(f"Dict-E auto ({score:.2f}) → {abstract}")
+    _INDEX.record("auto", score)
+    return _decide(p, abstract, None)
+
+def _shortlist(ranked: List[Tuple[str, float]] | None, abstract_pool: List[str]) -> List[str]:
+    if ranked is None or SHORTLIST_K <= 0:
+        return list(abstract_pool)
+    return [a for a, _ in ranked[:SHORTLIST_K]]
+
+def _note(ranked: List[Tuple[str, float]] | None, shown: List[str],
+          abstract: str, created: bool):
+    """Record how the LLM's answer relates to the shortlist it was shown."""
+    if ranked is None:
+        _INDEX.record("off")
+        return
+    top1 = ranked[0][1] if ranked else None
+    agreed = bool(ranked) and abstract == ranked[0][0]
+    outcome = ("new" if created else "agree" if agreed else
+               "hit" if abstract in shown else "miss")
+    _INDEX.record(outcome, top1, agreed=agreed)
+
+def _resolve_led(p: str, pred: str, abstract_pool: List[str],
+                 trace: List[str] | None) -> Tuple[str, bool, str]:
+    """Single-predicate Dict-E / Dict-B for a predicate this caller leads."""
+    try:
+        ranked = _rank(p, abstract_pool)
+        if (result := _auto(p, ranked, trace)) is not None:
+            _settle(p, result)
+            return (*result, "E")
+        shown = _shortlist(ranked, abstract_pool)
+        msg = _PROMPT.format(types="\n".join(shown) or "(none yet)", pred=pred)
+        result = _decide(p, _ask(msg, 16, "NEW: " + pred, trace), trace)
+        _note(ranked, shown, *result)
+    except BaseException as e:
+        _settle(p, exc=e)
+        raise
+    _settle(p, result)
+    return (*result, "B")
+
+def shortlist_stats() -> Dict[str, object]:
+    """Auto-accept / shortlist outcomes and per-threshold precision (see deps.predicate_index)."""
+    return {"auto_accept": AUTO_ACCEPT, "shortlist_k": SHORTLIST_K, **_INDEX.stats()}
+
+# ---------- public ----------------------------------------------------------
+def resolve_predicate(pred: str,
+                      abstract_pool: List[str],
+                      trace: List[str] | None = None
+                      ) -> Tuple[str, bool, str]:
+    """
+    Two-pass: Dict-A (seed+persist) else Dict-B (LLM).
+    Concurrent misses on the same predicate share one in-flight LLM call.
+    """
+    p = pred.lower()
+    if trace is not None: trace.append(f"▶ resolving '{pred}'")
+
+    hit = _dict_a(p, trace)
+    if hit is not None:
+        return hit, False, "A"
+
+    # B) ask LLM — unless another caller already is
+    mine, theirs = _claim([p])
+    if theirs:
+        if trace is not None: trace.append("Dict-B coalesced (in-flight)")
+        abstract, _ = theirs[p].result()
+        return abstract, False, "B"
+    if (hit := _dict_a(p, None)) is not None:    # settled while we were claiming
+        _settle(p, (hit, False))
+        return hit, False, "A"
+    return _resolve_led(p, pred, abstract_pool, trace)
+
+def resolve_predicates(preds: Iterable[str],
+                       abstract_pool: List[str],
+                       trace: List[str] | None = None
+                       ) -> Dict[str, Tuple[str, bool, str]]:
+    """
+    Batch form of `resolve_predicate`: every Dict-A miss goes into ONE
+    prompt.  Returns {normalised predicate: (abstract, created, source)}.
+    Predicates the model leaves out fall back to single calls.
+    """
+    out: Dict[str, Tuple[str, bool, str]] = {}
+    orig: Dict[str, str] = {}
+    for pred in preds:
+        p = pred.lower()
+        if p in out or p in orig:
+            continue
+        hit = _dict_a(p, trace)
+        if hit is not None:
+            out[p] = (hit, False, "A")
+        else:
+            orig[p] = pred
+    if not orig:
+        return out
+
+    mine, theirs = _claim(orig)
+    ask, ranks, shown = [], {}, set()
+    try:
+        for p in mine:
+            ranks[p] = ranked = _rank(p, abstract_pool)
+            if (result := _auto(p, ranked, trace)) is not None:
+                _settle(p, result)
+                out[p] = (*result, "E")
+            else:
+                ask.append(p)
+                shown.update(_shortlist(ranked, abstract_pool))
+    except BaseException as e:
+        for q in mine:
+            if q not in out:
+                _settle(q, exc=e)
+        raise
+    if ask:
+        if trace is not None: trace.append(f"Dict-B batch of {len(ask)}")
+        types = sorted(shown) if shown else list(abstract_pool)
+        msg = _BATCH_PROMPT.format(types="\n".join(types) or "(none yet)",
+                                   preds="\n".join(f"- {orig[p]}" for p in ask))
+        ans = _ask(msg, 24 * len(ask) + 16, None, trace)
+        try:
+            answers = {str(k).lower(): v for k, v in json.loads(ans).items()} if ans else {}
+        except (ValueError, AttributeError):
+            answers = {}
+        pending = list(ask)
+        try:
+            while pending:
+                p = pending[0]
+                if isinstance(answers.get(p), str) and answers[p].strip():
+                    abstract, created = _decide(p, answers[p], trace)
+                    _note(ranks[p], types, abstract, created)
+                    pending.pop(0)
+                    _settle(p, (abstract, created))
+                    out[p] = (abstract, created, "B")
+                else:
+                    pending.pop(0)                   # _resolve_led settles p itself
+                    out[p] = _resolve_led(p, orig[p], abstract_pool, trace)
+        except BaseException as e:
+            for q in pending:                        # never strand followers
+                _settle(q, exc=e)
+            raise
+    for p, fut in theirs.items():
+        out[p] = (fut.result()[0], False, "B")
+    return out
+
+def abstract_inventory(expected: Iterable[str] = ()) -> List[str]:
+    """Every abstract type Dict-A knows (seed + persistent) plus `expected`, sorted."""
+    _EDGE_DICT.refresh()
+    return sorted(set(expected) | set(_SEED_MAP.values()) | set(_EDGE_DICT.values()))
+
+def accept_typed(pred: str,
+                 proposal: str | None,
+                 abstract_pool: List[str],
+                 trace: List[str] | None = None
+                 ) -> Tuple[str, bool, str]:
+    """
+    Merged-extraction form of `resolve_predicate`: `proposal` is the
+    abstract the extraction call already chose (existing type or "NEW: …").
+    Dict-A stays authoritative; on a miss the proposal is decided and
+    persisted like a Dict-B answer, with no extra LLM call.  Without a
+    proposal this falls back to `resolve_predicate`.
+    """
+    p = pred.lower()
+    hit = _dict_a(p, trace)
+    if hit is not None:
+        return hit, False, "A"
+    if not (isinstance(proposal, str) and proposal.strip()):
+        return resolve_predicate(pred, abstract_pool, trace)
+
+    mine, theirs = _claim([p])
+    if theirs:
+        if trace is not None: trace.append("Dict-B coalesced (in-flight)")
+        return theirs[p].result()[0], False, "B"
+    if (hit := _dict_a(p, None)) is not None:
+        _settle(p, (hit, False))
+        return hit, False, "A"
+    if trace is not None: trace.append("Dict-B from merged extraction")
+    try:
+        abstract, created = _decide(p, proposal, trace)
+    except BaseException as e:
+        _settle(p, exc=e)
+        raise
+    _settle(p, (abstract, created))
     return abstract, created, "B"
@@ -2,27 +2,908 @@
 """
 Tiny hierarchical graph store:
    Document ➜ Sentences ➜ Edges     (surface & semantic HVs)
+
+Columnar backend — no per-edge Python objects:
+
+  edges      surface (N, D) · semantic (N, D)       contiguous HV matrices
+             edge_type · fine_pred · eid · doc       int32 interned ids  (eid -1 = none)
+             subj · obj                              int32 node ids      (-1 = unknown)
+             sent (row in the sentence table) · alias_tier
+             ext_tier (extractor that produced it: 0 rule · 1 LLM · -1 unknown)
+             alive
+  sentences  doc · sent_id · start · stop · alive    edge rows [start, stop)
+             surface_hv · semantic_hv                packed bundle of the sentence's edges
+  docs       interned doc_id → its sentence rows, in insertion order
+  bundles    per doc: int32 surface / semantic accumulators (+ on insert,
+             − on retire), packed snapshots re-thresholded lazily, edge count
+
+`get_sentence_graph` / `get_doc_graph` return `EdgeList` views that build
+the familiar edge dicts on access.  `find(edge_type=…, fine_pred=…, eid=…,
+doc_id=…)` answers filtered queries from inverted indexes (posting lists,
+intersected for compound filters) kept up to date as rows are appended.
+Edges keep interned subject / object node ids; the same posting lists on
+those columns are the out / in CSR adjacency behind `neighbors`, `k_hop`
+and `shortest_paths`.  Re-adding a sentence tombstones its old
+rows; `search` does top-k HV similarity over live rows (deps.hv_index),
+`search_docs` / `search_sentences` / `doc_similarity` compare bundles.
+`save(path)` / `GraphStore.open(path, mmap=True)` persist the columns as
+.npy files and map them back without parsing.
 """
-from collections import defaultdict
+from __future__ import annotations
+import json, os, shutil, threading
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from deps import hd_packed, hv_index, metrics
+
+# meta keys stored as columns; anything else goes to the sparse `_extra`
+_COLUMN_META = {"fine_pred", "abstract", "eid", "alias_tier", "doc_id", "sent_id",
+                "subject", "object", "extract_tier"}
+
+# ───────────────────────────────────────────────────────────────
+# building blocks
+# ───────────────────────────────────────────────────────────────
+class _Table:
+    """Named growable numpy columns sharing one row count (capacity doubling)."""
+    def __init__(self, schema: Dict[str, Any], capacity: int = 1024):
+        self.n, self.cap = 0, capacity
+        self.cols: Dict[str, np.ndarray] = {}
+        for name, dt in schema.items():
+            self.add_column(name, dt)
+
+    @classmethod
+    def from_arrays(cls, cols: Dict[str, np.ndarray], n: int) -> "_Table":
+        """Wrap existing (possibly memory-mapped) columns; the first append
+        outgrows them and copies into RAM."""
+        t = cls({}, capacity=max(n, 1))
+        t.n, t.cols = n, dict(cols)
+        if n == 0:
+            t.cols = {k: np.zeros((1, *a.shape[1:]), a.dtype) for k, a in cols.items()}
+        return t
+
+    def add_column(self, name: str, dtype, tail: Tuple[int, ...] = ()):
+        self.cols[name] = np.zeros((self.cap, *tail), dtype)
+
+    def _grow(self, need: int):
+        if need <= self.cap:
+            return
+        cap = max(self.cap, 1)
+        while cap < need:
+            cap *= 2
+        for name, a in self.cols.items():
+            g = np.zeros((cap, *a.shape[1:]), a.dtype)
+            g[:self.n] = a[:self.n]
+            self.cols[name] = g
+        self.cap = cap
+
+    def append(self, k: int, **vals) -> range:
+        lo = self.n
+        self._grow(lo + k)
+        for name, v in vals.items():
+            self.cols[name][lo:lo + k] = v
+        self.n = lo + k
+        return range(lo, self.n)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.cols[name][:self.n]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.cols
+
+class _Ragged:
+    """List of int lists, backed by (offsets, flat) arrays until touched."""
+    def __init__(self, off: Optional[np.ndarray] = None, flat: Optional[np.ndarray] = None):
+        self._off, self._flat = off, flat
+        self._base  = len(off) - 1 if off is not None else 0
+        self._n     = self._base
+        self._lists: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i: int) -> List[int]:
+        lst = self._lists.get(i)
+        if lst is None:
+            if not 0 <= i < self._n:
+                raise IndexError(i)
+            lst = self._lists[i] = (self._flat[self._off[i]:self._off[i + 1]].tolist()
+                                    if i < self._base else [])
+        return lst
+
+    def append(self, lst: List[int]):
+        self._lists[self._n] = lst
+        self._n += 1
+
+    def to_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        lens = np.array([len(self[i]) for i in range(self._n)], np.int64)
+        off  = np.concatenate([[0], np.cumsum(lens)]).astype(np.int64)
+        flat = np.fromiter((x for i in range(self._n) for x in self[i]), np.int64, off[-1])
+        return off, flat
+
+class _Texts:
+    """Sentence texts: a UTF-8 blob + offsets (from disk) plus appended strs."""
+    def __init__(self, blob: Optional[np.ndarray] = None, off: Optional[np.ndarray] = None):
+        self._blob, self._off = blob, off
+        self._base = len(off) - 1 if off is not None else 0
+        self._new: List[str] = []
+
+    def __len__(self) -> int:
+        return self._base + len(self._new)
+
+    def __getitem__(self, i: int) -> str:
+        if i < self._base:
+            return bytes(self._blob[self._off[i]:self._off[i + 1]]).decode("utf8")
+        return self._new[i - self._base]
+
+    def append(self, s: str):
+        self._new.append(s)
+
+    def to_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        enc  = [self[i].encode("utf8") for i in range(len(self))]
+        off  = np.concatenate([[0], np.cumsum([len(b) for b in enc], dtype=np.int64)]).astype(np.int64)
+        return np.frombuffer(b"".join(enc), np.uint8), off
+
+class _Interner:
+    """
+    str ↔ dense int id.  Strings live in a `_Texts` (a blob mapped from disk
+    for opened stores); the str → id dict is only built on the first lookup
+    by name, so opening and id → str reads cost nothing per entry.
+    """
+    def __init__(self, items: Iterable[str] = (), *, texts: Optional[_Texts] = None):
+        self._texts = texts if texts is not None else _Texts()
+        self._ids: Optional[Dict[str, int]] = None if texts is not None else {}
+        for s in items:
+            self.id(s)
+
+    @property
+    def ids(self) -> Dict[str, int]:
+        if self._ids is None:
+            self._ids = {self._texts[i]: i for i in range(len(self._texts))}
+        return self._ids
+
+    def id(self, s: str) -> int:
+        ids = self.ids
+        i = ids.get(s)
+        if i is None:
+            i = ids[s] = len(self._texts)
+            self._texts.append(s)
+        return i
 
+    def get(self, s: str) -> Optional[int]:
+        return self.ids.get(s)
+
+    def __getitem__(self, i: int) -> str:
+        return self._texts[int(i)]
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    @property
+    def items(self) -> List[str]:
+        return [self._texts[i] for i in range(len(self))]
+
+    def to_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self._texts.to_arrays()
+
+class _Postings:
+    """
+    Inverted index over one int id column: id → ascending edge rows.
+    A CSR base (one stable argsort) plus a tail of rows appended since,
+    scanned vectorised; the base is rebuilt once the tail outgrows it.
+    Negative ids (eid -1 = none) are not indexed.
+    """
+    REBUILD = 4096
+
+    def __init__(self):
+        self.n    = 0
+        self.off  = np.zeros(1, np.int64)
+        self.rows = np.empty(0, np.int64)
+
+    def _build(self, col: np.ndarray):
+        rows = np.flatnonzero(col >= 0)
+        v    = col[rows].astype(np.int64)
+        self.rows = rows[np.argsort(v, kind="stable")]
+        self.off  = np.concatenate([[0], np.cumsum(np.bincount(v))]).astype(np.int64)
+        self.n    = len(col)
+
+    def _refresh(self, col: np.ndarray):
+        if len(col) - self.n > max(self.REBUILD, self.n // 8):
+            self._build(col)
+
+    def lookup(self, col: np.ndarray, key: int) -> np.ndarray:
+        self._refresh(col)
+        base = (self.rows[self.off[key]:self.off[key + 1]]
+                if 0 <= key < len(self.off) - 1 else np.empty(0, np.int64))
+        tail = np.flatnonzero(col[self.n:] == key)
+        return np.concatenate([base, tail + self.n]) if len(tail) else base
+
+    def lookup_many(self, col: np.ndarray, keys: np.ndarray) -> np.ndarray:
+        """Rows for any of `keys` (unordered) — a vectorised CSR gather."""
+        self._refresh(col)
+        k    = keys[(keys >= 0) & (keys < len(self.off) - 1)]
+        lo   = self.off[k]
+        lens = self.off[k + 1] - lo
+        idx  = np.repeat(lo - np.cumsum(lens) + lens, lens) + np.arange(lens.sum())
+        tail = np.flatnonzero(np.isin(col[self.n:], keys)) + self.n
+        return np.concatenate([self.rows[idx], tail])
+
+class EdgeList(Sequence):
+    """Read-only view of edge rows; items are materialised edge dicts."""
+    def __init__(self, store: "GraphStore", rows: np.ndarray):
+        self._store, self.rows = store, rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return EdgeList(self._store, self.rows[i])
+        return self._store.edge(int(self.rows[i]))
+
+    def __repr__(self) -> str:
+        return f"EdgeList({len(self)} edges)"
+
+# ───────────────────────────────────────────────────────────────
+# store
+# ───────────────────────────────────────────────────────────────
 class GraphStore:
     def __init__(self):
-        self.docs = defaultdict(lambda: {"sentences": {}, "edges": []})
+        self.E = _Table({"edge_type": np.int32, "fine_pred": np.int32, "eid": np.int32,
+                         "subj": np.int32, "obj": np.int32, "doc": np.int32,
+                         "sent": np.int32, "alias_tier": np.int8, "ext_tier": np.int8,
+                         "alive": bool})
+        self.S = _Table({"doc": np.int32, "sent_id": np.int64,
+                         "start": np.int64, "stop": np.int64, "alive": bool})
+        self.B = _Table({"n": np.int64, "dirty": bool}, capacity=64)   # per doc bundles
+        self.edge_types = _Interner()
+        self.fine_preds = _Interner()
+        self.eids       = _Interner()
+        self.nodes      = _Interner()                      # subject / object strings
+        self.doc_ids    = _Interner()
+        self._texts     = _Texts()                         # per sentence row
+        self._doc_sents = _Ragged()                        # doc → sentence rows
+        self._extra_d: Optional[Dict[int, dict]] = {}      # edge row → extra meta
+        self._extra_src: Optional[Path] = None             # opened store: loaded on first use
+        self._post:  Dict[str, _Postings] = {}             # built on first lookup
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return int(self.E["alive"].sum())
+
+    @property
+    def _extra(self) -> Dict[int, dict]:
+        """Sparse non-column meta; an opened store parses extra.json on first access."""
+        if self._extra_d is None:
+            src = self._extra_src
+            self._extra_d = ({int(r): m for r, m in
+                              json.loads(src.read_text(encoding="utf8")).items()}
+                             if src is not None and src.exists() else {})
+        return self._extra_d
 
     # ----------------------------------------------------------
     def add_sentence(self, doc_id: str, sent_id: int,
                      sentence: str,
                      extract_fn, *, verbose=False):
         edges = extract_fn(sentence, doc_id, sent_id, verbose=verbose)
-        self.docs[doc_id]["sentences"][sent_id] = {
-            "text": sentence,
-            "edges": edges
-        }
-        self.docs[doc_id]["edges"].extend(edges)
+        self.add_edges(doc_id, sent_id, sentence, edges)
+
+    def add_edges(self, doc_id: str, sent_id: int, sentence: str, edges):
+        """Insert already-extracted edges (e.g. replayed from ingest parts)."""
+        with self._lock, metrics.timer("stage_seconds", stage="store_insert"):
+            d = self.doc_ids.id(doc_id)
+            if d == len(self._doc_sents):
+                self._doc_sents.append([])
+            self._sync_docs()
+            old = self._find_sentence(d, sent_id)
+            if old is not None:
+                self._retire_sentence(old)
+
+            k = len(edges)
+            if k:
+                self._ensure_hv(edges[0])
+            rows = self.E.append(
+                k,
+                **({"surface":  np.stack([e["surface"]  for e in edges]),
+                    "semantic": np.stack([e["semantic"] for e in edges])} if k else {}),
+                edge_type = [self.edge_types.id(e["edge_type"]) for e in edges],
+                fine_pred = [self.fine_preds.id(e["meta"].get("fine_pred", "")) for e in edges],
+                eid       = [self.eids.id(e["meta"]["eid"]) if e["meta"].get("eid") else -1
+                             for e in edges],
+                subj      = [self._node(e["meta"].get("subject")) for e in edges],
+                obj       = [self._node(e["meta"].get("object"))  for e in edges],
+                alias_tier= [e["meta"].get("alias_tier", -1) for e in edges],
+                ext_tier  = [e["meta"].get("extract_tier", -1) for e in edges],
+                alive     = True,
+            )
+            s = self.S.append(1, doc=d, sent_id=sent_id,
+                              start=rows.start, stop=rows.stop, alive=True).start
+            self.E.cols["doc"][rows.start:rows.stop]  = d
+            self.E.cols["sent"][rows.start:rows.stop] = s
+            self._texts.append(sentence)
+            for r, e in zip(rows, edges):
+                extra = {k: v for k, v in e["meta"].items() if k not in _COLUMN_META}
+                if extra:
+                    self._extra[r] = extra
+            self._bundle_sentence(s)
+            if old is None:
+                self._doc_sents[d].append(s)
+            else:                                          # keep original position
+                lst = self._doc_sents[d]
+                lst[lst.index(old)] = s
+
+    def _node(self, name: Optional[str]) -> int:
+        return self.nodes.id(name) if name else -1
+
+    def _ensure_hv(self, edge: dict):
+        if "surface" in self.E:
+            if edge["surface"].shape != self.E.cols["surface"].shape[1:] or \
+               edge["surface"].dtype != self.E.cols["surface"].dtype:
+                raise ValueError("edge HV shape/dtype differs from the store's "
+                                 f"{self.E.cols['surface'].dtype}{self.E.cols['surface'].shape[1:]}")
+            return
+        for f in ("surface", "semantic"):
+            self.E.add_column(f, edge[f].dtype, edge[f].shape)
+        self._ensure_bundles()
+
+    # ----------------------------------------------------------
+    # running bundles:  doc → int32 accumulator (+= on insert, -= on
+    # retire) with a lazily re-thresholded packed snapshot; sentences are
+    # immutable once inserted, so they only keep the packed snapshot
+    # ----------------------------------------------------------
+    def _ensure_bundles(self):
+        if "surface" not in self.E or "surface_hv" in self.S:
+            return
+        M   = self.E.cols["surface"]
+        dim = M.shape[1] * 8 if M.dtype == np.uint8 else M.shape[1]
+        for f in ("surface", "semantic"):
+            self.S.add_column(f + "_hv", np.uint8, (dim // 8,))
+            self.B.add_column(f,          np.int32, (dim,))
+            self.B.add_column(f + "_hv", np.uint8, (dim // 8,))
+
+    def _sync_docs(self):
+        if self.B.n < len(self.doc_ids):
+            self.B.append(len(self.doc_ids) - self.B.n, dirty=True)
+
+    def _acc(self, field: str, lo: int, hi: int) -> np.ndarray:
+        M = self.E.cols[field][lo:hi]
+        if M.dtype == np.uint8:
+            M = hd_packed.unpack(M)
+        return M.sum(axis=0, dtype=np.int32)
+
+    def _bundle_sentence(self, s: int, sign: int = 1):
+        lo, hi = self.S["start"][s], self.S["stop"][s]
+        if hi == lo:
+            return
+        d = self.S["doc"][s]
+        for f in ("surface", "semantic"):
+            a = self._acc(f, lo, hi)
+            if sign > 0:
+                self.S.cols[f + "_hv"][s] = hd_packed.threshold(a)
+            self.B.cols[f][d] += sign * a
+        self.B.cols["n"][d]    += sign * (hi - lo)
+        self.B.cols["dirty"][d] = True
+
+    def _doc_snapshots(self, field: str) -> np.ndarray:
+        dirty = np.flatnonzero(self.B["dirty"])
+        for lo in range(0, len(dirty), 4096):
+            rows = dirty[lo:lo + 4096]
+            for f in ("surface", "semantic"):
+                self.B.cols[f + "_hv"][rows] = hd_packed.threshold(self.B.cols[f][rows])
+        self.B.cols["dirty"][dirty] = False
+        return self.B[field + "_hv"]
+
+    def _retire_sentence(self, s: int):
+        self._bundle_sentence(s, -1)
+        lo, hi = self.S["start"][s], self.S["stop"][s]
+        self.E.cols["alive"][lo:hi] = False
+        self.S.cols["alive"][s] = False
+        for r in range(lo, hi):
+            self._extra.pop(r, None)
+
+    # ----------------------------------------------------------
+    def remove_sentence(self, doc_id: str, sent_id: int):
+        with self._lock:
+            d = self.doc_ids.get(doc_id)
+            s = self._find_sentence(d, sent_id)
+            if s is None:
+                raise KeyError((doc_id, sent_id))
+            self._retire_sentence(s)
+            self._doc_sents[d].remove(s)
+
+    def remove_doc(self, doc_id: str):
+        with self._lock:
+            d = self.doc_ids.get(doc_id)
+            if d is None:
+                raise KeyError(doc_id)
+            for s in list(self._doc_sents[d]):
+                self.remove_sentence(doc_id, int(self.S["sent_id"][s]))
 
     # ----------------------------------------------------------
+    def extend(self, other: "GraphStore", *,
+               relabel: Optional[Dict[str, str]] = None,
+               keep: Optional[Iterable[str]] = None):
+        """
+        Bulk-append every live sentence of `other` (e.g. a worker shard),
+        remapping interned ids with array gathers.  `relabel` maps
+        fine_pred → edge_type (merge-time reconciliation); edges whose final
+        type is not in `keep` are dropped.
+        """
+        with self._lock:
+            sents = [s for d in range(len(other._doc_sents)) for s in other._doc_sents[d]]
+            if any(self.doc_ids.get(other.doc_ids[int(other.S["doc"][s])]) is not None
+                   for s in sents):
+                keep = None if keep is None else set(keep)
+                alive = other.E["alive"]
+                for s in sents:                           # overlapping docs: slow path
+                    edges = []
+                    for r in range(other.S["start"][s], other.S["stop"][s]):
+                        if not alive[r]:
+                            continue
+                        e = other.edge(r)
+                        new = (relabel or {}).get(e["meta"]["fine_pred"])
+                        if new is not None:
+                            e["edge_type"] = e["meta"]["abstract"] = new
+                        if keep is None or e["edge_type"] in keep:
+                            edges.append(e)
+                    self.add_edges(other.doc_ids[int(other.S["doc"][s])],
+                                   int(other.S["sent_id"][s]), other._texts[s], edges)
+                return
+
+            remap = lambda a, b: np.array([a.id(x) for x in b.items] or [0], np.int32)
+            et_map, fp_map = remap(self.edge_types, other.edge_types), remap(self.fine_preds, other.fine_preds)
+            eid_map, doc_map = remap(self.eids, other.eids), remap(self.doc_ids, other.doc_ids)
+            node_map = remap(self.nodes, other.nodes)
+            gather   = lambda m, a: np.where(a >= 0, m[np.maximum(a, 0)], -1)
+            while len(self._doc_sents) < len(self.doc_ids):
+                self._doc_sents.append([])
+            st, sp = other.S["start"][sents], other.S["stop"][sents]
+            lens = (sp - st).astype(np.int64)
+            rows = (np.concatenate([np.arange(a, b) for a, b in zip(st, sp)])
+                    if len(sents) else np.empty(0, np.int64))
+            k    = len(rows)
+
+            et = et_map[other.E["edge_type"][rows]]
+            if relabel:
+                fp_ids  = other.E["fine_pred"][rows]
+                targets = np.full(len(other.fine_preds) or 1, -1, np.int32)
+                for fp, new in relabel.items():
+                    i = other.fine_preds.get(fp)
+                    if i is not None:
+                        targets[i] = self.edge_types.id(new)
+                hit = targets[fp_ids] >= 0
+                et[hit] = targets[fp_ids][hit]
+            owner = np.repeat(np.arange(len(sents)), lens)
+            if keep is not None:                          # drop, as EXPECTED_ABSTRACTS would
+                sel   = np.isin(et, [self.edge_types.id(t) for t in keep])
+                rows, et, owner = rows[sel], et[sel], owner[sel]
+                lens  = np.bincount(owner, minlength=len(sents)).astype(np.int64)
+                k     = len(rows)
+
+            if k:
+                self._ensure_hv({f: other.E[f][0] for f in ("surface", "semantic")})
+            new_s0, e0 = self.S.n, self.E.n
+            new_start  = e0 + np.concatenate([[0], np.cumsum(lens)[:-1]]).astype(np.int64)
+            self.E.append(
+                k,
+                **({"surface":  other.E["surface"][rows],
+                    "semantic": other.E["semantic"][rows]} if k else {}),
+                edge_type = et,
+                fine_pred = fp_map[other.E["fine_pred"][rows]],
+                eid       = gather(eid_map,  other.E["eid"][rows]),
+                subj      = gather(node_map, other.E["subj"][rows]),
+                obj       = gather(node_map, other.E["obj"][rows]),
+                doc       = doc_map[other.E["doc"][rows]],
+                sent      = new_s0 + owner,
+                alias_tier= other.E["alias_tier"][rows],
+                ext_tier  = other.E["ext_tier"][rows],
+                alive     = other.E["alive"][rows],
+            )
+            self.S.append(len(sents),
+                          doc=doc_map[other.S["doc"][sents]],
+                          sent_id=other.S["sent_id"][sents],
+                          start=new_start, stop=new_start + lens, alive=True)
+            pos = dict(zip(rows.tolist(), range(e0, e0 + k)))
+            for r, m in other._extra.items():
+                if r in pos:
+                    self._extra[pos[r]] = dict(m)
+            for s in sents:
+                self._texts.append(other._texts[s])
+            j = new_s0
+            for d in range(len(other._doc_sents)):
+                for _ in other._doc_sents[d]:             # `sents` is in this order
+                    self._doc_sents[int(doc_map[d])].append(j)
+                    j += 1
+            self._sync_docs()
+            for j in range(new_s0, self.S.n):
+                self._bundle_sentence(j)
+
+    # ----------------------------------------------------------
+    def edge(self, r: int) -> Dict[str, Any]:
+        """Materialise edge row `r` as the classic edge dict."""
+        E, s = self.E, int(self.E["sent"][r])
+        et  = self.edge_types[E["edge_type"][r]]
+        eid, su, ob = int(E["eid"][r]), int(E["subj"][r]), int(E["obj"][r])
+        meta = {"fine_pred":  self.fine_preds[E["fine_pred"][r]],
+                "abstract":   et,
+                "eid":        self.eids[eid] if eid >= 0 else None,
+                "subject":    self.nodes[su] if su >= 0 else None,
+                "object":     self.nodes[ob] if ob >= 0 else None,
+                "alias_tier": int(E["alias_tier"][r]),
+                "extract_tier": int(E["ext_tier"][r]),
+                "doc_id":     self.doc_ids[E["doc"][r]],
+                "sent_id":    int(self.S["sent_id"][s])}
+        meta.update(self._extra.get(r, {}))
+        return {"edge_type": et,
+                "surface":   E["surface"][r],
+                "semantic":  E["semantic"][r],
+                "meta":      meta}
+
+    def _find_sentence(self, d: Optional[int], sent_id: int) -> Optional[int]:
+        """Live sentence row of (doc, sent_id) — a scan of that doc's few rows."""
+        if d is None or d >= len(self._doc_sents):
+            return None
+        sid = self.S.cols["sent_id"]
+        for s in self._doc_sents[d]:
+            if sid[s] == sent_id:
+                return s
+        return None
+
+    def _sentence(self, doc_id: str, sent_id: int) -> int:
+        s = self._find_sentence(self.doc_ids.get(doc_id), sent_id)
+        if s is None:
+            raise KeyError((doc_id, sent_id))
+        return s
+
+    def sentence_rows(self, doc_id: str, sent_id: int) -> np.ndarray:
+        s = self._sentence(doc_id, sent_id)
+        return np.arange(self.S["start"][s], self.S["stop"][s])
+
+    def doc_rows(self, doc_id: str) -> np.ndarray:
+        """Edge rows of `doc_id` in sentence order; empty for an unknown doc."""
+        d = self.doc_ids.get(doc_id)
+        if d is None:
+            return np.empty(0, np.int64)
+        st, sp = self.S["start"], self.S["stop"]
+        parts = [np.arange(st[s], sp[s]) for s in self._doc_sents[d]]
+        return np.concatenate(parts) if parts else np.empty(0, np.int64)
+
+    def get_sentence_text(self, doc_id: str, sent_id: int) -> str:
+        return self._texts[self._sentence(doc_id, sent_id)]
+
     def get_sentence_graph(self, doc_id: str, sent_id: int):
-        return self.docs[doc_id]["sentences"][sent_id]["edges"]
+        return EdgeList(self, self.sentence_rows(doc_id, sent_id))
 
     def get_doc_graph(self, doc_id: str):
-        return self.docs[doc_id]["edges"]
+        return EdgeList(self, self.doc_rows(doc_id))
+
+    # ----------------------------------------------------------
+    # secondary indexes
+    # ----------------------------------------------------------
+    def _index_key(self, name: str):
+        return {"edge_type": ("edge_type", self.edge_types),
+                "fine_pred": ("fine_pred", self.fine_preds),
+                "eid":       ("eid",       self.eids),
+                "subject":   ("subj",      self.nodes),
+                "object":    ("obj",       self.nodes),
+                "doc_id":    ("doc",       self.doc_ids)}[name]
+
+    def posting(self, name: str, value: str) -> np.ndarray:
+        """Ascending rows (live and dead) whose `name` equals `value`."""
+        col, interner = self._index_key(name)
+        with self._lock:
+            code = interner.get(value)
+            if code is None:
+                return np.empty(0, np.int64)
+            return self._post.setdefault(name, _Postings()).lookup(self.E[col], code)
+
+    def rows_where(self, **filters) -> np.ndarray:
+        """
+        Live edge rows matching every filter, ascending.
+        Keys: edge_type, fine_pred, eid, doc_id; a value may be one str or
+        an iterable of them (OR).  Filters AND together by intersecting
+        posting lists, smallest first.
+        """
+        with self._lock:
+            lists = []
+            for name, value in filters.items():
+                vals = [value] if isinstance(value, str) else list(value)
+                ps   = [self.posting(name, v) for v in vals]
+                lists.append(np.unique(np.concatenate(ps)) if len(ps) > 1 else
+                             ps[0] if ps else np.empty(0, np.int64))
+            if not lists:
+                rows = np.arange(self.E.n)
+            else:
+                lists.sort(key=len)
+                rows = lists[0]
+                for other in lists[1:]:
+                    if not len(rows):
+                        break
+                    rows = np.intersect1d(rows, other, assume_unique=True)
+            return rows[self.E["alive"][rows]]
+
+    def find(self, **filters) -> EdgeList:
+        """`rows_where` as an EdgeList, e.g. find(edge_type="acquired_by", eid="Q95")."""
+        return EdgeList(self, self.rows_where(**filters))
+
+    def count(self, **filters) -> int:
+        return len(self.rows_where(**filters))
+
+    def extract_tier_counts(self) -> Dict[int, int]:
+        """Live edges per `extract_tier` (0 rule · 1 LLM · -1 unknown)."""
+        with self._lock:
+            t = self.E["ext_tier"][self.E["alive"]]
+            v, n = np.unique(t, return_counts=True)
+            return {int(a): int(b) for a, b in zip(v, n)}
+
+    # ----------------------------------------------------------
+    # entity adjacency + traversal
+    #   out-adjacency = posting lists on `subj`, in-adjacency on `obj`
+    #   (CSR base + appended tail), so every hop is a few array gathers
+    # ----------------------------------------------------------
+    def _type_codes(self, edge_type) -> Optional[np.ndarray]:
+        if edge_type is None:
+            return None
+        names = [edge_type] if isinstance(edge_type, str) else list(edge_type)
+        return np.array([c for c in map(self.edge_types.get, names) if c is not None], np.int32)
+
+    def _hop(self, frontier: np.ndarray, direction: str, types: Optional[np.ndarray]
+             ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """All live edges leaving `frontier` → (rows, from-node, to-node)."""
+        if direction not in ("out", "in", "both"):
+            raise ValueError(f"direction must be out / in / both, not {direction!r}")
+        parts = []
+        for d, src, dst, key in (("out", "subj", "obj", "subject"),
+                                 ("in",  "obj", "subj", "object")):
+            if direction not in (d, "both"):
+                continue
+            rows = self._post.setdefault(key, _Postings()).lookup_many(self.E[src], frontier)
+            ok   = self.E["alive"][rows] & (self.E[dst][rows] >= 0)
+            if types is not None:
+                ok &= np.isin(self.E["edge_type"][rows], types)
+            rows = rows[ok]
+            parts.append((rows, self.E[src][rows], self.E[dst][rows]))
+        return tuple(np.concatenate(p) for p in zip(*parts))
+
+    def _node_ids(self, nodes) -> np.ndarray:
+        names = [nodes] if isinstance(nodes, str) else list(nodes)
+        return np.array([c for c in map(self.nodes.get, names) if c is not None], np.int32)
+
+    def neighbors(self, node: str, *, direction: str = "out",
+                  edge_type=None) -> List[str]:
+        """Distinct one-hop neighbours of `node`."""
+        return list(self.k_hop(node, 1, direction=direction, edge_type=edge_type))[1:]
+
+    def k_hop(self, seeds, k: int = 2, *, direction: str = "out",
+              edge_type=None) -> Dict[str, int]:
+        """
+        Nodes within `k` hops of `seeds` (a name or names) → hop distance,
+        in BFS order.  `direction` is "out", "in" or "both"; `edge_type`
+        (a name or names) restricts which edges may be followed.
+        """
+        with self._lock:
+            types    = self._type_codes(edge_type)
+            frontier = np.unique(self._node_ids(seeds))
+            dist     = np.full(len(self.nodes), -1, np.int32)
+            dist[frontier] = 0
+            order = [frontier]
+            for h in range(1, k + 1):
+                if not len(frontier):
+                    break
+                _, _, dst = self._hop(frontier, direction, types)
+                dst = np.unique(dst)
+                frontier = dst[dist[dst] < 0]
+                dist[frontier] = h
+                order.append(frontier)
+            return {self.nodes[int(n)]: int(dist[n]) for n in np.concatenate(order)}
+
+    def shortest_paths(self, src: str, dst: str, *, max_hops: int = 4,
+                       direction: str = "out", edge_type=None,
+                       limit: int = 10) -> List[EdgeList]:
+        """
+        Up to `limit` shortest paths src → dst (≤ `max_hops` edges), each an
+        EdgeList of its edges in order.  Layered BFS over the adjacency
+        columns, then backtracking through the layers that reached dst.
+        """
+        with self._lock:
+            a, b = self.nodes.get(src), self.nodes.get(dst)
+            if a is None or b is None:
+                return []
+            if a == b:
+                return [EdgeList(self, np.empty(0, np.int64))]
+            types = self._type_codes(edge_type)
+            seen  = np.zeros(len(self.nodes), bool)
+            seen[a] = True
+            frontier, layers = np.array([a], np.int32), []
+            for _ in range(max_hops):
+                rows, frm, to = self._hop(frontier, direction, types)
+                new = ~seen[to]
+                rows, frm, to = rows[new], frm[new], to[new]
+                layers.append((rows, frm, to))
+                if (to == b).any():
+                    break
+                frontier = np.unique(to)
+                seen[frontier] = True
+                if not len(frontier):
+                    return []
+            else:
+                return []
+
+        paths: List[List[int]] = []
+        def back(h: int, node: int, tail: List[int]):
+            rows, frm, to = layers[h]
+            for i in np.flatnonzero(to == node):
+                if len(paths) >= limit:
+                    return
+                if h == 0:
+                    paths.append([int(rows[i])] + tail)
+                else:
+                    back(h - 1, int(frm[i]), [int(rows[i])] + tail)
+        back(len(layers) - 1, b, [])
+        return [EdgeList(self, np.array(p, np.int64)) for p in paths]
+
+    # ----------------------------------------------------------
+    def search(self, hv, k: int = 10, *, field: str = "surface",
+               edge_type: str | None = None):
+        """
+        Top-k edges most similar to `hv` (dense int8 or packed).
+        Returns [(score, doc_id, sent_id, index), …]; the edge itself is
+        `get_sentence_graph(doc_id, sent_id)[index]`.
+        """
+        with self._lock:
+            if field not in self.E:
+                return []
+            M, mask = self.E[field], self.E["alive"].copy()
+            if edge_type is not None:
+                code = self.edge_types.get(edge_type)
+                if code is None:
+                    return []
+                mask &= self.E["edge_type"] == code
+            sent, start, sid = self.E["sent"], self.S["start"], self.S["sent_id"]
+        rows, scores = hv_index.topk(M, hv, k, mask=mask)
+        return [(float(sc), self.doc_ids[self.E["doc"][r]], int(sid[sent[r]]),
+                 int(r - start[sent[r]]))
+                for r, sc in zip(rows, scores)]
+
+    # ----------------------------------------------------------
+    # bundle snapshots + doc / sentence similarity
+    # ----------------------------------------------------------
+    @staticmethod
+    def _out(p: np.ndarray, packed: bool) -> np.ndarray:
+        return p.copy() if packed else hd_packed.unpack(p)
+
+    def sentence_bundle(self, doc_id: str, sent_id: int, *,
+                        field: str = "surface", packed: bool = False) -> np.ndarray:
+        """Thresholded bundle of one sentence's edges (bipolar int8 or packed)."""
+        with self._lock:
+            return self._out(self.S[field + "_hv"][self._sentence(doc_id, sent_id)], packed)
+
+    def doc_bundle(self, doc_id: str, *, field: str = "surface",
+                   packed: bool = False) -> np.ndarray:
+        """Thresholded bundle of every live edge in the document."""
+        with self._lock:
+            d = self.doc_ids.get(doc_id)
+            if d is None:
+                raise KeyError(doc_id)
+            return self._out(self._doc_snapshots(field)[d], packed)
+
+    def doc_accumulator(self, doc_id: str, *, field: str = "surface") -> np.ndarray:
+        """The raw int32 running sum behind `doc_bundle`."""
+        with self._lock:
+            d = self.doc_ids.get(doc_id)
+            if d is None:
+                raise KeyError(doc_id)
+            return self.B[field][d].copy()
+
+    def doc_similarity(self, a: str, b: str, *, field: str = "surface") -> float:
+        """Bipolar dot product of two documents' bundles."""
+        pa = self.doc_bundle(a, field=field, packed=True)
+        pb = self.doc_bundle(b, field=field, packed=True)
+        return float(hd_packed.dot(pa, pb[None])[0])
+
+    def search_docs(self, hv, k: int = 10, *, field: str = "surface"):
+        """Top-k documents by bundle similarity → [(score, doc_id), …]."""
+        with self._lock:
+            if field + "_hv" not in self.B:
+                return []
+            M, mask = self._doc_snapshots(field), self.B["n"] > 0
+        rows, scores = hv_index.topk(M, hv, k, mask=mask)
+        return [(float(sc), self.doc_ids[r]) for r, sc in zip(rows, scores)]
+
+    def search_sentences(self, hv, k: int = 10, *, field: str = "surface"):
+        """Top-k live, non-empty sentences → [(score, doc_id, sent_id), …]."""
+        with self._lock:
+            if field + "_hv" not in self.S:
+                return []
+            M    = self.S[field + "_hv"]
+            mask = self.S["alive"] & (self.S["stop"] > self.S["start"])
+            doc, sid = self.S["doc"], self.S["sent_id"]
+        rows, scores = hv_index.topk(M, hv, k, mask=mask)
+        return [(float(sc), self.doc_ids[doc[r]], int(sid[r])) for r, sc in zip(rows, scores)]
+
+    # ----------------------------------------------------------
+    # persistence:  a directory of .npy columns + small JSON metadata
+    # ----------------------------------------------------------
+    FORMAT = 1
+    _INTERNERS = ("edge_types", "fine_preds", "eids", "doc_ids", "nodes")
+
+    def save(self, path) -> Path:
+        """
+        Write the store to directory `path`:
+          edges.<col>.npy · sents.<col>.npy     table columns
+          bundles.<col>.npy                      per-doc accumulators + snapshots
+          docs.off.npy · docs.sents.npy          doc → sentence rows (CSR)
+          texts.bin · texts.off.npy              sentence texts
+          <interner>.bin · <interner>.off.npy    edge_types, fine_preds, eids, doc_ids, nodes
+          extra.json                             sparse extra meta (only if any)
+          meta.json                              format + row counts
+        The new directory is built as `path.tmp`, then swapped in with two
+        renames (path → path.old, path.tmp → path).  A crash between them
+        leaves only `path.old`; `open` falls back to it, and the next save
+        completes the swap.
+        """
+        path = Path(path)
+        tmp  = path.with_name(path.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        with self._lock:
+            for prefix, T in (("edges", self.E), ("sents", self.S), ("bundles", self.B)):
+                for name in T.cols:
+                    np.save(tmp / f"{prefix}.{name}.npy", T[name])
+            off, flat = self._doc_sents.to_arrays()
+            np.save(tmp / "docs.off.npy", off);  np.save(tmp / "docs.sents.npy", flat)
+            blob, toff = self._texts.to_arrays()
+            blob.tofile(tmp / "texts.bin");        np.save(tmp / "texts.off.npy", toff)
+            for name in self._INTERNERS:
+                iblob, ioff = getattr(self, name).to_arrays()
+                iblob.tofile(tmp / f"{name}.bin");  np.save(tmp / f"{name}.off.npy", ioff)
+            if self._extra:
+                (tmp / "extra.json").write_text(
+                    json.dumps({str(r): m for r, m in self._extra.items()}, ensure_ascii=False),
+                    encoding="utf8")
+            meta = {"format": self.FORMAT, "n_edges": self.E.n, "n_sents": self.S.n}
+            (tmp / "meta.json").write_text(json.dumps(meta), encoding="utf8")
+        old = path.with_name(path.name + ".old")
+        if path.exists():
+            os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+        return path
+
+    @classmethod
+    def open(cls, path, *, mmap: bool = True) -> "GraphStore":
+        """
+        Load a saved store.  With `mmap` the columns, texts and interner
+        blobs are copy-on-write memory maps, so opening parses nothing
+        proportional to graph size and read-only processes share the page
+        cache; the str → id dicts and extra.json are built on first use.
+        Appending copies the columns into RAM.
+        """
+        path = Path(path)
+        old  = path.with_name(path.name + ".old")
+        if not path.exists() and (old / "meta.json").exists():
+            path = old                             # save() crashed mid-swap
+        meta = json.loads((path / "meta.json").read_text(encoding="utf8"))
+        if meta.get("format") != cls.FORMAT:
+            raise ValueError(f"{path}: unsupported GraphStore format {meta.get('format')}")
+        mode = "c" if mmap else None
+        load = lambda f: np.load(path / f, mmap_mode=mode)
+        cols = lambda prefix: {f.name[len(prefix) + 1:-4]: load(f.name)
+                               for f in path.glob(f"{prefix}.*.npy")}
+
+        g = cls()
+        g.E = _Table.from_arrays(cols("edges"), meta["n_edges"])
+        g.S = _Table.from_arrays(cols("sents"), meta["n_sents"])
+        blob = lambda f: (np.memmap(path / f, np.uint8, "c")
+                          if mmap and (path / f).stat().st_size else
+                          np.fromfile(path / f, np.uint8))
+        for name in cls._INTERNERS:
+            setattr(g, name, _Interner(texts=_Texts(blob(f"{name}.bin"),
+                                                    load(f"{name}.off.npy"))))
+        g._doc_sents = _Ragged(load("docs.off.npy"), load("docs.sents.npy"))
+        g._texts = _Texts(blob("texts.bin"), load("texts.off.npy"))
+        g._extra_d, g._extra_src = None, path / "extra.json"
+        g.B = _Table.from_arrays(cols("bundles"), len(g.doc_ids))
+        return g
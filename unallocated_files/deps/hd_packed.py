@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+deps/hd_packed.py
+─────────────────
+Bit-packed bipolar hypervectors  (D=4096 → 512 bytes, uint8).
+
+  bit 1  ⇔  +1        bit 0  ⇔  -1        (np.packbits, big-endian)
+
+  bind        XNOR (exactly the bipolar product)
+  perm        1-bit roll ("S")  |  bit reversal ("O")   – same as dense
+  bundle      int32 accumulator + majority threshold (ties → _TIE)
+  similarity  Hamming via popcount;  dot = D - 2·hamming
+
+Dense int8 HVs convert losslessly with pack()/unpack(); zero components
+(e.g. the 2-way bundle inside _semantic) are broken by the fixed _TIE bits.
+"""
+from __future__ import annotations
+from typing import Iterable
+
+import numpy as np
+
+D      = 4096
+NBYTES = D // 8
+
+_TIE   = np.random.default_rng(7).integers(0, 2, D).astype(bool)   # fixed tie-breaker
+_REV8  = np.array([int(f"{b:08b}"[::-1], 2) for b in range(256)], dtype=np.uint8)
+_POP8  = np.array([bin(b).count("1") for b in range(256)], dtype=np.uint8)
+
+# ───────────────────────────────────────────────────────────────
+# conversion
+# ───────────────────────────────────────────────────────────────
+def pack(v: np.ndarray) -> np.ndarray:
+    """Bipolar (…, D) int8 → packed (…, D/8) uint8.  0 → tie-break bit."""
+    v = np.asarray(v)
+    return np.packbits((v > 0) | ((v == 0) & _TIE), axis=-1)
+
+def unpack(p: np.ndarray) -> np.ndarray:
+    """Packed (…, D/8) uint8 → bipolar (…, D) int8."""
+    return (np.unpackbits(p, axis=-1).astype(np.int8) << 1) - 1
+
+# ───────────────────────────────────────────────────────────────
+# HD ops
+# ───────────────────────────────────────────────────────────────
+def bind(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Packed bipolar product: a*b is +1 iff signs agree  →  XNOR."""
+    return ~np.bitwise_xor(a, b)
+
+def perm(p: np.ndarray, tag: str) -> np.ndarray:
+    """Packed equivalent of dense `np.roll(v,1)` ("S") / `np.flip(v)` ("O")."""
+    if tag == "S":
+        return (p >> 1) | ((np.roll(p, 1, axis=-1) & 1) << 7)
+    return _REV8[p[..., ::-1]]
+
+def accumulate(ps: Iterable[np.ndarray], acc: np.ndarray | None = None) -> np.ndarray:
+    """Add packed HVs into an int32 bipolar-sum accumulator (lossless)."""
+    for p in ps:
+        acc = unpack(p).astype(np.int32) if acc is None else acc + unpack(p)
+    return acc if acc is not None else np.zeros(D, dtype=np.int32)
+
+def threshold(acc: np.ndarray) -> np.ndarray:
+    """Majority vote over an int32 accumulator → packed HV."""
+    return np.packbits((acc > 0) | ((acc == 0) & _TIE), axis=-1)
+
+def bundle(*ps: np.ndarray) -> np.ndarray:
+    return threshold(accumulate(ps))
+
+# ───────────────────────────────────────────────────────────────
+# similarity
+# ───────────────────────────────────────────────────────────────
+if hasattr(np, "bitwise_count"):                      # numpy ≥ 2.0
+    def popcount(x: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(x)
+else:
+    def popcount(x: np.ndarray) -> np.ndarray:
+        return _POP8[x]
+
+def hamming(q: np.ndarray, M: np.ndarray) -> np.ndarray:
+    """Hamming distance between packed `q` (D/8,) and rows of `M` (N, D/8)."""
+    return popcount(np.bitwise_xor(M, q)).sum(axis=-1, dtype=np.int32)
+
+def dot(q: np.ndarray, M: np.ndarray) -> np.ndarray:
+    """Bipolar dot product recovered from Hamming distance."""
+    return D - 2 * hamming(q, M)
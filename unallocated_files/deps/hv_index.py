@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+deps/hv_index.py
+────────────────
+Top-k nearest-row search over a contiguous HV matrix
+(GraphStore's surface/semantic columns).
+
+  • dense int8 HVs  → chunked integer dot products (einsum, no float copy)
+  • packed uint8 HVs (deps.hd_packed) → chunked XOR + popcount Hamming
+  • chunks are scored on a thread pool (numpy releases the GIL)
+  • optional boolean row mask (tombstones, edge_type filters …)
+"""
+from __future__ import annotations
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import numpy as np
+
+from deps import hd_packed
+
+CHUNK     = 8192                                  # rows scored per task
+N_THREADS = min(8, os.cpu_count() or 1)
+
+# ───────────────────────────────────────────────────────────────
+# kernels
+# ───────────────────────────────────────────────────────────────
+def _is_packed(M: np.ndarray) -> bool:
+    return M.dtype == np.uint8
+
+def _acc_dtype(q: np.ndarray):
+    """einsum accumulator for int8 rows · `q`: int32 fits int8 queries."""
+    if q.dtype.kind == "f":
+        return np.float32
+    return np.int32 if q.dtype.itemsize == 1 else np.int64
+
+def _score_chunk(M: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """
+    Bipolar dot product of `q` against every row of `M` (float32).  Dense
+    rows go through einsum, which casts int8 in small buffers instead of
+    materialising a float copy of the chunk.
+    """
+    if _is_packed(M):
+        return hd_packed.dot(q, M).astype(np.float32)
+    acc = _acc_dtype(q)
+    return np.einsum("ij,j->i", M, q.astype(acc, copy=False), dtype=acc).astype(np.float32)
+
+def _chunk_topk(M: np.ndarray, q: np.ndarray, k: int, lo: int, hi: int,
+                mask: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    rows = np.arange(lo, hi)
+    if mask is not None:
+        rows = rows[mask[lo:hi]]
+        if not rows.size:
+            return rows, np.empty(0, np.float32)
+        s = _score_chunk(M[rows], q)
+    else:
+        s = _score_chunk(M[lo:hi], q)
+    if s.size > k:
+        part = np.argpartition(-s, k - 1)[:k]
+        rows, s = rows[part], s[part]
+    return rows, s
+
+def topk(M: np.ndarray, q: np.ndarray, k: int = 10, *,
+         mask: Optional[np.ndarray] = None,
+         chunk: int = CHUNK, n_threads: int = N_THREADS
+         ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k rows of `M` by similarity to `q`.
+    Returns (row_ids, scores) sorted by descending score.
+    """
+    n = len(M)
+    if not n or k <= 0:
+        return np.empty(0, np.int64), np.empty(0, np.float32)
+    q = np.asarray(q)
+    if _is_packed(M) and q.dtype != np.uint8:
+        q = hd_packed.pack(q)                    # dense query vs packed store
+    elif not _is_packed(M) and q.dtype == np.uint8:
+        q = hd_packed.unpack(q)
+    bounds = [(lo, min(lo + chunk, n)) for lo in range(0, n, chunk)]
+    if n_threads > 1 and len(bounds) > 1:
+        with ThreadPoolExecutor(min(n_threads, len(bounds))) as ex:
+            parts = list(ex.map(lambda b: _chunk_topk(M, q, k, *b, mask), bounds))
+    else:
+        parts = [_chunk_topk(M, q, k, lo, hi, mask) for lo, hi in bounds]
+    rows   = np.concatenate([p[0] for p in parts])
+    scores = np.concatenate([p[1] for p in parts])
+    order  = np.argsort(-scores, kind="stable")[:k]
+    return rows[order], scores[order]
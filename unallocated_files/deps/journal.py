@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+deps/journal.py
+───────────────
+`JournalDict`  —  a str→str dict persisted as  snapshot + write-ahead journal.
+
+  <name>.json      compact snapshot (plain JSON object)
+  <name>.journal   one appended JSON line  {"k": …, "v": …}  per assignment
+  <name>.lock      flock target: shared for replay, exclusive for append/compaction
+
+  • d[k] = v appends one line (no full rewrite); fsync is batched
+  • startup = load snapshot + replay journal (a torn last line is ignored,
+    and cut off before the next append)
+  • `refresh()` picks up lines appended by other processes
+  • every `compact_every` lines the journal is folded into the snapshot
+    (atomic os.replace of both files) — safe across worker processes
+"""
+from __future__ import annotations
+import atexit, json, os, threading, time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:                               # non-POSIX: in-process safety only
+    fcntl = None
+
+class JournalDict(dict):
+    def __init__(self, snapshot: Path, *,
+                 compact_every: int = 1000,
+                 fsync_every: int = 32,
+                 fsync_interval: float = 1.0):
+        super().__init__()
+        self.snapshot       = Path(snapshot)
+        self.journal        = self.snapshot.with_suffix(".journal")
+        self.lockfile       = self.snapshot.with_suffix(".lock")
+        self.compact_every  = compact_every
+        self.fsync_every    = fsync_every
+        self.fsync_interval = fsync_interval
+        self._mutex   = threading.RLock()
+        self._fd      = None          # append fd on the current journal file
+        self._gen     = None          # (ino, mtime_ns) of the loaded snapshot
+        self._ino     = None          # inode that `_offset` refers to
+        self._offset  = 0             # bytes of journal already replayed
+        self._lines   = 0             # lines in current journal
+        self._pending = 0             # appends since last fsync
+        self._synced  = time.monotonic()
+        self._reload()
+        atexit.register(self.flush)
+
+    # ----------------------------------------------------------
+    @contextmanager
+    def _flock(self, exclusive: bool):
+        if fcntl is None:
+            yield
+            return
+        with open(self.lockfile, "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _reload(self):
+        with self._mutex, self._flock(exclusive=False):
+            self._load_all()
+
+    def _load_all(self):
+        """Full replay: snapshot + whole journal  (caller holds the flock)."""
+        dict.clear(self)
+        self._gen = self._snapshot_gen()
+        if self._gen is not None:
+            dict.update(self, json.loads(self.snapshot.read_text(encoding="utf8")))
+        self._ino, self._offset, self._lines = None, 0, 0
+        self._replay_tail()
+
+    def _snapshot_gen(self):
+        try:
+            st = os.stat(self.snapshot)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns
+
+    def _replay_tail(self):
+        if self._snapshot_gen() != self._gen:         # compacted by someone else
+            self._load_all()
+            return
+        try:
+            st = os.stat(self.journal)
+        except FileNotFoundError:
+            return
+        if st.st_ino != self._ino or st.st_size < self._offset:
+            if self._ino is not None:
+                self._load_all()
+                return
+            self._ino, self._offset = st.st_ino, 0
+        if st.st_size == self._offset:
+            return
+        with open(self.journal, "rb") as fh:
+            fh.seek(self._offset)
+            buf = fh.read()
+        end = buf.rfind(b"\n") + 1                   # ignore torn tail
+        for ln in buf[:end].splitlines():
+            try:
+                rec = json.loads(ln)
+            except ValueError:
+                continue
+            if not isinstance(rec, dict) or "k" not in rec:
+                continue
+            dict.__setitem__(self, rec["k"], rec["v"])
+            self._lines += 1
+        self._offset += end
+
+    def refresh(self):
+        """Apply journal lines appended by other processes since last look."""
+        with self._mutex, self._flock(exclusive=False):
+            self._replay_tail()
+
+    # ----------------------------------------------------------
+    def _append_fd(self) -> int:
+        st = os.stat(self.journal) if self.journal.exists() else None
+        if self._fd is not None and st is not None and os.fstat(self._fd).st_ino == st.st_ino:
+            return self._fd
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = os.open(self.journal, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return self._fd
+
+    def _drop_torn_tail(self):
+        """
+        Cut a partial last line left by a crashed writer (caller holds the
+        exclusive flock, after `_replay_tail`): everything past `_offset` is
+        that fragment, and appending after it would glue the next record on.
+        """
+        try:
+            st = os.stat(self.journal)
+        except FileNotFoundError:
+            return
+        if st.st_ino == self._ino and st.st_size > self._offset:
+            os.truncate(self.journal, self._offset)
+
+    def __setitem__(self, key: str, value: str):
+        line = (json.dumps({"k": key, "v": value}, ensure_ascii=False) + "\n").encode("utf8")
+        with self._mutex:
+            with self._flock(exclusive=True):        # appends are tiny; serialise them
+                self._replay_tail()                  # keep offset contiguous
+                self._drop_torn_tail()
+                os.write(self._append_fd(), line)
+                self._ino = os.fstat(self._fd).st_ino
+                self._offset += len(line)
+                self._lines  += 1
+                dict.__setitem__(self, key, value)
+                self._pending += 1
+                if (self._pending >= self.fsync_every or
+                        time.monotonic() - self._synced >= self.fsync_interval):
+                    self._fsync()
+            if self._lines >= self.compact_every:
+                self.compact()
+
+    def _fsync(self):
+        if self._fd is not None and self._pending:
+            os.fsync(self._fd)
+        self._pending, self._synced = 0, time.monotonic()
+
+    def flush(self):
+        with self._mutex:
+            self._fsync()
+
+    # ----------------------------------------------------------
+    def compact(self):
+        """Fold the journal into a fresh snapshot; start an empty journal."""
+        with self._mutex, self._flock(exclusive=True):
+            self._replay_tail()                      # include other writers' lines
+            self._fsync()
+            tmp = self.snapshot.with_suffix(".json.tmp")
+            with open(tmp, "w", encoding="utf8") as fh:
+                json.dump(dict(self), fh, ensure_ascii=False)
+                fh.flush(); os.fsync(fh.fileno())
+            os.replace(tmp, self.snapshot)
+            jtmp = self.journal.with_suffix(".journal.tmp")
+            open(jtmp, "wb").close()
+            os.replace(jtmp, self.journal)
+            self._gen = self._snapshot_gen()
+            self._ino, self._offset, self._lines = os.stat(self.journal).st_ino, 0, 0
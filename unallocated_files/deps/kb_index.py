@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+deps/kb_index.py
+────────────────
+Offline-built, persisted ANN index for the Tier-2 KB linker.
+
+  flat    exact IndexFlatIP                    (small KBs; the old behaviour)
+  hnsw    IndexHNSWFlat, inner product         knobs: M, efConstruction │ efSearch
+  ivfpq   IndexIVFPQ over a flat quantizer     knobs: nlist, m, nbits   │ nprobe
+
+Files (next to kb_ids.txt):
+  kb.faiss          serialised index
+  kb_index.json     {"type": …, build params…, "search": {nprobe/efSearch}}
+
+`load()` maps the index with IO_FLAG_MMAP where the index type supports it.
+Search knobs can be overridden at runtime with KB_NPROBE / KB_EF_SEARCH.
+
+CLI:
+    python -m deps.kb_index build --type hnsw --M 32
+    python -m deps.kb_index build --type ivfpq --nlist 4096 --m 48
+    python -m deps.kb_index bench --queries 1000 --k 10
+"""
+from __future__ import annotations
+import argparse, json, os, sys, time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+HERE       = Path(__file__).resolve().parent
+RES        = HERE.parent.parent / "resources"
+INDEX_PATH = RES / "kb.faiss"
+META_PATH  = RES / "kb_index.json"
+
+DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "flat":  {},
+    "hnsw":  {"M": 32, "efConstruction": 200, "search": {"efSearch": 128}},
+    "ivfpq": {"nlist": 4096, "m": 48, "nbits": 8, "train_size": 262_144,
+              "search": {"nprobe": 32}},
+}
+
+# ───────────────────────────────────────────────────────────────
+# build
+# ───────────────────────────────────────────────────────────────
+def _factory(kind: str, d: int, p: Dict[str, Any]):
+    if kind == "flat":
+        return faiss.IndexFlatIP(d)
+    if kind == "hnsw":
+        idx = faiss.IndexHNSWFlat(d, p["M"], faiss.METRIC_INNER_PRODUCT)
+        idx.hnsw.efConstruction = p["efConstruction"]
+        return idx
+    if kind == "ivfpq":
+        quant = faiss.IndexFlatIP(d)
+        return faiss.IndexIVFPQ(quant, d, p["nlist"], p["m"], p["nbits"],
+                                faiss.METRIC_INNER_PRODUCT)
+    raise ValueError(f"unknown KB index type {kind!r}")
+
+def build(emb: np.ndarray, kind: str = "flat", **params) -> "faiss.Index":
+    p = {**DEFAULTS[kind], **params}
+    f32 = lambda a: np.ascontiguousarray(a, dtype=np.float32)
+    idx = _factory(kind, emb.shape[1], p)
+    if not idx.is_trained:
+        rng = np.random.default_rng(0)
+        n   = min(len(emb), p.get("train_size", len(emb)))
+        idx.train(f32(emb[np.sort(rng.choice(len(emb), n, replace=False))]))
+    for lo in range(0, len(emb), 65_536):            # bounded peak memory (emb may be mmap)
+        idx.add(f32(emb[lo:lo + 65_536]))
+    configure(idx, p.get("search", {}))
+    return idx
+
+def save(idx, kind: str, params: Dict[str, Any],
+         index_path: Path = INDEX_PATH, meta_path: Path = META_PATH):
+    faiss.write_index(idx, str(index_path))
+    meta = {"type": kind, **{**DEFAULTS[kind], **params}, "ntotal": int(idx.ntotal)}
+    meta_path.write_text(json.dumps(meta, indent=2))
+
+# ───────────────────────────────────────────────────────────────
+# load / search knobs
+# ───────────────────────────────────────────────────────────────
+def configure(idx, search: Dict[str, Any], *, env: bool = True):
+    """Apply nprobe / efSearch (env KB_NPROBE / KB_EF_SEARCH win if `env`)."""
+    nprobe, ef = search.get("nprobe", 0), search.get("efSearch", 0)
+    if env:
+        nprobe = int(os.getenv("KB_NPROBE", nprobe) or 0)
+        ef     = int(os.getenv("KB_EF_SEARCH", ef) or 0)
+    if nprobe:
+        try:
+            faiss.extract_index_ivf(idx).nprobe = nprobe
+        except RuntimeError:
+            pass                                      # not an IVF index
+    if ef and hasattr(idx, "hnsw"):
+        idx.hnsw.efSearch = ef
+
+def load(index_path: Path = INDEX_PATH, meta_path: Path = META_PATH):
+    """Open a prebuilt index (mmap where supported) or None if absent."""
+    if faiss is None or not index_path.exists():
+        return None
+    try:
+        idx = faiss.read_index(str(index_path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    except RuntimeError:                              # type without mmap support
+        idx = faiss.read_index(str(index_path))
+    meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+    configure(idx, meta.get("search", {}))
+    return idx
+
+# ───────────────────────────────────────────────────────────────
+# recall-vs-latency benchmark against the flat baseline
+# ───────────────────────────────────────────────────────────────
+def bench(emb: np.ndarray, idx, *, n_queries: int = 1000, k: int = 10,
+          noise: float = 0.05, sweep: Optional[list] = None) -> list:
+    rng = np.random.default_rng(1)
+    Q = emb[rng.choice(len(emb), min(n_queries, len(emb)), replace=False)].astype(np.float32)
+    Q = Q + noise * rng.standard_normal(Q.shape).astype(np.float32)
+    Q /= np.linalg.norm(Q, axis=1, keepdims=True) + 1e-8
+
+    flat = build(emb, "flat")
+    t0 = time.perf_counter(); _, gt = flat.search(Q, k); t_flat = time.perf_counter() - t0
+    rows = [{"setting": "flat", "recall": 1.0, "ms_per_query": 1e3 * t_flat / len(Q)}]
+
+    knob = "nprobe" if _is_ivf(idx) else "efSearch" if hasattr(idx, "hnsw") else None
+    for v in (sweep or ([1, 4, 16, 64, 256] if knob else [None])):
+        if knob:
+            configure(idx, {knob: v}, env=False)
+        t0 = time.perf_counter(); _, I = idx.search(Q, k); dt = time.perf_counter() - t0
+        hit = sum(len(set(a) & set(b)) for a, b in zip(I.tolist(), gt.tolist()))
+        rows.append({"setting": f"{knob}={v}" if knob else "index",
+                     "recall": hit / (k * len(Q)), "ms_per_query": 1e3 * dt / len(Q)})
+    return rows
+
+def _is_ivf(idx) -> bool:
+    try:
+        faiss.extract_index_ivf(idx)
+        return True
+    except RuntimeError:
+        return False
+
+def main(argv=None):
+    ap  = argparse.ArgumentParser(description="Build / benchmark the Tier-2 KB ANN index.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build")
+    b.add_argument("--type", choices=sorted(DEFAULTS), default="flat")
+    b.add_argument("--M", type=int);        b.add_argument("--efConstruction", type=int)
+    b.add_argument("--nlist", type=int);    b.add_argument("--m", type=int)
+    b.add_argument("--nbits", type=int);    b.add_argument("--train-size", type=int)
+    r = sub.add_parser("bench")
+    r.add_argument("--queries", type=int, default=1000)
+    r.add_argument("--k", type=int, default=10)
+    r.add_argument("--sweep", type=int, nargs="*")
+    args = ap.parse_args(argv)
+
+    if faiss is None:
+        sys.exit("faiss is not installed")
+    emb = np.load(RES / "kb_emb.npy", mmap_mode="r")
+    if args.cmd == "build":
+        params = {k: v for k, v in {"M": args.M, "efConstruction": args.efConstruction,
+                                    "nlist": args.nlist, "m": args.m, "nbits": args.nbits,
+                                    "train_size": args.train_size}.items() if v is not None}
+        t0 = time.perf_counter()
+        idx = build(emb, args.type, **params)
+        save(idx, args.type, params)
+        print(f"{args.type} index over {idx.ntotal} vectors → {INDEX_PATH} "
+              f"({time.perf_counter() - t0:.1f}s)")
+    else:
+        idx = load()
+        if idx is None:
+            sys.exit(f"no index at {INDEX_PATH}; run `build` first")
+        for row in bench(emb, idx, n_queries=args.queries, k=args.k, sweep=args.sweep):
+            print(json.dumps(row))
+
+if __name__ == "__main__":
+    sys.exit(main())
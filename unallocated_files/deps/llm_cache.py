@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+deps/llm_cache.py
+─────────────────
+Persistent, content-addressed cache for deterministic (temperature 0) LLM
+responses.
+
+  key    sha256( canonical JSON of model + messages + generation params )
+  store  SQLite in WAL mode  → many reader/writer threads *and* processes
+  evict  least-recently-used rows once the payload exceeds `max_bytes`
+
+Env knobs:
+  HYDRA_LLM_CACHE      path to the .sqlite file, or "off"   (default resources/llm_cache.sqlite)
+  HYDRA_LLM_CACHE_MB   size budget in MiB                   (default 512)
+"""
+from __future__ import annotations
+import collections, hashlib, json, os, sqlite3, threading, time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from deps import metrics
+
+HERE = Path(__file__).resolve().parent
+RES  = HERE.parent.parent / "resources";  RES.mkdir(exist_ok=True)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size  INTEGER NOT NULL,
+    atime REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_atime ON cache(atime);
+"""
+
+def make_key(request: Dict[str, Any]) -> str:
+    """Hash of an OpenAI-style request dict (model, messages, params…)."""
+    blob = json.dumps(request, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf8")).hexdigest()
+
+class LLMCache:
+    EVICT_EVERY = 256          # puts between size checks
+    TOUCH_AFTER = 60.0         # s; throttle atime updates on hits
+
+    def __init__(self, path: Optional[Path], max_bytes: int = 512 << 20):
+        self.path      = Path(path) if path else None
+        self.max_bytes = max_bytes
+        self.counts    = collections.Counter()
+        self._local    = threading.local()
+        self._lock     = threading.Lock()
+        self._puts     = 0
+        if self.path:
+            self._conn()                           # create schema eagerly
+
+    @classmethod
+    def from_env(cls) -> "LLMCache":
+        p = os.getenv("HYDRA_LLM_CACHE", str(RES / "llm_cache.sqlite"))
+        mb = int(os.getenv("HYDRA_LLM_CACHE_MB", "512"))
+        return cls(None if p.lower() in {"", "0", "off", "none"} else Path(p), mb << 20)
+
+    # ----------------------------------------------------------
+    def _conn(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.executescript(_SCHEMA)
+            self._local.con = con
+        return con
+
+    # ----------------------------------------------------------
+    def get(self, key: str) -> Optional[str]:
+        if not self.path:
+            return None
+        row = self._conn().execute(
+            "SELECT value, atime FROM cache WHERE key=?", (key,)).fetchone()
+        with self._lock:
+            self.counts["hit" if row else "miss"] += 1
+        metrics.inc("llm_cache_total", result="hit" if row else "miss")
+        if not row:
+            return None
+        now = time.time()
+        if now - row[1] > self.TOUCH_AFTER:
+            self._conn().execute("UPDATE cache SET atime=? WHERE key=?", (now, key))
+        return row[0]
+
+    def put(self, key: str, value: str):
+        if not self.path:
+            return
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache(key, value, size, atime) VALUES (?,?,?,?)",
+            (key, value, len(value.encode("utf8")), time.time()))
+        with self._lock:
+            self.counts["put"] += 1
+            self._puts += 1
+            check = self._puts % self.EVICT_EVERY == 0
+        if check:
+            self.evict()
+
+    def discard(self, key: str):
+        if self.path:
+            self._conn().execute("DELETE FROM cache WHERE key=?", (key,))
+
+    # ----------------------------------------------------------
+    def evict(self):
+        """Drop LRU rows until the payload is ≤ 90 % of `max_bytes`."""
+        if not self.path:
+            return
+        con = self._conn()
+        total = con.execute("SELECT COALESCE(SUM(size),0) FROM cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess, dropped = total - int(self.max_bytes * 0.9), 0
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            cur = con.execute("SELECT key, size FROM cache ORDER BY atime")
+            doomed = []
+            for key, size in cur:
+                if excess <= 0:
+                    break
+                doomed.append((key,))
+                excess -= size
+            con.executemany("DELETE FROM cache WHERE key=?", doomed)
+            dropped = len(doomed)
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self.counts["evict"] += dropped
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = dict(self.counts)
+        looked = self.counts["hit"] + self.counts["miss"]
+        out["hit_rate"] = self.counts["hit"] / looked if looked else 0.0
+        if self.path:
+            n, b = self._conn().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size),0) FROM cache").fetchone()
+            out.update(entries=n, bytes=b)
+        return out
+
+CACHE = LLMCache.from_env()
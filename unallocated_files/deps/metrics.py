@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+deps/metrics.py
+───────────────
+Low-overhead, process-wide pipeline metrics.
+
+  inc(name, n=1, **labels)            counter
+  observe(name, seconds, **labels)    histogram (fixed log-spaced buckets)
+  with timer(name, **labels): …       histogram of the block's wall time
+  snapshot(reset=False) / merge(snap) plain-dict state (ship across processes)
+  to_json() / to_prometheus() / dump(path)
+
+Off unless HYDRA_METRICS=1 or `enable()`; when off, `timer` returns one
+shared null context and `inc` / `observe` return after a flag check.
+Everything is guarded by one lock, so it is safe from worker threads;
+process pools merge their workers' snapshots.
+
+Names used by the pipeline (all exported with a `hydra_` prefix):
+  stage_seconds{stage}          passive · alias · alias_t0/t1/t2 · rule · triple_llm ·
+                                triple_llm_packed · predicate · predicate_llm ·
+                                hv_encode · store_insert
+  alias_tier_total{tier}        edges_total{abstract}      dict_a_total{source}
+  hv_cache_total{result}        llm_cache_total{result}      packed_fallback_total
+  extract_tier_total{tier}      predicate_index_total{result}
+  llm_requests_total{caller, status}                       llm_tokens_total{caller, kind}
+"""
+from __future__ import annotations
+import bisect, contextlib, json, os, threading, time
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+ENABLED = os.getenv("HYDRA_METRICS", "0").lower() not in {"", "0", "off", "false", "no"}
+PREFIX  = "hydra_"
+BUCKETS = (1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+_COUNTERS: Dict[_Key, float] = {}
+_HISTS:    Dict[_Key, list]  = {}                  # [bucket counts…, +Inf], sum
+_LOCK = threading.Lock()
+_NOOP = contextlib.nullcontext()
+
+def enable(on: bool = True):
+    global ENABLED
+    ENABLED = on
+
+def _key(name: str, labels: Dict[str, Any]) -> _Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+# ───────────────────────────────────────────────────────────────
+# recording
+# ───────────────────────────────────────────────────────────────
+def inc(name: str, n: float = 1, **labels):
+    if not ENABLED:
+        return
+    k = _key(name, labels)
+    with _LOCK:
+        _COUNTERS[k] = _COUNTERS.get(k, 0) + n
+
+def _observe(k: _Key, v: float):
+    i = bisect.bisect_left(BUCKETS, v)
+    with _LOCK:
+        h = _HISTS.get(k)
+        if h is None:
+            h = _HISTS[k] = [[0] * (len(BUCKETS) + 1), 0.0]
+        h[0][i] += 1
+        h[1]    += v
+
+def observe(name: str, value: float, **labels):
+    if ENABLED:
+        _observe(_key(name, labels), value)
+
+class _Timer:
+    __slots__ = ("k", "t0")
+    def __init__(self, k: _Key):
+        self.k = k
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+    def __exit__(self, *exc):
+        _observe(self.k, time.perf_counter() - self.t0)
+
+def timer(name: str, **labels):
+    """`with timer("stage_seconds", stage="alias"): …` — no-op when disabled."""
+    return _Timer(_key(name, labels)) if ENABLED else _NOOP
+
+def record_llm(caller: str, resp=None, *, ok: bool = True):
+    """Request / token counters for one chat-completion call."""
+    if not ENABLED:
+        return
+    inc("llm_requests_total", caller=caller, status="ok" if ok else "error")
+    usage = getattr(resp, "usage", None)
+    if usage is not None:
+        inc("llm_tokens_total", getattr(usage, "prompt_tokens", 0) or 0,
+            caller=caller, kind="prompt")
+        inc("llm_tokens_total", getattr(usage, "completion_tokens", 0) or 0,
+            caller=caller, kind="completion")
+
+# ───────────────────────────────────────────────────────────────
+# state: snapshot / merge / reset
+# ───────────────────────────────────────────────────────────────
+def snapshot(reset: bool = False) -> Dict[str, list]:
+    """Picklable / JSON-able copy of every series."""
+    with _LOCK:
+        snap = {"counters": [[n, dict(l), v] for (n, l), v in _COUNTERS.items()],
+                "histograms": [[n, dict(l), list(h[0]), h[1]] for (n, l), h in _HISTS.items()]}
+        if reset:
+            _COUNTERS.clear(); _HISTS.clear()
+    return snap
+
+def merge(snap: Dict[str, list]):
+    """Add another process's `snapshot()` into this one (enabled or not)."""
+    with _LOCK:
+        for n, l, v in snap.get("counters", ()):
+            k = _key(n, l)
+            _COUNTERS[k] = _COUNTERS.get(k, 0) + v
+        for n, l, counts, total in snap.get("histograms", ()):
+            h = _HISTS.setdefault(_key(n, l), [[0] * (len(BUCKETS) + 1), 0.0])
+            h[0] = [a + b for a, b in zip(h[0], counts)]
+            h[1] += total
+
+def reset():
+    with _LOCK:
+        _COUNTERS.clear(); _HISTS.clear()
+
+# ───────────────────────────────────────────────────────────────
+# export
+# ───────────────────────────────────────────────────────────────
+def _quantile(counts: list, q: float) -> float:
+    """Bucket upper bound holding the q-th observation (Prometheus-style)."""
+    n, seen = sum(counts), 0
+    for i, c in enumerate(counts):
+        seen += c
+        if seen >= q * n:
+            return BUCKETS[i] if i < len(BUCKETS) else float("inf")
+    return 0.0
+
+def to_json() -> Dict[str, Any]:
+    snap = snapshot()
+    label = lambda n, l: n + ("{" + ",".join(f"{k}={v}" for k, v in sorted(l.items())) + "}"
+                              if l else "")
+    out: Dict[str, Any] = {"counters": {label(n, l): v for n, l, v in snap["counters"]},
+                           "histograms": {}}
+    for n, l, counts, total in snap["histograms"]:
+        cnt = sum(counts)
+        out["histograms"][label(n, l)] = {
+            "count": cnt, "sum": total, "mean": total / cnt if cnt else 0.0,
+            "p50": _quantile(counts, 0.50), "p95": _quantile(counts, 0.95),
+            "p99": _quantile(counts, 0.99),
+            "buckets": dict(zip([*map(str, BUCKETS), "+Inf"], counts))}
+    # derived hit rates
+    c = out["counters"]
+    for cache in ("hv_cache_total", "llm_cache_total"):
+        hit, miss = c.get(f"{cache}{{result=hit}}", 0), c.get(f"{cache}{{result=miss}}", 0)
+        if hit + miss:
+            out.setdefault("hit_rates", {})[cache[:-6]] = hit / (hit + miss)
+    return out
+
+def to_prometheus() -> str:
+    snap  = snapshot()
+    esc   = lambda v: str(v).replace("\\", r"\\").replace('"', r'\"').replace("\n", r"\n")
+    fmt   = lambda l: "{" + ",".join(f'{k}="{esc(v)}"' for k, v in sorted(l.items())) + "}" if l else ""
+    lines, typed = [], set()
+    for n, l, v in sorted(snap["counters"], key=lambda r: (r[0], sorted(r[1].items()))):
+        if n not in typed:
+            lines.append(f"# TYPE {PREFIX}{n} counter"); typed.add(n)
+        lines.append(f"{PREFIX}{n}{fmt(l)} {v:g}")
+    for n, l, counts, total in sorted(snap["histograms"], key=lambda r: (r[0], sorted(r[1].items()))):
+        if n not in typed:
+            lines.append(f"# TYPE {PREFIX}{n} histogram"); typed.add(n)
+        cum = 0
+        for le, c in zip([*map(repr, BUCKETS), "+Inf"], counts):
+            cum += c
+            lines.append(f"{PREFIX}{n}_bucket{fmt({**l, 'le': le})} {cum}")
+        lines.append(f"{PREFIX}{n}_sum{fmt(l)} {total:.6g}")
+        lines.append(f"{PREFIX}{n}_count{fmt(l)} {cum}")
+    return "\n".join(lines) + "\n"
+
+def dump(path) -> Path:
+    """Write metrics to `path`: Prometheus text for *.prom / *.txt, else JSON."""
+    path = Path(path)
+    if path.suffix in {".prom", ".txt"}:
+        path.write_text(to_prometheus())
+    else:
+        path.write_text(json.dumps(to_json(), indent=2))
+    return path
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+deps/models.py
+──────────────
+Process-wide lazy model registry.
+
+  minilm()                 shared SentenceTransformer  (None if not installed)
+  spacy_nlp(name)          shared spaCy pipeline per model name
+  PIPE_DISABLE             components the bulk nlp.pipe paths skip
+  lazy(key)                proxy that loads on first call/attribute access
+  warm(*keys)              load eagerly (worker start-up)
+  stats()                  {key: {"load_s": …, "rss_mb": …}}   (rss_mb only where readable)
+
+Nothing heavy is imported until a model is first requested, so importing
+the extractors (or running `--help`) costs no model loads.
+"""
+from __future__ import annotations
+import os, threading, time
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import resource
+except ImportError:                               # non-POSIX: no RSS figure
+    resource = None
+
+MINILM_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+_LOADERS:   Dict[str, Callable[[], Any]] = {}
+_INSTANCES: Dict[str, Any] = {}
+_STATS:     Dict[str, Dict[str, float]] = {}
+_LOCKS:     Dict[str, threading.Lock] = {}
+_GLOBAL = threading.Lock()
+
+# ───────────────────────────────────────────────────────────────
+# core
+# ───────────────────────────────────────────────────────────────
+def _rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        if resource is None:
+            return None
+        ru = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss   # peak, KiB on Linux
+        return ru / 1024
+
+def register(key: str, loader: Callable[[], Any]):
+    with _GLOBAL:
+        _LOADERS.setdefault(key, loader)
+        _LOCKS.setdefault(key, threading.Lock())
+
+def get(key: str) -> Any:
+    """Return the shared instance for `key`, loading it on first use."""
+    try:
+        return _INSTANCES[key]
+    except KeyError:
+        pass
+    with _LOCKS[key]:
+        if key not in _INSTANCES:
+            rss0, t0 = _rss_mb(), time.perf_counter()
+            _INSTANCES[key] = _LOADERS[key]()
+            st = _STATS[key] = {"load_s": time.perf_counter() - t0}
+            if rss0 is not None:
+                st["rss_mb"] = _rss_mb() - rss0
+    return _INSTANCES[key]
+
+def warm(*keys: str) -> Dict[str, Dict[str, float]]:
+    for k in keys or tuple(_LOADERS):
+        get(k)
+    return stats()
+
+def stats() -> Dict[str, Dict[str, float]]:
+    return {k: dict(v) for k, v in _STATS.items()}
+
+class lazy:
+    """Stand-in for a model object: first call / attribute access loads it."""
+    def __init__(self, key: str):
+        self._key = key
+    def __call__(self, *a, **kw):
+        return get(self._key)(*a, **kw)
+    def __getattr__(self, name):
+        return getattr(get(self._key), name)
+
+# ───────────────────────────────────────────────────────────────
+# known models
+# ───────────────────────────────────────────────────────────────
+def _load_minilm():
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        return None                                   # callers skip MiniLM tiers
+    return SentenceTransformer(MINILM_NAME)
+
+register("minilm", _load_minilm)
+
+def minilm():
+    return get("minilm")
+
+def spacy_key(name: str = "en_core_web_sm") -> str:
+    """
+    One full pipeline per model name.  Callers that skip components do it
+    per call (`nlp.pipe(…, disable=…)`, `nlp.select_pipes`) instead of
+    loading a second copy.
+    """
+    key = f"spacy:{name}"
+    if key not in _LOADERS:
+        def _load(name=name):
+            import spacy
+            return spacy.load(name)
+        register(key, _load)
+    return key
+
+def spacy_nlp(name: str = "en_core_web_sm"):
+    return get(spacy_key(name))
+
+# components no extractor reads; bulk paths pass this to nlp.pipe(disable=…)
+PIPE_DISABLE = ("ner",)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+deps/predicate_index.py
+───────────────────────
+MiniLM index over known fine predicates and abstract edge types, used by
+edge_type_service to keep Dict-B prompts short and to skip the LLM for
+obvious near-synonyms.
+
+  add(pairs)                 embed new (text, abstract) entries in one batch
+  sync(version, items_fn)    add Dict-A entries when its size changed
+  rank(pred, candidates, k)  top-k abstracts by best cosine of any entry
+                             mapping to them  (None when MiniLM is missing)
+  record(outcome, top1)      tuning statistics;  stats() → dict
+
+Entries are fine predicates (`purchased` → acquired_by) and the type names
+themselves (`acquired by` → acquired_by); an abstract's score is the best
+of its entries.  Vectors live in one float32 matrix, so a query is one
+MiniLM encode + one matvec.
+
+Outcomes recorded per Dict-A miss:
+  auto   top-1 ≥ threshold, accepted without the LLM
+  agree  LLM chose the top-1 type          hit   LLM chose another shortlisted type
+  new    LLM created a type                miss  LLM chose a type outside the shortlist
+  off    no MiniLM → full pool sent as before
+`stats()` bins top-1 scores of LLM decisions by whether the LLM agreed,
+so `thresholds` shows the precision/coverage an AUTO_ACCEPT value would
+have had on this run.
+"""
+from __future__ import annotations
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from deps import metrics, models
+
+N_BINS = 20                                           # top-1 score histogram, 0.05 wide
+
+def _label(text: str) -> str:
+    return text.replace("_", " ").strip().lower()
+
+class PredicateIndex:
+    def __init__(self):
+        self._lock  = threading.Lock()
+        self._rows: Dict[str, int] = {}               # label text → row
+        self._types: Dict[str, int] = {}              # abstract → code
+        self._names: List[str] = []                   # code → abstract
+        self._codes = np.empty(0, np.int32)           # row → abstract code
+        self._vecs  = np.empty((0, 0), np.float32)    # row → unit MiniLM vector
+        self._version = None
+        self._counts: Dict[str, int] = {}
+        self._agree    = np.zeros(N_BINS, np.int64)   # LLM decisions by top-1 score bin
+        self._disagree = np.zeros(N_BINS, np.int64)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @staticmethod
+    def _embed(texts: List[str]) -> Optional[np.ndarray]:
+        m = models.minilm()
+        if m is None:
+            return None
+        return np.asarray(m.encode(texts, normalize_embeddings=True, batch_size=64), np.float32)
+
+    def _code(self, abstract: str) -> int:
+        c = self._types.get(abstract)
+        if c is None:
+            c = self._types[abstract] = len(self._names)
+            self._names.append(abstract)
+        return c
+
+    # ----------------------------------------------------------
+    def add(self, pairs: Iterable[Tuple[str, str]]) -> None:
+        """(fine predicate or type name, abstract) pairs; re-adding a text relabels it."""
+        with self._lock:
+            new: Dict[str, str] = {}
+            for text, abstract in pairs:
+                t = _label(text)
+                r = self._rows.get(t)
+                if r is None:
+                    new.setdefault(t, abstract)
+                else:
+                    self._codes[r] = self._code(abstract)
+            if not new:
+                return
+            V = self._embed(list(new))
+            if V is None:
+                return
+            n = len(self._rows)
+            self._rows.update({t: n + i for i, t in enumerate(new)})
+            self._codes = np.concatenate(
+                [self._codes, np.fromiter((self._code(a) for a in new.values()), np.int32)])
+            self._vecs = V if not n else np.vstack([self._vecs, V])
+
+    def sync(self, version, items_fn: Callable[[], Iterable[Tuple[str, str]]]) -> None:
+        """Add `items_fn()` unless `version` (e.g. len of Dict-A) is unchanged."""
+        if version == self._version:
+            return
+        items = list(items_fn())
+        self.add(items + [(a, a) for a in {a for _, a in items}])
+        self._version = version
+
+    def rank(self, pred: str, candidates: Optional[Iterable[str]] = None,
+             k: int = 8) -> Optional[List[Tuple[str, float]]]:
+        """
+        [(abstract, score)] best first, at most `k`, restricted to
+        `candidates` if given (missing names are indexed first).
+        None when MiniLM is unavailable.
+        """
+        if candidates is not None:
+            candidates = list(candidates)
+            self.add((a, a) for a in candidates if _label(a) not in self._rows)
+        q = self._embed([_label(pred)])
+        if q is None:
+            return None
+        with self._lock:
+            V, codes, names = self._vecs, self._codes, list(self._names)
+        if not len(codes):
+            return []
+        best = np.full(len(names), -np.inf, np.float32)
+        np.maximum.at(best, codes, V @ q[0])
+        if candidates is not None:
+            keep = np.zeros(len(names), bool)
+            keep[[self._types[a] for a in candidates if a in self._types]] = True
+            best[~keep] = -np.inf
+        order = np.argsort(-best, kind="stable")[:k]
+        return [(names[c], float(best[c])) for c in order if np.isfinite(best[c])]
+
+    def clear_entries(self):
+        """Forget every indexed entry (statistics are kept)."""
+        with self._lock:
+            self._rows.clear(); self._types.clear(); self._names.clear()
+            self._codes = np.empty(0, np.int32)
+            self._vecs  = np.empty((0, 0), np.float32)
+            self._version = None
+
+    # ----------------------------------------------------------
+    # statistics
+    # ----------------------------------------------------------
+    def record(self, outcome: str, top1: Optional[float] = None, *, agreed: bool = False):
+        metrics.inc("predicate_index_total", result=outcome)
+        with self._lock:
+            self._counts[outcome] = self._counts.get(outcome, 0) + 1
+            if top1 is not None and outcome != "auto":
+                b = min(max(int(top1 * N_BINS), 0), N_BINS - 1)
+                (self._agree if agreed else self._disagree)[b] += 1
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            counts = dict(self._counts)
+            agree, disagree = self._agree.copy(), self._disagree.copy()
+        ranked = sum(counts.values()) - counts.get("off", 0)
+        llm    = int(agree.sum() + disagree.sum())
+        chosen = counts.get("agree", 0) + counts.get("hit", 0)     # LLM picked a shortlisted type
+        thresholds = {}
+        for b in range(N_BINS // 2, N_BINS):                 # 0.50 … 0.95
+            a, d = int(agree[b:].sum()), int(disagree[b:].sum())
+            thresholds[f"{b / N_BINS:.2f}"] = {
+                "coverage":  (a + d) / llm if llm else 0.0,
+                "precision": a / (a + d) if a + d else None}
+        return {"entries": len(self), "counts": counts,
+                "auto_rate": counts.get("auto", 0) / ranked if ranked else 0.0,
+                "shortlist_recall": (chosen / (chosen + counts.get("miss", 0))
+                                     if chosen + counts.get("miss", 0) else None),
+                "top1_bins": {f"{b / N_BINS:.2f}": [int(agree[b]), int(disagree[b])]
+                              for b in range(N_BINS) if agree[b] or disagree[b]},
+                "thresholds": thresholds}
+
+    def reset_stats(self):
+        with self._lock:
+            self._counts.clear()
+            self._agree[:] = 0
+            self._disagree[:] = 0
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+deps/throttle.py
+────────────────
+Client-side flow control for LLM calls.
+
+  TokenBucket      async rate limiter (rate req/s, burst capacity)
+  backoff_delay()  jittered exponential backoff, honours Retry-After
+  is_retryable()   429 / 5xx / connection errors and timeouts
+"""
+from __future__ import annotations
+import asyncio, random, time
+from typing import Optional, Tuple, Type
+
+try:                                     # the client's transport errors, when installed
+    from openai import APIConnectionError as _APIConnectionError   # APITimeoutError subclasses it
+    _CLIENT_TRANSIENT: Tuple[Type[BaseException], ...] = (_APIConnectionError,)
+except ImportError:
+    _CLIENT_TRANSIENT = ()
+
+TRANSIENT = (ConnectionError, TimeoutError, asyncio.TimeoutError) + _CLIENT_TRANSIENT
+
+# ───────────────────────────────────────────────────────────────
+# token bucket
+# ───────────────────────────────────────────────────────────────
+class TokenBucket:
+    """`rate` tokens per second, at most `capacity` banked."""
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate     = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens  = self.capacity
+        self._stamp   = time.monotonic()
+        self._lock    = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp  = now
+
+    async def acquire(self, n: float = 1.0):
+        async with self._lock:                   # FIFO-ish: one waiter refills at a time
+            self._refill()
+            while self._tokens < n:
+                await asyncio.sleep((n - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= n
+
+# ───────────────────────────────────────────────────────────────
+# backoff
+# ───────────────────────────────────────────────────────────────
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds from a `Retry-After` header on an HTTP error, if any."""
+    resp = getattr(exc, "response", None)
+    hdrs = getattr(resp, "headers", None)
+    if not hdrs:
+        return None
+    try:
+        return max(0.0, float(hdrs.get("retry-after")))
+    except (TypeError, ValueError):
+        return None
+
+def is_retryable(exc: BaseException) -> bool:
+    """429 / 5xx, or a connection error or timeout (`TRANSIENT`); nothing else."""
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(exc, TRANSIENT)
+
+def backoff_delay(attempt: int, *, base: float = 0.5, cap: float = 30.0,
+                  exc: Optional[BaseException] = None) -> float:
+    """Full-jitter exponential backoff; a server Retry-After wins if longer."""
+    delay = random.uniform(0.0, min(cap, base * 2 ** (attempt - 1)))
+    ra = retry_after(exc) if exc is not None else None
+    return max(delay, ra) if ra is not None else delay
@@ -22,10 +22,12 @@ Usage:
       "I saw a white dog chase the brown cat quickly in the backyard."
 """
 
+from __future__ import annotations
 import sys
-import spacy
 
-nlp = spacy.load("en_core_web_sm")
+from deps import models
+
+nlp = models.lazy(models.spacy_key("en_core_web_sm"))   # loads on first parse
 
 # Pronoun resolution heuristic
 PRONOUNS = {"he","she","it","they","him","her","them"}
@@ -56,9 +58,27 @@ def resolve_pronouns(text: str) -> str:
             last_np = span
     return " ".join(tokens)
 
+def _antecedents(doc) -> dict:
+    """Pronoun token index → head token of the nearest preceding NP (same rule as above)."""
+    ante, last = {}, None
+    for tok in doc:
+        if tok.text.lower() in PRONOUNS and last is not None:
+            ante[tok.i] = last
+        if tok.dep_ in SUBJ_DEPS|OBJ_DEPS|{"appos"} and tok.pos_ in {"NOUN","PROPN"}:
+            last = tok
+    return ante
+
 def extract_events(text: str):
     """Extract events from resolved text."""
-    doc = nlp(text)
+    return extract_events_doc(nlp(text))
+
+def extract_events_doc(doc, ante: dict | None = None):
+    """
+    Events from an already-parsed Doc.  With `ante` (see _antecedents)
+    pronoun fillers are replaced by their antecedent head in the same
+    pass — no second parse of a rewritten string.
+    """
+    ante = ante or {}
     events = []
     seen_verbs = set()
     for tok in doc:
@@ -77,23 +97,34 @@ def extract_events(text: str):
             # 2. Subjects
             for child in tok.children:
                 if child.dep_ in SUBJ_DEPS:
-                    mods = [gc.text.lower() for gc in child.children if gc.dep_ in ATTR_DEPS]
+                    src  = ante.get(child.i, child)
+                    mods = [gc.text.lower() for gc in src.children if gc.dep_ in ATTR_DEPS]
                     events.append({
                         "role": "Subject",
-                        "filler": child.text.lower(),
+                        "filler": src.text.lower(),
                         "attributes": mods
                     })
             # 3. Objects
             for child in tok.children:
                 if child.dep_ in OBJ_DEPS:
-                    mods = [gc.text.lower() for gc in child.children if gc.dep_ in ATTR_DEPS]
+                    src  = ante.get(child.i, child)
+                    mods = [gc.text.lower() for gc in src.children if gc.dep_ in ATTR_DEPS]
                     events.append({
                         "role": "Object",
-                        "filler": child.text.lower(),
+                        "filler": src.text.lower(),
                         "attributes": mods
                     })
     return events
 
+def process_corpus(texts, *, batch_size: int = 256, n_process: int = 1):
+    """
+    Bulk mode: stream `texts` through nlp.pipe once and yield one event
+    list per text, pronouns resolved on the same Doc.
+    """
+    for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process,
+                        disable=models.PIPE_DISABLE):
+        yield extract_events_doc(doc, _antecedents(doc))
+
 if __name__=="__main__":
     if len(sys.argv)!=2:
         print("Usage: python enhanced_event_extractor.py \"Your text here.\"")
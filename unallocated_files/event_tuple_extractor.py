@@ -20,10 +20,12 @@ Usage:
       "I saw a white dog chase the brown cat quickly in the backyard."
 """
 
+from __future__ import annotations
 import sys
-import spacy
 
-nlp = spacy.load("en_core_web_sm")
+from deps import models
+
+nlp = models.lazy(models.spacy_key("en_core_web_sm"))   # loads on first parse
 
 # Pronouns for heuristic resolution
 PRONOUNS = {"he","she","it","they","him","her","them"}
@@ -62,9 +64,26 @@ def resolve_pronouns(text: str) -> str:
             last_np = span
     return " ".join(tokens)
 
+def _antecedents(doc) -> dict:
+    """Pronoun token index → head token of the most recent NP (same rule as above)."""
+    ante, last = {}, None
+    for tok in doc:
+        if tok.text.lower() in PRONOUNS and last is not None:
+            ante[tok.i] = last
+        if tok.dep_ in {"nsubj","dobj","pobj","iobj","appos"} and tok.pos_ in {"NOUN","PROPN"}:
+            last = tok
+    return ante
+
 def extract_events(text: str):
     """Extract a list of nested event dicts from resolved text."""
-    doc = nlp(text)
+    return extract_events_doc(nlp(text))
+
+def extract_events_doc(doc, ante: dict | None = None):
+    """
+    Events from an already-parsed Doc; `ante` (see _antecedents) swaps
+    pronoun fillers for their antecedent head without re-parsing.
+    """
+    ante = ante or {}
     events = []
     for tok in doc:
         if tok.pos_ == "VERB":
@@ -82,15 +101,25 @@ def extract_events(text: str):
             for child in tok.children:
                 if child.dep_ in SPO_MAP:
                     role = SPO_MAP[child.dep_]
+                    src  = ante.get(child.i, child)
                     # collect noun modifiers
-                    attrs = [gc.text.lower() for gc in child.children if gc.dep_ in ATTR_DEPS]
+                    attrs = [gc.text.lower() for gc in src.children if gc.dep_ in ATTR_DEPS]
                     events.append({
                         "role": role,
-                        "filler": child.text.lower(),
+                        "filler": src.text.lower(),
                         "attributes": attrs
                     })
     return events
 
+def process_corpus(texts, *, batch_size: int = 256, n_process: int = 1):
+    """
+    Bulk mode: one nlp.pipe pass over all `texts`; yields one event list
+    per text, pronouns resolved on the same Doc.
+    """
+    for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process,
+                        disable=models.PIPE_DISABLE):
+        yield extract_events_doc(doc, _antecedents(doc))
+
 if __name__ == "__main__":
     if len(sys.argv) != 2:
         print("Usage: python event_tuple_extractor.py \"Your text here.\"")
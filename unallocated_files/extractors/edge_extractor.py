@@ -4,43 +4,53 @@ Layer-2  —  Sentence-graph extractor with:
   • AliasResolving  (T0/T1/T2)
   • Passive→Active rewrite
   • Predicate→Abstract mapping (Dict-A/Dict-B)   + logging
+  • Tiered extraction: spaCy rule path first, LLM only when it is unsure
   • extract_sentence_graph()   – returns list[edge] for ALL tuples
 """
 from __future__ import annotations
-import re, json, collections
+import re, json, collections, threading
 from pathlib import Path
-from typing   import Dict, Any, List, Tuple
+from typing   import Dict, Any, Iterable, List, Tuple
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
 from deps.alias_service      import AliasResolver
-from deps.edge_type_service  import resolve_predicate
+from deps.edge_type_service  import (abstract_inventory, accept_typed, resolve_predicate,
+                                     resolve_predicates)
+from deps                    import hd_packed, metrics, models
 from extractors.triple_extractor import Triple, extract_triples
+from extractors.rule_extractor   import TIER_LLM, TIER_RULE, rule_triples, rule_triples_many
 
 # ───────── user knob + counters
 EXPECTED_ABSTRACTS: List[str] = []          # set in notebook
+FILTER_EXPECTED               = True        # False → prompt with them but keep every edge
+HV_PACKED                     = False       # True → store 512-byte packed HVs
+MERGED_EXTRACTION             = False       # True → one LLM call returns typed triples
+CASCADE_EXTRACTION            = False       # True → rule path first, LLM on miss/ambiguity
 EDGE_COUNTS         = collections.Counter()
 ALIAS_TIER_COUNTS   = collections.Counter()
+EXTRACT_TIER_COUNTS = collections.Counter()   # sentences per tier (TIER_RULE / TIER_LLM)
 
 # ───────── paths + resources
 HERE = Path(__file__).resolve().parent if "__file__" in globals() else Path.cwd()
 RES  = HERE.parent.parent / "resources";  RES.mkdir(exist_ok=True)
 
-# ───────── alias resolver
+# ───────── alias resolver  (memo lives for one document)
 _resolver = AliasResolver()
+_resolver_doc: str | None = None
 
 def _alias(text: str, trace: List[str]) -> Tuple[str, dict]:
     meta = {"eid": None, "alias_tier": -1}
     out  = []
-    for tok in re.findall(r"\w+|\W+", text):
-        canon, eid, tier = _resolver.resolve(tok)
+    toks = re.findall(r"\w+|\W+", text)
+    for tok, (canon, eid, tier) in zip(toks, _resolver.resolve_many(toks)):
         out.append(canon)
         if eid and not meta["eid"]:
             meta["eid"] = eid
         if tier >= 0:
             meta["alias_tier"] = tier
             ALIAS_TIER_COUNTS[tier] += 1
+            metrics.inc("alias_tier_total", tier=tier)
     trace.append(f"Alias tier={meta['alias_tier']}")
     return "".join(out), meta
 
@@ -57,8 +67,12 @@ def _to_active(sentence: str, trace: List[str]) -> Tuple[str, bool]:
     trace.append("Passive→active rewrite")
     return f"{subj} {verb} {obj}.", True
 
-# ───────── MiniLM & projection
-MINILM = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+# ───────── MiniLM (shared, loaded on first encode) & projection
+def __getattr__(name):                       # legacy `edge_extractor.MINILM`
+    if name == "MINILM":
+        return models.minilm()
+    raise AttributeError(name)
+
 proj_path = RES / "A.npy"
 if proj_path.exists():
     PROJ = np.load(proj_path)
@@ -68,8 +82,46 @@ else:
     PROJ /= np.linalg.norm(PROJ,axis=1,keepdims=True)+1e-6
     np.save(proj_path, PROJ)
 
+# token → int8 HV memo (bounded LRU, shared across sentences/batches)
+HV_CACHE_SIZE = 50_000
+_HV_CACHE: "collections.OrderedDict[str, np.ndarray]" = collections.OrderedDict()
+_HV_LOCK  = threading.Lock()
+
+def _emb_many(toks: Iterable[str]) -> Dict[str, np.ndarray]:
+    """
+    Batched token → HV.  Unique cache misses go through ONE MiniLM encode
+    and ONE projection matmul; results are memoised in `_HV_CACHE`.
+    """
+    toks = list(dict.fromkeys(toks))
+    out: Dict[str, np.ndarray] = {}
+    with _HV_LOCK:
+        for t in toks:
+            hv = _HV_CACHE.get(t)
+            if hv is not None:
+                _HV_CACHE.move_to_end(t)
+                out[t] = hv
+    miss = [t for t in toks if t not in out]
+    metrics.inc("hv_cache_total", len(out), result="hit")
+    if miss:
+        metrics.inc("hv_cache_total", len(miss), result="miss")
+        with metrics.timer("stage_seconds", stage="hv_encode"):
+            E   = models.minilm().encode(miss, normalize_embeddings=True, batch_size=64)   # (m, 384)
+            HVs = np.sign(E @ PROJ.T).astype(np.int8)                             # (m, 4096)
+        HVs.setflags(write=False)                                             # rows are shared
+        with _HV_LOCK:
+            for t, hv in zip(miss, HVs):
+                out[t] = _HV_CACHE[t] = hv
+            while len(_HV_CACHE) > HV_CACHE_SIZE:
+                _HV_CACHE.popitem(last=False)
+    return out
+
 def _emb(tok: str) -> np.ndarray:
-    return np.sign(PROJ @ MINILM.encode(tok, normalize_embeddings=True)).astype(np.int8)
+    return _emb_many([tok])[tok]
+
+def warm_hv_cache(triples: Iterable[Triple]) -> None:
+    """Pre-encode every subject/predicate/object of `triples` in one batch."""
+    _emb_many(s for t in triples
+                for s in (t.subject, t.predicate.lower(), t.object))
 
 # ───────── HD ops
 D = 4096
@@ -81,30 +133,134 @@ _perm   = lambda v,tag: np.roll(v,1) if tag=="S" else np.flip(v)
 _surface  = lambda s,p,o: _bundle(_bind(RS,_emb(s)), _bind(RP,_emb(p)), _bind(RO,_emb(o)))
 _semantic = lambda s,p,o: _bind(_emb(p), _bundle(_perm(_emb(s),"S"), _perm(_emb(o),"O")))
 
-# ───────── edge-from-triple helper (internal)
-def _edge_from_triple(sentence: str,
-                      triple: Triple,
-                      trace: List[str]) -> Dict[str, Any] | None:
-    # predicate is already str after schema change
-    subj       = triple.subject
-    fine_pred  = triple.predicate.lower()        # normalise
-    obj        = triple.object
+# ───────── edge-from-triple helpers (internal)
+def inventory() -> Tuple[List[str], List[str]]:
+    """(known abstract types, EXPECTED_ABSTRACTS) for the merged prompt."""
+    return abstract_inventory(EXPECTED_ABSTRACTS), list(EXPECTED_ABSTRACTS)
+
+Resolved = Dict[str, Tuple[str, bool, str]]     # fine predicate → (abstract, created, source)
 
-    abstract, _, source = resolve_predicate(fine_pred, EXPECTED_ABSTRACTS, trace)
+def resolve_batch(triples: Iterable[Triple], trace: List[str] | None = None) -> Resolved:
+    """
+    Dict-A / Dict-B for every untyped predicate in `triples` with ONE
+    `resolve_predicates` call, so a batch's unseen predicates share one
+    LLM prompt.  Pass the result to `edges_from_triples(resolved=…)`.
+    """
+    preds = [t.predicate.lower() for t in triples if not getattr(t, "abstract", None)]
+    if not preds:
+        return {}
+    with metrics.timer("stage_seconds", stage="predicate"):
+        return resolve_predicates(preds, EXPECTED_ABSTRACTS, trace)
+
+def _abstract_of(triple: Triple, trace: List[str],
+                 resolved: Resolved | None = None) -> str | None:
+    """Abstract edge type of `triple`, or None if EXPECTED_ABSTRACTS drops it."""
+    fine_pred = triple.predicate.lower()         # normalise
+    proposal  = getattr(triple, "abstract", None)  # TypedTriple (merged extraction)
+    with metrics.timer("stage_seconds", stage="predicate"):
+        if proposal:
+            abstract, _, source = accept_typed(fine_pred, proposal, EXPECTED_ABSTRACTS, trace)
+        elif resolved and fine_pred in resolved:
+            abstract, _, source = resolved[fine_pred]
+        else:
+            abstract, _, source = resolve_predicate(fine_pred, EXPECTED_ABSTRACTS, trace)
     trace.append(f"Abstract ({'Dict-'+source}) = {abstract}")
 
-    if EXPECTED_ABSTRACTS and abstract not in EXPECTED_ABSTRACTS:
+    if FILTER_EXPECTED and EXPECTED_ABSTRACTS and abstract not in EXPECTED_ABSTRACTS:
         trace.append("-- skipped (abstract not in filter)")
         return None
+    return abstract
+
+def _encode_edge(triple: Triple, abstract: str) -> Dict[str, Any]:
+    subj       = triple.subject
+    fine_pred  = triple.predicate.lower()
+    obj        = triple.object
     EDGE_COUNTS[abstract] += 1
+    metrics.inc("edges_total", abstract=abstract)
 
+    surface, semantic = _surface(subj, fine_pred, obj), _semantic(subj, fine_pred, obj)
+    if HV_PACKED:
+        surface, semantic = hd_packed.pack(surface), hd_packed.pack(semantic)
     return {
         "edge_type": abstract,
-        "surface":   _surface(subj, fine_pred, obj),
-        "semantic":  _semantic(subj, fine_pred, obj),
-        "meta":      {"fine_pred": fine_pred, "abstract": abstract}
+        "surface":   surface,
+        "semantic":  semantic,
+        "meta":      {"fine_pred": fine_pred, "abstract": abstract,
+                      "subject": subj, "object": obj}
     }
 
+def _edge_from_triple(sentence: str,
+                      triple: Triple,
+                      trace: List[str]) -> Dict[str, Any] | None:
+    abstract = _abstract_of(triple, trace)
+    return None if abstract is None else _encode_edge(triple, abstract)
+
+def count_tier(tier: int, trace: List[str], why: str | None = None) -> None:
+    EXTRACT_TIER_COUNTS[tier] += 1
+    metrics.inc("extract_tier_total", tier="rule" if tier == TIER_RULE else "llm")
+    if tier == TIER_RULE:
+        trace.append("Extract tier=rule")
+    else:
+        trace.append("Extract tier=llm" + (f" (rule path: {why})" if why else ""))
+
+def cascade_triples(sentence: str, trace: List[str], *,
+                    inventory=None) -> Tuple[List[Triple], int]:
+    """Confident rule-path triples, else `extract_triples` → (triples, tier)."""
+    with metrics.timer("stage_seconds", stage="rule"):
+        triples, why = rule_triples(sentence)
+    if why is None:
+        count_tier(TIER_RULE, trace)
+        return triples, TIER_RULE
+    count_tier(TIER_LLM, trace, why)
+    return extract_triples(sentence, inventory=inventory), TIER_LLM
+
+def rule_pass(sentences: List[str], traces: List[List[str]]) -> List[List[Triple] | None]:
+    """Batch rule path (one nlp.pipe): triples where confident, None where the LLM decides."""
+    with metrics.timer("stage_seconds", stage="rule"):
+        results = rule_triples_many(sentences)
+    out: List[List[Triple] | None] = []
+    for (triples, why), trace in zip(results, traces):
+        count_tier(TIER_RULE if why is None else TIER_LLM, trace, why)
+        out.append(triples if why is None else None)
+    return out
+
+# ───────── pipeline stages (also used by the streaming ingest CLI)
+def normalise_sentence(sentence: str, doc_id: str,
+                       trace: List[str]) -> Tuple[str, dict]:
+    """Passive→active rewrite + alias resolution → (normalised text, alias meta)."""
+    global _resolver_doc
+    if doc_id != _resolver_doc:
+        _resolver.clear_memo()
+        _resolver_doc = doc_id
+    with metrics.timer("stage_seconds", stage="passive"):
+        sent_act, _ = _to_active(sentence, trace)
+    with metrics.timer("stage_seconds", stage="alias"):
+        return _alias(sent_act, trace)
+
+def edges_from_triples(sentence: str, triples: List[Triple],
+                       doc_id: str, sent_id: int, alias_meta: dict,
+                       trace: List[str], tier: int = TIER_LLM, *,
+                       resolved: Resolved | None = None) -> List[Dict[str,Any]]:
+    """
+    Predicate abstraction, HV encoding and meta for one sentence's triples;
+    `tier` (TIER_RULE / TIER_LLM) is recorded as each edge's `extract_tier`.
+    `resolved` is a `resolve_batch` result covering several sentences;
+    without it the sentence's own predicates are resolved as one batch.
+    """
+    if resolved is None:
+        resolved = resolve_batch(triples, trace)
+    # abstract + filter first, so dropped triples never reach MiniLM
+    kept = [(t, a) for t in triples if (a := _abstract_of(t, trace, resolved)) is not None]
+    warm_hv_cache(t for t, _ in kept)        # one encode for the whole sentence
+    edges: List[Dict[str,Any]] = []
+
+    for t, abstract in kept:
+        edge = _encode_edge(t, abstract)
+        edge["meta"].update(alias_meta | {"doc_id": doc_id, "sent_id": sent_id,
+                                          "extract_tier": tier})
+        edges.append(edge)
+    return edges
+
 # ───────── public: ALL edges in one sentence
 def extract_sentence_graph(sentence: str,
                            doc_id: str,
@@ -112,17 +268,13 @@ def extract_sentence_graph(sentence: str,
                            *,
                            verbose=False) -> List[Dict[str,Any]]:
     trace: List[str] = []
-    sent_act, _ = _to_active(sentence, trace)
-    sent_norm, alias_meta = _alias(sent_act, trace)
-
-    triples = extract_triples(sent_norm)
-    edges: List[Dict[str,Any]] = []
-
-    for t in triples:
-        edge = _edge_from_triple(sentence, t, trace)
-        if edge:
-            edge["meta"].update(alias_meta | {"doc_id": doc_id, "sent_id": sent_id})
-            edges.append(edge)
+    sent_norm, alias_meta = normalise_sentence(sentence, doc_id, trace)
+    inv = inventory() if MERGED_EXTRACTION else None
+    if CASCADE_EXTRACTION:
+        triples, tier = cascade_triples(sent_norm, trace, inventory=inv)
+    else:
+        triples, tier = extract_triples(sent_norm, inventory=inv), TIER_LLM
+    edges   = edges_from_triples(sentence, triples, doc_id, sent_id, alias_meta, trace, tier)
 
     if verbose:
         print(f"\nSentence '{sentence}'")
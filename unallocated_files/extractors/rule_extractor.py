@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+extractors/rule_extractor.py
+────────────────────────────
+Deterministic fast path for triple extraction (spaCy dependency parse).
+
+• rule_triples(sentence)        -> (list[Triple], why)   why None = confident
+• rule_triples_many(sentences)  -> [(list[Triple], why), …]   (nlp.pipe)
+
+A sentence is *confident* when every verb in it yields exactly one clean
+(subject, predicate, object):
+
+    nsubj ─ VERB ─ dobj                 Apple acquired Beats in 2014.
+    nsubj ─ VERB ─ prep ─ pobj          Tesla moved to Austin.
+    nsubjpass ─ VERB ─ prep ─ pobj      Paris is located in France.
+
+with noun / proper-noun fillers (compound and flat modifiers kept, case
+preserved) and no negation, coordination, clausal complements, pronouns
+or `by`-agents.  Anything else — or no verb at all — comes back with a
+reason so the caller can escalate the sentence to the LLM.
+
+Predicates follow the LLM's surface style: the verb as written,
+lower-cased, joined to its preposition with "_" ("acquired",
+"located_in"), so Dict-A seed entries hit directly.
+"""
+from __future__ import annotations
+from typing import Iterable, List, Optional, Tuple
+
+from deps import models
+from extractors.triple_extractor import Triple
+
+nlp = models.lazy(models.spacy_key("en_core_web_sm"))   # loads on first parse
+
+TIER_RULE, TIER_LLM = 0, 1              # `extract_tier` of an edge
+
+_FILLER_POS  = {"NOUN", "PROPN", "NUM"}
+_NP_MODS     = {"compound", "flat", "nummod"}
+_COMPLEX     = {"ccomp", "xcomp", "csubj", "csubjpass", "dative", "neg"}
+
+RuleResult = Tuple[List[Triple], Optional[str]]
+
+def _filler(tok) -> Optional[str]:
+    """Head + compound/flat modifiers as written, or None if not a clean NP."""
+    if tok.pos_ not in _FILLER_POS or any(c.dep_ in {"conj", "cc"} for c in tok.children):
+        return None
+    span = [tok]
+    todo = [tok]
+    while todo:
+        for c in todo.pop().children:
+            if c.dep_ in _NP_MODS:
+                span.append(c); todo.append(c)
+    lo, hi = min(t.i for t in span), max(t.i for t in span)
+    return tok.doc[lo:hi + 1].text
+
+def _verb_triple(verb) -> Tuple[Optional[Triple], Optional[str]]:
+    kids = list(verb.children)
+    if any(c.dep_ in _COMPLEX for c in kids):
+        return None, f"complex clause at '{verb.text}'"
+    if any(c.dep_ == "agent" for c in kids):
+        return None, f"passive agent at '{verb.text}'"
+    subj  = [c for c in kids if c.dep_ == "nsubj"]
+    passv = [c for c in kids if c.dep_ == "nsubjpass"]
+    dobj  = [c for c in kids if c.dep_ == "dobj"]
+    preps = [(c, p) for c in kids if c.dep_ == "prep"
+             for p in c.children if p.dep_ == "pobj"]
+    if len(subj) + len(passv) != 1:
+        return None, f"no single subject for '{verb.text}'"
+    if passv and dobj:
+        return None, f"passive with object at '{verb.text}'"
+
+    pred = verb.text.lower()
+    if len(dobj) == 1:
+        obj = dobj[0]
+    elif not dobj and len(preps) == 1:
+        prep, obj = preps[0]
+        pred = f"{pred}_{prep.text.lower()}"
+    else:
+        return None, f"no single object for '{verb.text}'"
+
+    s, o = _filler((subj or passv)[0]), _filler(obj)
+    if s is None or o is None:
+        return None, f"unclear argument of '{verb.text}'"
+    return Triple(subject=s, predicate=pred, object=o), None
+
+def rule_triples_doc(doc) -> RuleResult:
+    """Triples from an already-parsed Doc; `why` explains a non-confident result."""
+    triples: List[Triple] = []
+    for tok in doc:
+        if tok.pos_ != "VERB":
+            continue
+        t, why = _verb_triple(tok)
+        if why is not None:
+            return triples, why
+        triples.append(t)
+    return triples, (None if triples else "no verb")
+
+def rule_triples(sentence: str) -> RuleResult:
+    return rule_triples_doc(nlp(sentence))
+
+def rule_triples_many(sentences: Iterable[str], *, batch_size: int = 256) -> List[RuleResult]:
+    """Bulk mode: one nlp.pipe pass over `sentences`, results in input order."""
+    return [rule_triples_doc(doc)
+            for doc in nlp.pipe(sentences, batch_size=batch_size, disable=models.PIPE_DISABLE)]
@@ -4,14 +4,29 @@ extractors/triple_extractor.py
 ──────────────────────────────
 • extract_triples(sentence) -> list[Triple]
 • extract_triple(sentence)  -> first Triple (legacy)
+• aextract_triples(sentence)          -> list[Triple]        (async)
+• extract_triples_many(sentences)     -> list[list[Triple]]  (async fan-out,
+                                         bounded concurrency + rate limit)
+• extract_triples_packed(sentences)   -> list[list[Triple]]  (N numbered
+                                         sentences per request, N sized to a
+                                         token budget; per-sentence fallback)
+
+Passing `inventory=(abstract_types, expected)` to any of them switches to
+the merged prompt: one call returns TypedTriples whose `abstract` is an
+existing type or "NEW: <name>", so predicate resolution needs no LLM call.
 """
 
 from __future__ import annotations
-import json, time
+import contextlib, json, time, asyncio, warnings
 from enum       import Enum
-from typing     import List
+from typing     import List, Optional, Sequence, Tuple
 from pydantic   import BaseModel, constr, ValidationError
-from deps.deepinfra_client import client   # DeepInfra token + base_url
+from deps.deepinfra_client import client, get_aclient, run_closing   # DeepInfra token + base_url
+from deps.throttle import TokenBucket, backoff_delay, is_retryable
+from deps.llm_cache import CACHE, make_key
+from deps import metrics
+
+MODEL = "mistralai/Mixtral-8x7B-Instruct-v0.1"
 
 # ─── schema ──────────────────────────────────────────────────────
 class Predicate(str, Enum):
@@ -24,6 +39,11 @@ class Triple(BaseModel):
     predicate: constr(strip_whitespace=True, min_length=1)
     object:    constr(strip_whitespace=True, min_length=1)
 
+class TypedTriple(Triple):
+    abstract:  Optional[str] = None          # existing type, or "NEW: <name>"
+
+Inventory = Tuple[Sequence[str], Sequence[str]]   # (known abstract types, EXPECTED_ABSTRACTS)
+
 # ─── plural-tuple prompt  (all braces escaped) ───────────────────
 PROMPT_TMPL = (
     "Extract *all* (subject, predicate, object) tuples from the sentence as "
@@ -32,54 +52,232 @@ PROMPT_TMPL = (
     "Return JSON array only—no commentary.\n\n{sent}"
 )
 
-# ─── extractor ───────────────────────────────────────────────────
-# ─── robust plural extractor ───────────────────────────────────────────────
-def extract_triples(sentence: str, *, max_tries: int = 3) -> List[Triple]:
+# ─── merged prompt: triples + abstract edge type in one call ─────
+TYPED_PROMPT_TMPL = (
+    "Abstract edge types so far:\n{types}\n\n"
+    "{wanted}"
+    "Extract *all* (subject, predicate, object) tuples from the sentence and "
+    "label each with its abstract edge type: an existing type *verbatim*, or "
+    "\"NEW: <short_name>\" if none fits.  Strict JSON **array** with this "
+    "exact schema:\n"
+    "[{{\"subject\": string, \"predicate\": string, \"object\": string, "
+    "\"abstract\": string}}, ...]\n"
+    "Return JSON array only—no commentary.\n\n{sent}"
+)
+
+# ─── packed prompt: N numbered sentences per call ────────────────
+PACKED_PROMPT_TMPL = (
+    "{preamble}"
+    "Extract *all* (subject, predicate, object) tuples from EACH numbered "
+    "sentence below{label}.  Tag every tuple with the number of the sentence "
+    "it came from.  One strict JSON **array** for all sentences with this "
+    "exact schema:\n"
+    "[{{\"i\": sentence_number, \"subject\": string, \"predicate\": string, "
+    "\"object\": string{abstract}}}, ...]\n"
+    "Return JSON array only—no commentary.\n\n{sents}"
+)
+
+PACK_BUDGET = 1024      # est. prompt tokens per packed request
+PACK_MAX    = 16        # sentences per packed request, whatever the budget
+PACK_OUT    = 96        # completion tokens reserved per packed sentence
+
+def _preamble(inventory: Optional[Inventory]) -> str:
+    if inventory is None:
+        return ""
+    types, expected = inventory
+    wanted = (f"Only these types are wanted (omit other tuples): {', '.join(expected)}\n\n"
+              if expected else "")
+    return f"Abstract edge types so far:\n{chr(10).join(types) or '(none yet)'}\n\n{wanted}"
+
+def _prompt(sentence: str, inventory: Optional[Inventory]) -> str:
+    if inventory is None:
+        return PROMPT_TMPL.format(sent=sentence)
+    types, expected = inventory
+    wanted = (f"Only these types are wanted (omit other tuples): {', '.join(expected)}\n\n"
+              if expected else "")
+    return TYPED_PROMPT_TMPL.format(types="\n".join(types) or "(none yet)",
+                                    wanted=wanted, sent=sentence)
+
+def _packed_prompt(sentences: Sequence[str], inventory: Optional[Inventory]) -> str:
+    label = ("" if inventory is None else
+             " and label each with its abstract edge type: an existing type "
+             "*verbatim*, or \"NEW: <short_name>\" if none fits")
+    return PACKED_PROMPT_TMPL.format(
+        preamble=_preamble(inventory), label=label,
+        abstract="" if inventory is None else ", \"abstract\": string",
+        sents="\n".join(f"[{k}] {s}" for k, s in enumerate(sentences, 1)))
+
+def _request(sentence: str, inventory: Optional[Inventory] = None) -> dict:
+    return dict(
+        model=MODEL,
+        messages=[{
+            "role": "user",
+            "content": _prompt(sentence, inventory)
+        }],
+        response_format={"type": "json_object"},
+        temperature=0.0,
+        max_tokens=256 if inventory is None else 384,
+    )
+
+def _packed_request(sentences: Sequence[str], inventory: Optional[Inventory] = None) -> dict:
+    per = PACK_OUT if inventory is None else PACK_OUT * 3 // 2
+    return dict(
+        model=MODEL,
+        messages=[{
+            "role": "user",
+            "content": _packed_prompt(sentences, inventory)
+        }],
+        response_format={"type": "json_object"},
+        temperature=0.0,
+        max_tokens=min(4096, 64 + per * len(sentences)),
+    )
+
+def _est_tokens(text: str) -> int:
+    return len(text) // 4 + 1            # ~4 chars / token; no tokenizer needed
+
+def _windows(sentences: Sequence[str], budget: int = PACK_BUDGET,
+             max_n: int = PACK_MAX, inventory: Optional[Inventory] = None
+             ) -> List[List[int]]:
     """
-    Returns list[Triple].  Handles:
+    Greedy split of `sentences` into index windows whose packed prompt stays
+    under ~`budget` tokens (and `max_n` sentences).  A sentence too long for
+    any window still gets one of its own.
+    """
+    base = _est_tokens(_packed_prompt((), inventory))
+    out: List[List[int]] = []
+    cur, used = [], base
+    for i, s in enumerate(sentences):
+        t = _est_tokens(s) + 2           # "[k] " + newline
+        if cur and (used + t > budget or len(cur) >= max_n):
+            out.append(cur)
+            cur, used = [], base
+        cur.append(i)
+        used += t
+    if cur:
+        out.append(cur)
+    return out
+
+def _parse_triples(raw: str, model: type = Triple) -> List[Triple]:
+    """
+    Handles:
       • correct JSON array
       • array-as-string  "[{...}]"
       • single JSON dict  {...}
-    Silently skips malformed items.
+    Silently skips malformed items; raises on non-JSON.
     """
-    for attempt in range(1, max_tries + 1):
-        resp = client.chat.completions.create(
-            model="mistralai/Mixtral-8x7B-Instruct-v0.1",
-            messages=[{
-                "role": "user",
-                "content": PROMPT_TMPL.format(sent=sentence)
-            }],
-            response_format={"type": "json_object"},
-            temperature=0.0,
-            max_tokens=256,
-        )
-
-        raw = resp.choices[0].message.content
+    data = json.loads(raw)
+    # Case: the whole array came back as a string
+    if isinstance(data, str):
+        data = json.loads(data)
+
+    # Normalise to list
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list):
+        raise ValueError("LLM returned non-list JSON")
+
+    triples: List[Triple] = []
+    for item in data:
+        if isinstance(item, dict):
+            try:
+                triples.append(model.model_validate(item))
+            except ValidationError:
+                continue   # skip bad item
+    return triples
+
+def _split_packed(raw: str, n: int, model: type = Triple) -> List[Optional[List[Triple]]]:
+    """
+    Packed reply → per-sentence triples (0-based, length `n`).  A sentence
+    with no tagged item (models skip sentences in packed replies far more
+    often than a sentence truly has no tuple), or any of whose items fails
+    validation, comes back as None so the caller re-asks for it alone;
+    items with a missing or out-of-range index cannot be attributed and
+    are dropped.  Raises on non-JSON.
+    """
+    data = json.loads(raw)
+    if isinstance(data, str):
+        data = json.loads(data)
+    if isinstance(data, dict):
+        data = next((v for v in data.values() if isinstance(v, list)), [data])
+    if not isinstance(data, list):
+        raise ValueError("LLM returned non-list JSON")
+
+    out: List[Optional[List[Triple]]] = [[] for _ in range(n)]
+    for item in data:
+        if not isinstance(item, dict):
+            continue
         try:
-            data = json.loads(raw)
-            # Case: the whole array came back as a string
-            if isinstance(data, str):
-                data = json.loads(data)
-
-            # Normalise to list
-            if isinstance(data, dict):
-                data = [data]
-            if not isinstance(data, list):
-                raise ValueError("LLM returned non-list JSON")
-
-            triples: List[Triple] = []
-            for item in data:
-                if isinstance(item, dict):
-                    try:
-                        triples.append(Triple.model_validate(item))
-                    except ValidationError:
-                        continue   # skip bad item
-            return triples
+            k = int(item.get("i")) - 1
+        except (TypeError, ValueError):
+            continue
+        if not 0 <= k < n or out[k] is None:
+            continue
+        try:
+            out[k].append(model.model_validate({f: v for f, v in item.items() if f != "i"}))
+        except ValidationError:
+            out[k] = None                # whole portion suspect → per-sentence retry
+    return [ts if ts else None for ts in out]     # skipped → per-sentence retry
+
+def _cached_request(sentence: str, inventory: Optional[Inventory] = None):
+    """
+    (request, cache key, model).  The key covers sentence, model and mode
+    — for the merged prompt also EXPECTED_ABSTRACTS, which decides which
+    tuples come back — but not the known-type inventory: it grows during a
+    run, and keying on it would miss the cache for nearly every sentence on
+    a reprocess.  Replayed `abstract` proposals are still only proposals;
+    `accept_typed` checks them against Dict-A.
+    """
+    req = _request(sentence, inventory)
+    if inventory is None:
+        return req, make_key(req), Triple
+    key = make_key({"model": MODEL, "mode": "typed", "sentence": sentence,
+                    "expected": sorted(inventory[1])})
+    return req, key, TypedTriple
+
+def _from_cache(key: str, model: type = Triple) -> Optional[List[Triple]]:
+    raw = CACHE.get(key)
+    if raw is None:
+        return None
+    try:
+        return _parse_triples(raw, model)
+    except Exception:
+        CACHE.discard(key)               # unparsable entry → refetch
+        return None
+
+def _cache_put(key: str, raw: str) -> None:
+    """Store a parsed reply; a failing cache write only costs a later refetch."""
+    try:
+        CACHE.put(key, raw)
+    except Exception as e:
+        warnings.warn(f"LLM cache write failed: {e}")
 
+# ─── robust plural extractor ───────────────────────────────────────────────
+def extract_triples(sentence: str, *, max_tries: int = 3,
+                    inventory: Optional[Inventory] = None) -> List[Triple]:
+    """
+    Returns list[Triple] (TypedTriple with `inventory`).  Retries the call
+    with jittered exponential backoff; an unparsable reply raises without a
+    retry.  Responses that parse are kept in the persistent LLM cache.
+    """
+    req, key, model = _cached_request(sentence, inventory)
+    hit = _from_cache(key, model)
+    if hit is not None:
+        return hit
+    for attempt in range(1, max_tries + 1):
+        try:
+            with metrics.timer("stage_seconds", stage="triple_llm"):
+                resp = client.chat.completions.create(**req)
+            metrics.record_llm("triples", resp)
+            raw = resp.choices[0].message.content
+            break
         except Exception as e:
-            if attempt == max_tries:
+            metrics.record_llm("triples", ok=False)
+            if attempt == max_tries or not is_retryable(e):
                 raise
-            time.sleep(1.0)
+            time.sleep(backoff_delay(attempt, exc=e))
+    triples = _parse_triples(raw, model)
+    _cache_put(key, raw)
+    return triples
 
 
 # legacy single-tuple helper
@@ -88,3 +286,162 @@ def extract_triple(sentence: str) -> Triple:
     if not triples:
         raise ValueError("No tuple extracted")
     return triples[0]
+
+# ─── async variants ──────────────────────────────────────────────
+async def _acreate(req: dict, limiter: Optional[TokenBucket],
+                   sem: Optional[asyncio.Semaphore], stage: str):
+    """
+    One chat call on the pooled client.  The rate token is taken only once
+    a concurrency slot is held, so tasks queued on `sem` cannot bank tokens
+    and burst past `rate` when a slow call frees the slot.
+    """
+    async with (sem if sem is not None else contextlib.nullcontext()):
+        if limiter is not None:
+            await limiter.acquire()
+        with metrics.timer("stage_seconds", stage=stage):
+            return await get_aclient().chat.completions.create(**req)
+
+async def aextract_triples(sentence: str, *,
+                           max_tries: int = 5,
+                           limiter: Optional[TokenBucket] = None,
+                           sem: Optional[asyncio.Semaphore] = None,
+                           inventory: Optional[Inventory] = None
+                           ) -> List[Triple]:
+    """
+    Async `extract_triples` on the shared pooled client.
+    429s honour Retry-After; other transient errors back off with jitter.
+    Only the call is retried; parsing and the cache write happen once after
+    it, and the SQLite cache is read and written off the event loop.
+    """
+    req, key, model = _cached_request(sentence, inventory)
+    hit = await asyncio.to_thread(_from_cache, key, model)
+    if hit is not None:
+        return hit
+    for attempt in range(1, max_tries + 1):
+        try:
+            resp = await _acreate(req, limiter, sem, "triple_llm")
+            metrics.record_llm("triples", resp)
+            raw = resp.choices[0].message.content
+            break
+        except Exception as e:
+            metrics.record_llm("triples", ok=False)
+            if attempt == max_tries or not is_retryable(e):
+                raise
+            await asyncio.sleep(backoff_delay(attempt, exc=e))
+    triples = _parse_triples(raw, model)
+    await asyncio.to_thread(_cache_put, key, raw)
+    return triples
+
+async def aextract_triples_many(sentences: Sequence[str], *,
+                                concurrency: int = 16,
+                                rate: Optional[float] = None,
+                                max_tries: int = 5,
+                                return_exceptions: bool = False,
+                                inventory: Optional[Inventory] = None
+                                ) -> List[List[Triple]]:
+    """
+    Fan out over `sentences` with at most `concurrency` requests in flight
+    and (optionally) at most `rate` requests/second.  Results keep input order.
+    """
+    sem     = asyncio.Semaphore(concurrency)
+    limiter = TokenBucket(rate) if rate else None
+    return await asyncio.gather(
+        *(aextract_triples(s, max_tries=max_tries, limiter=limiter, sem=sem,
+                           inventory=inventory)
+          for s in sentences),
+        return_exceptions=return_exceptions,
+    )
+
+def extract_triples_many(sentences: Sequence[str], **kw) -> List[List[Triple]]:
+    """Blocking wrapper around `aextract_triples_many` (not for use inside a running loop)."""
+    return asyncio.run(run_closing(aextract_triples_many(sentences, **kw)))
+
+# ─── packed variants ─────────────────────────────────────────────
+async def _apacked(sentences: Sequence[str], *, max_tries: int,
+                   limiter: Optional[TokenBucket], sem: Optional[asyncio.Semaphore],
+                   inventory: Optional[Inventory]) -> List[Optional[List[Triple]]]:
+    """
+    One packed request; every sentence is None if the call keeps failing or
+    the reply does not parse.  Only the call is retried: re-sending the same
+    temperature-0 prompt would just return the same unparsable reply.
+    """
+    req   = _packed_request(sentences, inventory)
+    model = Triple if inventory is None else TypedTriple
+    raw = None
+    for attempt in range(1, max_tries + 1):
+        try:
+            resp = await _acreate(req, limiter, sem, "triple_llm_packed")
+            metrics.record_llm("triples_packed", resp)
+            raw = resp.choices[0].message.content
+            break
+        except Exception as e:
+            metrics.record_llm("triples_packed", ok=False)
+            if attempt == max_tries or not is_retryable(e):
+                return [None] * len(sentences)
+            await asyncio.sleep(backoff_delay(attempt, exc=e))
+    try:
+        return _split_packed(raw, len(sentences), model)
+    except Exception:                    # truncated / non-JSON → per-sentence fallback
+        return [None] * len(sentences)
+
+async def aextract_triples_packed(sentences: Sequence[str], *,
+                                  budget: int = PACK_BUDGET,
+                                  max_n: int = PACK_MAX,
+                                  concurrency: int = 16,
+                                  rate: Optional[float] = None,
+                                  max_tries: int = 5,
+                                  return_exceptions: bool = False,
+                                  inventory: Optional[Inventory] = None
+                                  ) -> List[List[Triple]]:
+    """
+    `aextract_triples_many` with several sentences per request.
+
+    Sentences already in the LLM cache are served from it; the rest are
+    packed into numbered windows of up to `max_n` sentences / ~`budget`
+    prompt tokens.  Each tuple in the reply carries its sentence number and
+    is mapped back to its input position (results keep input order).  A
+    sentence the reply skipped or whose portion fails validation — or
+    whose whole window failed — is re-asked on its own via
+    `aextract_triples`.  Recovered portions are cached under the
+    per-sentence key, so later runs hit regardless of how the windows fall.
+    """
+    sem     = asyncio.Semaphore(concurrency)
+    limiter = TokenBucket(rate) if rate else None
+    reqs    = [_cached_request(s, inventory) for s in sentences]
+    results: List = [None] * len(sentences)
+    todo: List[int] = []
+    hits = await asyncio.to_thread(lambda: [_from_cache(k, m) for _, k, m in reqs])
+    for i, hit in enumerate(hits):
+        if hit is None:
+            todo.append(i)
+        else:
+            results[i] = hit
+
+    async def window(idx: List[int]):
+        parts = await _apacked([sentences[i] for i in idx], max_tries=max_tries,
+                               limiter=limiter, sem=sem, inventory=inventory)
+        retry, puts = [], []
+        for i, part in zip(idx, parts):
+            if part is None:
+                retry.append(i)
+                continue
+            results[i] = part
+            puts.append((reqs[i][1], json.dumps([t.model_dump(exclude_none=True) for t in part])))
+        if puts:
+            await asyncio.to_thread(lambda: [_cache_put(k, raw) for k, raw in puts])
+        if retry:
+            metrics.inc("packed_fallback_total", len(retry))
+        single = await asyncio.gather(
+            *(aextract_triples(sentences[i], max_tries=max_tries, limiter=limiter,
+                               sem=sem, inventory=inventory) for i in retry),
+            return_exceptions=return_exceptions)
+        for i, r in zip(retry, single):
+            results[i] = r
+
+    windows = _windows([sentences[i] for i in todo], budget, max_n, inventory)
+    await asyncio.gather(*(window([todo[k] for k in w]) for w in windows))
+    return results
+
+def extract_triples_packed(sentences: Sequence[str], **kw) -> List[List[Triple]]:
+    """Blocking wrapper around `aextract_triples_packed` (not for use inside a running loop)."""
+    return asyncio.run(run_closing(aextract_triples_packed(sentences, **kw)))
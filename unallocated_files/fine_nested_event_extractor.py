@@ -12,10 +12,12 @@ Usage:
     python tuple_extractor_rule_coref.py "Alice saw her dog. She then walked it home."
 """
 
+from __future__ import annotations
 import sys
-import spacy
 
-nlp = spacy.load("en_core_web_sm")
+from deps import models
+
+nlp = models.lazy(models.spacy_key("en_core_web_sm"))   # loads on first parse
 
 # Pronouns to resolve (lowercased)
 PRONOUNS = {"he","she","it","they","him","her","them"}
@@ -50,8 +52,22 @@ def resolve_pronouns(text: str):
             last_np = span
     return " ".join(resolved_tokens)
 
+def _antecedents(doc) -> dict:
+    """Pronoun token index → head token of the last noun chunk (same rule as above)."""
+    ante, last = {}, None
+    for token in doc:
+        if token.text.lower() in PRONOUNS and last is not None:
+            ante[token.i] = last
+        if token.dep_ in {"nsubj","dobj","pobj","iobj","appos","compound"} and token.pos_ in {"NOUN","PROPN"}:
+            last = token
+    return ante
+
 def extract_nested_tuples(text: str):
-    doc = nlp(text)
+    return extract_nested_tuples_doc(nlp(text))
+
+def extract_nested_tuples_doc(doc, ante: dict | None = None):
+    """Tuples from a parsed Doc; pronoun fillers taken from `ante` if given."""
+    ante = ante or {}
     tuples = []
     # Predicate + tense
     root = next((t for t in doc if t.dep_=="ROOT" and t.pos_=="VERB"), None)
@@ -65,10 +81,17 @@ def extract_nested_tuples(text: str):
     for token in doc:
         role = SPO_MAP.get(token.dep_)
         if role:
-            attrs = [c.text for c in token.children if c.dep_ in MOD_DEPS]
-            tuples.append({"role":role,"filler":token.text,"attributes":attrs})
+            src = ante.get(token.i, token)
+            attrs = [c.text for c in src.children if c.dep_ in MOD_DEPS]
+            tuples.append({"role":role,"filler":src.text,"attributes":attrs})
     return tuples
 
+def process_corpus(texts, *, batch_size: int = 256, n_process: int = 1):
+    """Bulk mode: single nlp.pipe pass; yields one tuple list per text."""
+    for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process,
+                        disable=models.PIPE_DISABLE):
+        yield extract_nested_tuples_doc(doc, _antecedents(doc))
+
 if __name__=="__main__":
     if len(sys.argv)!=2:
         print("Usage: python tuple_extractor_rule_coref.py \"Your text here.\"")
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+ingest.py
+
+Streaming corpus → graph pipeline with checkpoint/resume.
+
+  read ▸ split sentences ▸ skip done ▸ passive rewrite + alias
+       ▸ triple extraction (async, batched) ▸ edge encoding ▸ part writer
+
+Every stage is a generator, so memory is bounded by `--batch` sentences
+plus one unflushed part. Each flush writes
+
+  OUT/part-00012.npz      surface / semantic HV matrices (row = edge)
+  OUT/part-00012.jsonl    one row per sentence: doc_id, sent_id, text, edge meta
+
+and then appends the part's (doc_id, sent_id) pairs to OUT/checkpoint.jsonl.
+A rerun with the same OUT skips completed sentences; parts that never made
+it into the checkpoint are discarded. `load_parts(OUT)` rebuilds a GraphStore.
+
+Input: JSONL ({"doc_id"|"id": …, "text": …} per line) or plain text
+(one document per line, doc_id = "<file stem>:<line no>").
+
+Usage:
+    python ingest.py corpus.jsonl out/ --abstracts located_in founded_by acquired_by
+"""
+from __future__ import annotations
+import argparse, asyncio, itertools, json, os, re, sys
+from pathlib import Path
+from typing import Iterable, Iterator, List, Set, Tuple
+
+_SENT_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[\"'“(\[]?[A-Z0-9])")
+
+# ───────────────────────────────────────────────────────────────
+# stages
+# ───────────────────────────────────────────────────────────────
+def read_corpus(path: Path) -> Iterator[Tuple[str, str]]:
+    jsonl = path.suffix in {".jsonl", ".ndjson"}
+    with open(path, encoding="utf8") as fh:
+        for n, line in enumerate(fh):
+            line = line.strip()
+            if not line:
+                continue
+            if jsonl:
+                rec = json.loads(line)
+                yield str(rec.get("doc_id", rec.get("id", f"{path.stem}:{n}"))), rec["text"]
+            else:
+                yield f"{path.stem}:{n}", line
+
+def split_sentences(docs: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, int, str]]:
+    for doc_id, text in docs:
+        for sent_id, sent in enumerate(s for s in _SENT_SPLIT.split(text) if s.strip()):
+            yield doc_id, sent_id, sent.strip()
+
+def skip_done(items, done: Set[Tuple[str, int]]):
+    for doc_id, sent_id, sent in items:
+        if (doc_id, sent_id) not in done:
+            yield doc_id, sent_id, sent
+
+def normalise(items, ee):
+    """Passive→active rewrite + alias resolution."""
+    for doc_id, sent_id, sent in items:
+        trace: List[str] = []
+        norm, alias_meta = ee.normalise_sentence(sent, doc_id, trace)
+        yield doc_id, sent_id, sent, norm, alias_meta, trace
+
+def extract(items, te, *, batch: int, concurrency: int, rate: float | None,
+            inventory=None, pack_budget: int | None = None, rules=None):
+    """
+    Triple extraction, `batch` sentences per async fan-out.  `inventory`
+    (a callable → (abstract types, expected)) selects the merged typed
+    prompt; it is re-read per batch so new types reach the next prompt.
+    `pack_budget` (est. prompt tokens) sends numbered windows of sentences
+    per request instead of one; results still line up with `items`, so
+    every triple lands on its own (doc_id, sent_id).
+    `rules` (e.g. edge_extractor.rule_pass) runs first on the whole batch;
+    only sentences it returns None for go to the LLM.  Each item gains the
+    extract tier that produced its triples.
+    """
+    from deps.deepinfra_client import aclose_aclient
+    from extractors.rule_extractor import TIER_LLM, TIER_RULE
+    loop = asyncio.new_event_loop()          # one loop → one pooled client for the run
+    try:
+        it = iter(items)
+        while chunk := list(itertools.islice(it, batch)):
+            sents = [c[3] for c in chunk]
+            ruled = rules(sents, [c[5] for c in chunk]) if rules else [None] * len(chunk)
+            todo  = [k for k, r in enumerate(ruled) if r is None]
+            results = []
+            if todo:
+                kw = dict(concurrency=concurrency, rate=rate, return_exceptions=True,
+                          inventory=inventory() if inventory else None)
+                ask = [sents[k] for k in todo]
+                results = loop.run_until_complete(
+                    te.aextract_triples_packed(ask, budget=pack_budget, **kw) if pack_budget
+                    else te.aextract_triples_many(ask, **kw))
+            llm = dict(zip(todo, results))
+            for k, c in enumerate(chunk):
+                if ruled[k] is not None:
+                    yield (*c, ruled[k], TIER_RULE)
+                    continue
+                triples = llm[k]
+                if isinstance(triples, BaseException):
+                    print(f"[ingest] {c[0]}#{c[1]} failed: {triples!r} (retried on resume)",
+                          file=sys.stderr)
+                    continue
+                yield (*c, triples, TIER_LLM)
+    finally:
+        loop.run_until_complete(aclose_aclient())
+        loop.close()
+
+def encode(items, ee, *, batch: int):
+    """
+    Edge encoding, `batch` sentences at a time: their untyped predicates
+    are resolved together, so Dict-A misses share one Dict-B prompt.
+    """
+    it = iter(items)
+    while chunk := list(itertools.islice(it, batch)):
+        resolved = ee.resolve_batch(t for c in chunk for t in c[6])
+        for doc_id, sent_id, sent, _norm, alias_meta, trace, triples, tier in chunk:
+            edges = ee.edges_from_triples(sent, triples, doc_id, sent_id, alias_meta, trace,
+                                          tier, resolved=resolved)
+            yield doc_id, sent_id, sent, edges
+
+# ───────────────────────────────────────────────────────────────
+# part writer + checkpoint
+# ───────────────────────────────────────────────────────────────
+class PartWriter:
+    def __init__(self, out: Path, every: int):
+        self.out, self.every = out, every
+        self.ckpt = out / "checkpoint.jsonl"
+        self.done: Set[Tuple[str, int]] = set()
+        parts: Set[int] = set()
+        if self.ckpt.exists():
+            data = self.ckpt.read_bytes()
+            keep = data.rfind(b"\n") + 1
+            if keep < len(data):                              # torn last line: cut it
+                os.truncate(self.ckpt, keep)                  # before flush() appends
+            for ln in data[:keep].decode("utf8").splitlines():
+                try:
+                    rec = json.loads(ln)
+                except ValueError:
+                    continue
+                parts.add(rec["part"])
+                self.done.update((d, s) for d, s in rec["done"])
+        for f in out.glob("part-*"):                          # orphans of a crash
+            if int(f.name.split(".")[0].split("-")[1]) not in parts:
+                f.unlink()
+        self.part = max(parts, default=-1) + 1
+        self._rows: list = []
+
+    def write(self, doc_id: str, sent_id: int, sent: str, edges: list):
+        self._rows.append((doc_id, sent_id, sent, edges))
+        if len(self._rows) >= self.every:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        import numpy as np
+        stem  = self.out / f"part-{self.part:05d}"
+        edges = [e for r in self._rows for e in r[3]]
+        mats  = {f: (np.stack([e[f] for e in edges]) if edges else np.empty((0, 0), np.int8))
+                 for f in ("surface", "semantic")}
+        with open(f"{stem}.npz.tmp", "wb") as fh:
+            np.savez(fh, **mats)
+            fh.flush(); os.fsync(fh.fileno())
+        with open(f"{stem}.jsonl.tmp", "w", encoding="utf8") as fh:
+            for doc_id, sent_id, sent, es in self._rows:
+                fh.write(json.dumps({"doc_id": doc_id, "sent_id": sent_id, "text": sent,
+                                     "edges": [{"edge_type": e["edge_type"], "meta": e["meta"]}
+                                               for e in es]},
+                                    ensure_ascii=False) + "\n")
+            fh.flush(); os.fsync(fh.fileno())
+        os.replace(f"{stem}.npz.tmp", f"{stem}.npz")
+        os.replace(f"{stem}.jsonl.tmp", f"{stem}.jsonl")
+        pairs = [(r[0], r[1]) for r in self._rows]
+        with open(self.ckpt, "a", encoding="utf8") as fh:    # commit point
+            fh.write(json.dumps({"part": self.part, "done": pairs}, ensure_ascii=False) + "\n")
+            fh.flush(); os.fsync(fh.fileno())
+        self.done.update(pairs)
+        print(f"[ingest] part {self.part}: {len(pairs)} sentences, {len(edges)} edges "
+              f"({len(self.done)} done)", file=sys.stderr)
+        self.part += 1
+        self._rows = []
+
+def load_parts(out: Path, store=None):
+    """Replay every committed part of `out` into a GraphStore."""
+    import numpy as np
+    from deps.graph_store import GraphStore
+    store = store if store is not None else GraphStore()
+    for jl in sorted(Path(out).glob("part-*.jsonl")):
+        with np.load(jl.with_suffix(".npz")) as z:
+            surf, sem = z["surface"], z["semantic"]
+        row = 0
+        for ln in jl.read_text(encoding="utf8").splitlines():
+            rec = json.loads(ln)
+            edges = []
+            for e in rec["edges"]:
+                edges.append({"edge_type": e["edge_type"],
+                              "surface":  surf[row],
+                              "semantic": sem[row],
+                              "meta":     e["meta"]})
+                row += 1
+            store.add_edges(rec["doc_id"], rec["sent_id"], rec["text"], edges)
+    return store
+
+# ───────────────────────────────────────────────────────────────
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Stream a corpus into HydraLink graph parts.")
+    ap.add_argument("corpus", type=Path, help=".jsonl or plain-text corpus")
+    ap.add_argument("out", type=Path, help="output / checkpoint directory")
+    ap.add_argument("--abstracts", nargs="*", default=[],
+                    help="keep only these abstract edge types (EXPECTED_ABSTRACTS)")
+    ap.add_argument("--batch", type=int, default=32, help="sentences per LLM fan-out")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--rate", type=float, default=None, help="max LLM requests/s")
+    ap.add_argument("--checkpoint-every", type=int, default=500, help="sentences per part")
+    ap.add_argument("--packed", action="store_true", help="store 512-byte packed HVs")
+    ap.add_argument("--merged", action="store_true",
+                    help="one LLM call per sentence returns triples already typed")
+    ap.add_argument("--pack-budget", type=int, default=None, metavar="TOKENS",
+                    help="pack numbered sentences into one LLM request up to ~TOKENS prompt tokens")
+    ap.add_argument("--cascade", action="store_true",
+                    help="spaCy rule path first; only unsure sentences go to the LLM")
+    ap.add_argument("--metrics", type=Path,
+                    help="write stage timings / counters here (.prom → Prometheus text, else JSON)")
+    args = ap.parse_args(argv)
+
+    from deps import metrics
+    if args.metrics:
+        metrics.enable()
+    # heavy imports only once we actually run
+    import extractors.edge_extractor as ee
+    import extractors.triple_extractor as te
+    ee.EXPECTED_ABSTRACTS[:] = args.abstracts
+    ee.HV_PACKED = args.packed
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    sink = PartWriter(args.out, args.checkpoint_every)
+    stream = split_sentences(read_corpus(args.corpus))
+    stream = skip_done(stream, sink.done)
+    stream = normalise(stream, ee)
+    stream = extract(stream, te, batch=args.batch, concurrency=args.concurrency, rate=args.rate,
+                     inventory=ee.inventory if args.merged else None,
+                     pack_budget=args.pack_budget,
+                     rules=ee.rule_pass if args.cascade else None)
+    stream = encode(stream, ee, batch=args.batch)
+    try:
+        for item in stream:
+            sink.write(*item)
+    finally:
+        sink.flush()
+        if args.metrics:
+            metrics.dump(args.metrics)
+    print("Edge counts:", dict(ee.EDGE_COUNTS), file=sys.stderr)
+    print("Alias-tier counts:", dict(ee.ALIAS_TIER_COUNTS), file=sys.stderr)
+    if args.cascade:
+        print("Extract-tier counts:", dict(ee.EXTRACT_TIER_COUNTS), file=sys.stderr)
+    from deps.edge_type_service import shortlist_stats
+    st = shortlist_stats()
+    if st["counts"]:
+        print("Predicate shortlist:", st["counts"], f"auto_rate={st['auto_rate']:.2f}",
+              file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+parallel_build.py
+
+Multi-core map-reduce build of a GraphStore from a corpus.
+
+  map     worker processes each take a chunk of documents and run the ingest
+          stages (split ▸ normalise ▸ extract ▸ encode) into a private
+          GraphStore, saved as OUT/shard-00007/
+  reduce  the parent merges shards strictly in chunk order with
+          GraphStore.extend (columnar gathers, no per-edge Python)
+
+Dict-B (edge_type_service) is the only state workers would otherwise share
+by writing: workers run with PERSIST=False and return the predicate →
+abstract decisions they made. Each chunk starts from the Dict-A loaded at
+worker start (`reset_local`), so a reused worker never answers from a
+decision it made for another chunk, and workers keep every edge
+(FILTER_EXPECTED=False; --abstracts still shapes the prompts). The parent
+reconciles the decisions (first in chunk order wins), relabels every
+shard's edges by fine_pred with the winning mapping, applies --abstracts
+to the relabelled types, and only then persists the mapping to Dict-A.
+Given deterministic LLM answers (temperature 0, cached), the merged graph
+is independent of worker scheduling.
+
+Usage:
+    python parallel_build.py corpus.jsonl graph/ --workers 8 --abstracts located_in founded_by
+"""
+from __future__ import annotations
+import argparse, collections, itertools, os, shutil, sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import ingest
+
+# ───────────────────────────────────────────────────────────────
+# map (worker side)
+# ───────────────────────────────────────────────────────────────
+_OPTS: dict = {}
+
+def _init_worker(opts: dict):
+    import extractors.edge_extractor as ee
+    import deps.edge_type_service as ets
+    from deps import metrics
+    metrics.enable(opts["metrics"])
+    ee.EXPECTED_ABSTRACTS[:] = opts["abstracts"]
+    ee.FILTER_EXPECTED = False               # parent filters relabelled types
+    ee.HV_PACKED = opts["packed"]
+    ets.PERSIST  = False                     # parent reconciles + persists
+    ets.reset_local()                        # record the Dict-A baseline
+    _OPTS.update(opts)
+
+def _build_chunk(c: int, docs: List[Tuple[str, str]]):
+    import extractors.edge_extractor as ee
+    import extractors.triple_extractor as te
+    import deps.edge_type_service as ets
+    from deps import metrics
+    from deps.graph_store import GraphStore
+
+    ets.reset_local()                        # no decisions from earlier chunks
+    store  = GraphStore()
+    stream = ingest.split_sentences(docs)
+    stream = ingest.normalise(stream, ee)
+    stream = ingest.extract(stream, te, batch=_OPTS["batch"],
+                            concurrency=_OPTS["concurrency"], rate=_OPTS["rate"],
+                            inventory=ee.inventory if _OPTS["merged"] else None,
+                            pack_budget=_OPTS["pack_budget"],
+                            rules=ee.rule_pass if _OPTS["cascade"] else None)
+    for doc_id, sent_id, sent, edges in ingest.encode(stream, ee):
+        store.add_edges(doc_id, sent_id, sent, edges)
+
+    path = Path(_OPTS["out"]) / f"shard-{c:05d}"
+    store.save(path)
+    tiers = dict(ee.ALIAS_TIER_COUNTS)
+    ee.ALIAS_TIER_COUNTS.clear(); ee.EDGE_COUNTS.clear()
+    return c, str(path), tiers, ets.drain_additions(), metrics.snapshot(reset=True)
+
+def _chunks(docs, n: int):
+    it = iter(docs)
+    for c in itertools.count():
+        if not (chunk := list(itertools.islice(it, n))):
+            return
+        yield c, chunk
+
+# ───────────────────────────────────────────────────────────────
+# reduce (parent side)
+# ───────────────────────────────────────────────────────────────
+class _Merger:
+    """Folds shards into one store in chunk order, whatever order they finish in."""
+    def __init__(self, store, abstracts: List[str]):
+        self.store, self.keep = store, abstracts or None
+        self.canon: Dict[str, str] = {}
+        self.tiers = collections.Counter()
+        self._ready: Dict[int, tuple] = {}
+        self._next = 0
+
+    def add(self, c: int, path: str, tiers: dict, additions: list, snap: dict):
+        from deps import metrics
+        metrics.merge(snap)                          # worker timings / counters
+        self._ready[c] = (path, tiers, additions)
+        while self._next in self._ready:
+            self._merge(*self._ready.pop(self._next))
+            self._next += 1
+
+    def _merge(self, path: str, tiers: dict, additions: list):
+        from deps.graph_store import GraphStore
+        for p, abstract in additions:
+            self.canon.setdefault(p, abstract)
+        shard = GraphStore.open(path, mmap=False)
+        self.store.extend(shard, relabel=self.canon, keep=self.keep)
+        self.tiers.update(tiers)
+        shutil.rmtree(path)
+
+def edge_counts(store) -> collections.Counter:
+    """EDGE_COUNTS recomputed from the merged store's live edges."""
+    import numpy as np
+    et, alive = store.E["edge_type"], store.E["alive"]
+    n = np.bincount(et[alive], minlength=len(store.edge_types))
+    return collections.Counter({store.edge_types[i]: int(v) for i, v in enumerate(n) if v})
+
+# ───────────────────────────────────────────────────────────────
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Parallel map-reduce build of a HydraLink graph.")
+    ap.add_argument("corpus", type=Path, help=".jsonl or plain-text corpus")
+    ap.add_argument("out", type=Path, help="output GraphStore directory")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--docs-per-task", type=int, default=64)
+    ap.add_argument("--abstracts", nargs="*", default=[],
+                    help="keep only these abstract edge types (EXPECTED_ABSTRACTS)")
+    ap.add_argument("--batch", type=int, default=32, help="sentences per LLM fan-out")
+    ap.add_argument("--concurrency", type=int, default=16, help="LLM calls in flight per worker")
+    ap.add_argument("--rate", type=float, default=None, help="max LLM requests/s per worker")
+    ap.add_argument("--packed", action="store_true", help="store 512-byte packed HVs")
+    ap.add_argument("--merged", action="store_true",
+                    help="one LLM call per sentence returns triples already typed")
+    ap.add_argument("--pack-budget", type=int, default=None, metavar="TOKENS",
+                    help="pack numbered sentences into one LLM request up to ~TOKENS prompt tokens")
+    ap.add_argument("--cascade", action="store_true",
+                    help="spaCy rule path first; only unsure sentences go to the LLM")
+    ap.add_argument("--metrics", type=Path,
+                    help="write merged worker metrics here (.prom → Prometheus text, else JSON)")
+    args = ap.parse_args(argv)
+
+    from deps import metrics
+    from deps.graph_store import GraphStore
+    import deps.edge_type_service as ets
+    metrics.enable(bool(args.metrics))
+
+    work = args.out.with_name(args.out.name + ".shards")
+    work.mkdir(parents=True, exist_ok=True)
+    opts  = {"abstracts": args.abstracts, "packed": args.packed, "batch": args.batch,
+             "concurrency": args.concurrency, "rate": args.rate, "out": str(work),
+             "metrics": bool(args.metrics), "merged": args.merged,
+             "pack_budget": args.pack_budget, "cascade": args.cascade}
+    merge = _Merger(GraphStore(), args.abstracts)
+
+    chunks = _chunks(ingest.read_corpus(args.corpus), args.docs_per_task)
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(opts,)) as ex:
+        pending = set()
+        for c, docs in chunks:
+            pending.add(ex.submit(_build_chunk, c, docs))
+            if len(pending) >= 2 * args.workers:          # bounded read-ahead
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    merge.add(*f.result())
+        for f in pending:
+            merge.add(*f.result())
+
+    ets.persist_mappings(merge.canon.items())
+    merge.store.save(args.out)
+    if args.metrics:
+        metrics.dump(args.metrics)
+    shutil.rmtree(work, ignore_errors=True)
+    print(f"[build] {merge.store.S.n} sentences, {merge.store.E.n} edges → {args.out}",
+          file=sys.stderr)
+    print("Edge counts:", dict(edge_counts(merge.store)), file=sys.stderr)
+    print("Alias-tier counts:", dict(merge.tiers), file=sys.stderr)
+    if args.cascade:
+        print("Extract-tier counts (edges):", merge.store.extract_tier_counts(), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
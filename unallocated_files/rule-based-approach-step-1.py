@@ -14,10 +14,10 @@ Usage:
 """
 
 import sys
-import spacy
 
-# Load spaCy model once
-nlp = spacy.load("en_core_web_sm")
+from deps import models
+
+nlp = models.lazy(models.spacy_key("en_core_web_sm"))   # loads on first parse
 
 # Mapping from UD dependency labels to roles
 DEP_ROLE_MAP = {